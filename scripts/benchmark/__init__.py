@@ -0,0 +1,4 @@
+"""
+スループット計測用モジュール
+疑似GitHub APIサーバーとベンチマークスクリプトを提供
+"""
\ No newline at end of file
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+ローカル検証用の疑似GitHub APIサーバー
+セットアップスクリプトが使用するREST・GraphQLエンドポイントをメモリ上で再現する
+（実トークン・実リポジトリなしでスループットを計測するためのもの）
+"""
+
+import re
+import json
+import base64
+import hashlib
+import time
+import threading
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ミューテーション呼び出し（エイリアス付き・インライン入力の両方に対応）
+MUTATION_PATTERN = re.compile(
+    r'(?:(\w+)\s*:\s*)?'
+    r'(createIssue|addProjectV2ItemById|createProjectV2Field|createProjectV2|createDiscussion)'
+    r'\s*\(\s*input\s*:\s*(\$\w+|\{.*?\})\s*\)',
+    re.S
+)
+INLINE_INPUT_PATTERN = re.compile(r'(\w+)\s*:\s*\$(\w+)')
+# REST の書き込みエンドポイント（リポジトリ名は問わず、全リポジトリが同じ状態を共有する）
+REST_WRITE_PATTERN = re.compile(r'^/repos/[^/]+/[^/]+/(issues|labels)$')
+# GitHub App のエンドポイント
+INSTALLATION_PATTERN = re.compile(r'^/repos/[^/]+/[^/]+/installation$')
+ACCESS_TOKENS_PATTERN = re.compile(r'^/app/installations/(\d+)/access_tokens$')
+# インストールトークンの接頭辞
+INSTALLATION_TOKEN_PREFIX = 'ghs_'
+
+
+class FakeGitHubServer:
+    """疑似GitHub APIサーバークラス
+    
+    対応エンドポイント:
+      - REST: GET /rate_limit, POST /repos/{owner}/{repo}/issues, POST /repos/{owner}/{repo}/labels
+      - GitHub App: GET /repos/{owner}/{repo}/installation, POST /app/installations/{id}/access_tokens
+        （JWTは署名を検証せず、形式と有効期限のみ確認する）
+      - GraphQL: repository（projectsV2・labels・issues・discussionCategories）, node（Projectフィールド）,
+        createIssue, addProjectV2ItemById, createProjectV2, createProjectV2Field, createDiscussion
+    latency でレスポンス遅延、rate_limit / graphql_limit / reset_interval で x-ratelimit-* ヘッダー、
+    content_limit_per_minute / content_limit_per_hour でコンテンツ作成のセカンダリレート制限
+    （retry-after 付き 403）を再現する。予算はどちらも Authorization ヘッダーのトークンごとに管理する。
+    インストールトークン（ghs_）は installation_token_lifetime 秒で失効し（失効後は 401）、
+    予算の上限は installation_rate_limit になる。
+    clock を差し替えると仮想時計上で動作する（simulator.py で使用）。
+    """
+    
+    def __init__(self,
+                 owner: str = 'bench',
+                 repo: str = 'academy',
+                 latency: float = 0.0,
+                 rate_limit: int = 5000,
+                 graphql_limit: int = 5000,
+                 reset_interval: int = 3600,
+                 content_limit_per_minute: Optional[int] = None,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 content_limit_per_hour: Optional[int] = None,
+                 clock: Callable[[], float] = time.time,
+                 installation_rate_limit: int = 15000,
+                 installation_token_lifetime: int = 3600):
+        self.owner = owner
+        self.repo = repo
+        self.latency = latency
+        self.reset_interval = reset_interval
+        self.content_limit_per_minute = content_limit_per_minute
+        self.content_limit_per_hour = content_limit_per_hour
+        self.clock = clock
+        self.host = host
+        self.port = port
+        
+        self.lock = threading.Lock()
+        self.limits = {'core': rate_limit, 'graphql': graphql_limit}
+        self.installation_rate_limit = installation_rate_limit
+        self.installation_token_lifetime = installation_token_lifetime
+        self.installation_id = 1
+        # 発行したインストールトークン -> 失効時刻
+        self.installation_tokens: Dict[str, float] = {}
+        self.budgets: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.content_writes: Dict[str, deque] = defaultdict(deque)
+        
+        # リポジトリの状態
+        self.repository_id = 'R_fake'
+        self.owner_id = 'U_fake'
+        self.issues: List[Dict[str, Any]] = []
+        self.labels: Dict[str, str] = {}
+        self.projects: List[Dict[str, Any]] = []
+        self.project_items: Dict[str, List[str]] = {}
+        self.project_fields: Dict[str, List[Dict[str, Any]]] = {}
+        self.discussions: List[Dict[str, Any]] = []
+        self.discussion_categories = [
+            {'id': 'DIC_general', 'name': 'General', 'description': '', 'emoji': ':speech_balloon:',
+             'emojiHTML': '<div>💬</div>'}
+        ]
+        
+        self.reset_stats()
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+    
+    # サーバー制御
+    
+    @property
+    def url(self) -> str:
+        """REST APIのベースURL"""
+        return f"http://{self.host}:{self.port}"
+    
+    @property
+    def graphql_url(self) -> str:
+        """GraphQL APIのURL"""
+        return f"{self.url}/graphql"
+    
+    @property
+    def repository(self) -> str:
+        """owner/repo 形式のリポジトリ名"""
+        return f"{self.owner}/{self.repo}"
+    
+    def environment(self) -> Dict[str, str]:
+        """セットアップスクリプトをこのサーバーに向ける環境変数"""
+        return {
+            'GITHUB_API_URL': self.url,
+            'GITHUB_GRAPHQL_URL': self.graphql_url,
+            'GITHUB_REPOSITORY': self.repository,
+            'TEAM_SETUP_TOKEN': 'fake-token'
+        }
+    
+    def start(self) -> 'FakeGitHubServer':
+        """バックグラウンドスレッドでサーバーを起動"""
+        handler = type('FakeGitHubHandler', (_FakeGitHubHandler,), {'fake': self})
+        self.httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fake-github', daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        """サーバーを停止"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def __enter__(self) -> 'FakeGitHubServer':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    # 統計
+    
+    def reset_stats(self):
+        """リクエスト統計をリセット"""
+        with self.lock:
+            self.requests: Counter = Counter()
+            self.status_codes: Counter = Counter()
+            self.bytes_in = 0
+            self.bytes_out = 0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """リクエスト統計とリポジトリ状態を取得"""
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'status_codes': {str(code): count for code, count in self.status_codes.items()},
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'issues': len(self.issues),
+                'projects': len(self.projects),
+                'project_items': sum(len(items) for items in self.project_items.values())
+            }
+    
+    # レート制限
+    
+    def _limit(self, resource: str, token: str = '') -> int:
+        """トークンの予算の上限（インストールトークンは installation_rate_limit）"""
+        if token.startswith(INSTALLATION_TOKEN_PREFIX):
+            return self.installation_rate_limit
+        return self.limits[resource]
+    
+    def _consume(self, resource: str, token: str = '') -> Tuple[bool, Dict[str, str]]:
+        """トークンの予算を1消費し、(許可されたか, x-ratelimit-* ヘッダー) を返す"""
+        now = int(self.clock())
+        limit = self._limit(resource, token)
+        budget = self.budgets.get((token, resource))
+        if budget is None or now >= budget['reset']:
+            budget = {'remaining': limit, 'reset': now + self.reset_interval}
+            self.budgets[(token, resource)] = budget
+        
+        allowed = budget['remaining'] > 0
+        if allowed:
+            budget['remaining'] -= 1
+        headers = {
+            'x-ratelimit-limit': str(limit),
+            'x-ratelimit-remaining': str(budget['remaining']),
+            'x-ratelimit-reset': str(budget['reset']),
+            'x-ratelimit-used': str(limit - budget['remaining']),
+            'x-ratelimit-resource': resource
+        }
+        return allowed, headers
+    
+    def _content_write_delay(self, count: int = 1, token: str = '') -> int:
+        """トークンのセカンダリレート制限（分・時間単位）に抵触する場合は retry-after 秒数を返す"""
+        windows = [(window, limit) for window, limit in
+                   ((60, self.content_limit_per_minute), (3600, self.content_limit_per_hour)) if limit]
+        if not windows:
+            return 0
+        now = self.clock()
+        longest = max(window for window, _ in windows)
+        writes = self.content_writes[token]
+        while writes and now - writes[0] >= longest:
+            writes.popleft()
+        for window, limit in windows:
+            recent = [written for written in writes if now - written < window]
+            if len(recent) + count > limit:
+                oldest = recent[0] if recent else now
+                return max(1, int(window - (now - oldest)) + 1)
+        writes.extend([now] * count)
+        return 0
+    
+    def rate_limit_body(self, token: str = '') -> Dict[str, Any]:
+        """GET /rate_limit のレスポンス"""
+        resources = {}
+        now = int(self.clock())
+        for resource in self.limits:
+            limit = self._limit(resource, token)
+            budget = self.budgets.get((token, resource)) or {'remaining': limit, 'reset': now + self.reset_interval}
+            resources[resource] = {
+                'limit': limit,
+                'remaining': budget['remaining'],
+                'reset': budget['reset'],
+                'used': limit - budget['remaining']
+            }
+        return {'resources': resources, 'rate': resources['core']}
+    
+    # リクエスト処理
+    
+    def handle(self, method: str, path: str, body: Dict[str, Any],
+               token: str = '') -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        """リクエストを処理し、(ステータス, ヘッダー, JSON本文) を返す"""
+        if self.latency > 0:
+            time.sleep(self.latency)
+        
+        path = path.split('?')[0].rstrip('/')
+        rest_write = REST_WRITE_PATTERN.match(path)
+        
+        with self.lock:
+            if INSTALLATION_PATTERN.match(path) or ACCESS_TOKENS_PATTERN.match(path):
+                return self._handle_app(method, path, token)
+            
+            # 失効した・発行していないインストールトークンは拒否する
+            if token.startswith(INSTALLATION_TOKEN_PREFIX) and \
+                    self.installation_tokens.get(token, 0) <= self.clock():
+                self.requests[f"{method} {path}"] += 1
+                return 401, {}, {'message': 'Bad credentials'}
+            if token.startswith(INSTALLATION_TOKEN_PREFIX):
+                # 予算はトークンではなくインストール単位
+                token = f"{INSTALLATION_TOKEN_PREFIX}installation-{self.installation_id}"
+            
+            if method == 'GET' and path == '/rate_limit':
+                self.requests['GET /rate_limit'] += 1
+                return 200, {}, self.rate_limit_body(token)
+            
+            if method == 'POST' and path == '/graphql':
+                self.requests['POST /graphql'] += 1
+                return self._handle_graphql(body, token)
+            
+            if method == 'POST' and rest_write:
+                endpoint = rest_write.group(1)
+                self.requests[f"POST /repos/:owner/:repo/{endpoint}"] += 1
+                allowed, headers = self._consume('core', token)
+                if not allowed:
+                    return 403, headers, {'message': 'API rate limit exceeded for user.'}
+                retry_after = self._content_write_delay(token=token)
+                if retry_after:
+                    headers['retry-after'] = str(retry_after)
+                    return 403, headers, {'message': 'You have exceeded a secondary rate limit. Please wait a few minutes before you try again.'}
+                if endpoint == 'issues':
+                    return 201, headers, self._create_issue(body)
+                return 201, headers, self._create_label(body.get('name', ''))
+            
+            self.requests[f"{method} {path}"] += 1
+            return 404, {}, {'message': 'Not Found'}
+    
+    def _valid_jwt(self, token: str) -> bool:
+        """App の JWT の形式と有効期限を確認（署名は検証しない）"""
+        parts = token.split('.')
+        if len(parts) != 3:
+            return False
+        try:
+            claims = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+        except ValueError:
+            return False
+        now = self.clock()
+        return bool(claims.get('iss')) and claims.get('iat', now + 1) <= now < claims.get('exp', 0)
+    
+    def _handle_app(self, method: str, path: str, token: str) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        """GitHub App のインストール情報取得・インストールトークン発行"""
+        tokens = ACCESS_TOKENS_PATTERN.match(path)
+        endpoint = 'POST /app/installations/:id/access_tokens' if tokens else 'GET /repos/:owner/:repo/installation'
+        self.requests[endpoint] += 1
+        
+        if not self._valid_jwt(token):
+            return 401, {}, {'message': 'A JSON web token could not be decoded'}
+        if not tokens:
+            if method != 'GET':
+                return 404, {}, {'message': 'Not Found'}
+            return 200, {}, {'id': self.installation_id, 'app_id': 1}
+        if method != 'POST' or int(tokens.group(1)) != self.installation_id:
+            return 404, {}, {'message': 'Not Found'}
+        
+        expires_at = self.clock() + self.installation_token_lifetime
+        installation_token = f"{INSTALLATION_TOKEN_PREFIX}fake{len(self.installation_tokens) + 1:04d}"
+        self.installation_tokens[installation_token] = expires_at
+        return 201, {}, {
+            'token': installation_token,
+            'expires_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(expires_at))
+        }
+    
+    def _create_label(self, name: str) -> Dict[str, Any]:
+        """ラベルを作成（既存の場合はそのまま返す）"""
+        if name not in self.labels:
+            self.labels[name] = f"LA_{len(self.labels) + 1}"
+        return {'name': name, 'node_id': self.labels[name], 'color': 'ededed'}
+    
+    def _create_issue(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Issueを作成してREST API形式で返す"""
+        number = len(self.issues) + 1
+        issue = {
+            'node_id': f"I_{number}",
+            'number': number,
+            'html_url': f"https://github.com/{self.owner}/{self.repo}/issues/{number}",
+            'title': data.get('title', ''),
+            'body': data.get('body') or '',
+            'labels': [self._create_label(name) for name in data.get('labels', [])]
+        }
+        self.issues.append(issue)
+        return issue
+    
+    @staticmethod
+    def _issue_node(issue: Dict[str, Any]) -> Dict[str, Any]:
+        """IssueをGraphQLノード形式に変換"""
+        return {
+            'id': issue['node_id'],
+            'number': issue['number'],
+            'title': issue['title'],
+            'url': issue['html_url'],
+            'body': issue['body'],
+            'labels': {'nodes': [{'name': label['name']} for label in issue['labels']]}
+        }
+    
+    def _handle_graphql(self, body: Dict[str, Any], token: str = '') -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        """GraphQLリクエストを処理"""
+        query = body.get('query', '')
+        variables = body.get('variables') or {}
+        
+        allowed, headers = self._consume('graphql', token)
+        if not allowed:
+            return 200, headers, {'data': None, 'errors': [{'type': 'RATE_LIMITED', 'message': 'API rate limit exceeded'}]}
+        
+        if query.lstrip().startswith('mutation'):
+            calls = MUTATION_PATTERN.findall(query)
+            creates = sum(1 for _, name, _ in calls if name in ('createIssue', 'createDiscussion'))
+            retry_after = self._content_write_delay(creates, token) if creates else 0
+            if retry_after:
+                headers['retry-after'] = str(retry_after)
+                return 403, headers, {'message': 'You have exceeded a secondary rate limit.'}
+            data, errors = self._run_mutations(calls, variables)
+        else:
+            data, errors = self._run_query(query, variables), []
+        
+        response = {'data': data}
+        if errors:
+            response['errors'] = errors
+        return 200, headers, response
+    
+    def _run_query(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """GraphQLクエリを処理"""
+        if 'node(id:' in query:
+            fields = self.project_fields.get(variables.get('projectId'), [])
+            return {'node': {'fields': {'nodes': [{'id': field['id'], 'name': field['name'], 'options': field['options']}
+                                                  for field in fields]}}}
+        
+        repository: Dict[str, Any] = {}
+        if 'labels(' in query and 'issues(' not in query:
+            nodes = [{'id': label_id, 'name': name} for name, label_id in self.labels.items()]
+            repository['labels'] = {'nodes': nodes, 'pageInfo': {'hasNextPage': False, 'endCursor': None}}
+        elif 'issues(' in query:
+            first = int(variables.get('first') or 100)
+            offset = int(variables.get('cursor') or 0)
+            direction = variables.get('direction') or ('DESC' if 'DESC' in query else 'ASC')
+            ordered = self.issues if direction == 'ASC' else list(reversed(self.issues))
+            page = ordered[offset:offset + first]
+            has_next = offset + first < len(ordered)
+            repository['issues'] = {
+                'nodes': [self._issue_node(issue) for issue in page],
+                'pageInfo': {'hasNextPage': has_next, 'endCursor': str(offset + first) if has_next else None}
+            }
+        elif 'discussionCategories' in query:
+            repository['discussionCategories'] = {'nodes': list(self.discussion_categories)}
+        else:
+            repository['id'] = self.repository_id
+            repository['owner'] = {'id': self.owner_id, '__typename': 'User'}
+            repository['projectsV2'] = {'nodes': [dict(project) for project in self.projects]}
+        return {'repository': repository}
+    
+    def _run_mutations(self, calls: List[Tuple[str, str, str]],
+                       variables: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """ミューテーション（エイリアス付き複数呼び出しを含む）を処理"""
+        data: Dict[str, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        
+        for alias, name, input_ref in calls:
+            key = alias or name
+            if input_ref.startswith('$'):
+                input_data = variables.get(input_ref[1:]) or {}
+            else:
+                input_data = {field: variables.get(var) for field, var in INLINE_INPUT_PATTERN.findall(input_ref)}
+            
+            result, error = self._run_mutation(name, input_data)
+            data[key] = result
+            if error:
+                errors.append({'type': 'NOT_FOUND', 'path': [key], 'message': error})
+        
+        return data, errors
+    
+    def _run_mutation(self, name: str, input_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """単一のミューテーションを処理し、(結果, エラーメッセージ) を返す"""
+        project_ids = {project['id'] for project in self.projects}
+        
+        if name == 'createIssue':
+            names_by_id = {label_id: label_name for label_name, label_id in self.labels.items()}
+            issue = self._create_issue({
+                'title': input_data.get('title', ''),
+                'body': input_data.get('body', ''),
+                'labels': [names_by_id[label_id] for label_id in input_data.get('labelIds') or [] if label_id in names_by_id]
+            })
+            for project_id in input_data.get('projectV2Ids') or []:
+                if project_id in project_ids:
+                    self.project_items[project_id].append(issue['node_id'])
+            return {'issue': {'id': issue['node_id'], 'number': issue['number'],
+                              'url': issue['html_url'], 'title': issue['title']}}, None
+        
+        if name == 'addProjectV2ItemById':
+            project_id = input_data.get('projectId')
+            if project_id not in project_ids:
+                return None, f"Could not resolve to a node with the global id of '{project_id}'"
+            items = self.project_items[project_id]
+            if input_data.get('contentId') not in items:
+                items.append(input_data.get('contentId'))
+            return {'item': {'id': f"PVTI_{project_id}_{input_data.get('contentId')}"}}, None
+        
+        if name == 'createProjectV2':
+            number = len(self.projects) + 1
+            project = {
+                'id': f"PVT_{number}",
+                'number': number,
+                'title': input_data.get('title', ''),
+                'url': f"https://github.com/users/{self.owner}/projects/{number}"
+            }
+            self.projects.append(project)
+            self.project_items[project['id']] = []
+            self.project_fields[project['id']] = []
+            return {'projectV2': dict(project)}, None
+        
+        if name == 'createProjectV2Field':
+            project_id = input_data.get('projectId')
+            if project_id not in project_ids:
+                return None, f"Could not resolve to a node with the global id of '{project_id}'"
+            fields = self.project_fields[project_id]
+            field = {
+                'id': f"PVTSSF_{project_id}_{len(fields) + 1}",
+                'name': input_data.get('name', ''),
+                'options': [{'id': f"opt_{index}", 'name': option.get('name', '')}
+                            for index, option in enumerate(input_data.get('singleSelectOptions') or [])]
+            }
+            fields.append(field)
+            return {'projectV2Field': field}, None
+        
+        if name == 'createDiscussion':
+            number = len(self.discussions) + 1
+            discussion = {
+                'id': f"D_{number}",
+                'title': input_data.get('title', ''),
+                'url': f"https://github.com/{self.owner}/{self.repo}/discussions/{number}"
+            }
+            self.discussions.append(discussion)
+            return {'discussion': discussion}, None
+        
+        return None, f"Unsupported mutation: {name}"
+
+
+class _FakeGitHubHandler(BaseHTTPRequestHandler):
+    """疑似GitHub APIのHTTPハンドラー"""
+    
+    fake: FakeGitHubServer = None
+    protocol_version = 'HTTP/1.1'
+    # ヘッダーと本文を別々に書き込むため、Nagleアルゴリズムによる遅延を避ける
+    disable_nagle_algorithm = True
+    
+    def _dispatch(self, method: str):
+        """リクエスト本文を読み込み、疑似サーバーに処理させる"""
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            body = {}
+        
+        token = (self.headers.get('Authorization') or '').split(' ')[-1]
+        status, headers, payload = self.fake.handle(method, self.path, body, token)
+        encoded = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        
+        # GETには本文のハッシュをETagとして付け、一致すれば 304 を返す
+        if method == 'GET' and status == 200:
+            headers = dict(headers, ETag=f'"{hashlib.sha1(encoded).hexdigest()}"')
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, encoded = 304, b''
+        
+        with self.fake.lock:
+            self.fake.status_codes[status] += 1
+            self.fake.bytes_in += len(raw)
+            self.fake.bytes_out += len(encoded)
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(encoded)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+    
+    def do_GET(self):
+        self._dispatch('GET')
+    
+    def do_POST(self):
+        self._dispatch('POST')
+    
+    def log_message(self, format: str, *args):
+        """アクセスログは出力しない"""
+        pass
\ No newline at end of file
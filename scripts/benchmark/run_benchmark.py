@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+セットアップスクリプトのスループット計測スクリプト
+疑似GitHub APIサーバーに対して実際のエントリーポイントを実行し、
+issues/sec・1 Issueあたりのリクエスト数・実行時間を計測する
+
+使い方:
+  python scripts/benchmark/run_benchmark.py [profile ...]
+
+環境変数:
+  BENCH_LATENCY     疑似サーバーのレスポンス遅延（秒、デフォルト 0.05）
+  BENCH_SCALE       CSVの行を何倍に複製するか（デフォルト 1）
+  BENCH_WRITE_RATE  書き込みペーシング（件/分、デフォルト 100000 = 実質無制限）
+  BENCH_OUTPUT      結果JSONの出力先（デフォルト benchmark_result.json）
+  BENCH_BASELINE    比較対象の結果JSON（指定時は issues/sec の低下を検出して終了コード1）
+  BENCH_TOLERANCE   許容する issues/sec の低下率（デフォルト 0.2）
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+# 共通ライブラリをインポート
+sys.path.append('scripts')
+from benchmark.fake_github_server import FakeGitHubServer
+
+# プロファイル名 -> 追加の環境変数
+PROFILES = {
+    'rest': {},
+    'graphql': {'CREATION_MODE': 'graphql'},
+    'pipeline': {'PIPELINE': 'true'},
+    'async': {'ASYNC_CLIENT': 'true'}
+}
+
+# 実行するエントリーポイント（ワークフローと同じ順序）
+ENTRY_POINTS = [
+    ('create_projects', 'scripts/setup/create_projects.py'),
+    ('create_all_issues', 'scripts/create_all_issues_smart.py'),
+    ('update_readme_links', 'scripts/utils/update_readme_links.py')
+]
+
+
+def scale_csv(file_path: str, scale: int):
+    """CSVの行をタイトルを変えて複製（大規模コホートを想定した計測用）"""
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    if not rows or 'title' not in rows[0]:
+        return
+    header, rows = rows[0], rows[1:]
+    title_index = header.index('title')
+    
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for copy in range(scale):
+            for row in rows:
+                if copy > 0 and len(row) > title_index and row[title_index]:
+                    row = row[:title_index] + [f"{row[title_index]} ({copy + 1})"] + row[title_index + 1:]
+                writer.writerow(row)
+
+
+def prepare_workspace(scale: int = 1) -> str:
+    """スクリプト・データ・READMEを一時ディレクトリにコピー"""
+    workspace = tempfile.mkdtemp(prefix='academy-bench-')
+    shutil.copytree('scripts', os.path.join(workspace, 'scripts'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copytree('data', os.path.join(workspace, 'data'))
+    shutil.copy('README.md', os.path.join(workspace, 'README.md'))
+    
+    if scale > 1:
+        for name in ('tasks_for_issues.csv', 'kpt_for_issues.csv', 'tasks_for_real_estate.csv'):
+            scale_csv(os.path.join(workspace, 'data', name), scale)
+    return workspace
+
+
+def run_entry_point(name: str, script: str, workspace: str, env: Dict[str, str],
+                    server: FakeGitHubServer) -> Dict:
+    """エントリーポイントを1つ実行して計測"""
+    before = server.snapshot()
+    start_time = time.time()
+    
+    log_path = os.path.join(workspace, f"{name}.log")
+    with open(log_path, 'w', encoding='utf-8') as log:
+        result = subprocess.run([sys.executable, script], cwd=workspace, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+    
+    wall_time = time.time() - start_time
+    after = server.snapshot()
+    
+    return {
+        'exit_code': result.returncode,
+        'wall_time': round(wall_time, 3),
+        'requests': after['total_requests'] - before['total_requests'],
+        'issues_created': after['issues'] - before['issues'],
+        'log': log_path
+    }
+
+
+def run_profile(profile: str, overrides: Dict[str, str], latency: float,
+                write_rate: str, scale: int = 1) -> Dict:
+    """プロファイルを新しい疑似サーバー・作業ディレクトリで実行"""
+    print(f"\n🏁 Profile: {profile}")
+    workspace = prepare_workspace(scale)
+    
+    with FakeGitHubServer(latency=latency) as server:
+        env = dict(os.environ)
+        env.update(server.environment())
+        env.update({
+            'PYTHONUNBUFFERED': '1',
+            'REQUEST_DELAY': '0',
+            'BATCH_PAUSE': '0',
+            'WRITE_RATE_PER_MINUTE': write_rate,
+            # 疑似サーバーには時間単位の制限が無いため、大きな BENCH_SCALE でも1時間待たない
+            'WRITE_LIMIT_PER_HOUR': '0',
+            # 他の実行の予算記録を持ち込まないよう、台帳はプロファイルごとに分ける
+            'RATE_LEDGER_FILE': os.path.join(workspace, 'rate_ledger.sqlite')
+        })
+        env.update(overrides)
+        
+        steps = {}
+        for name, script in ENTRY_POINTS:
+            step = run_entry_point(name, script, workspace, env, server)
+            steps[name] = step
+            status = '✅' if step['exit_code'] == 0 else '❌'
+            print(f"  {status} {name}: {step['wall_time']:.2f}s, {step['requests']} requests")
+            if step['exit_code'] != 0:
+                print(f"    📄 Log: {step['log']}")
+        
+        snapshot = server.snapshot()
+    
+    issue_step = steps['create_all_issues']
+    issues = issue_step['issues_created']
+    result = {
+        'profile': profile,
+        'env': overrides,
+        'success': all(step['exit_code'] == 0 for step in steps.values()),
+        'issues_created': issues,
+        'project_items': snapshot['project_items'],
+        'issues_per_sec': round(issues / issue_step['wall_time'], 2) if issue_step['wall_time'] else 0.0,
+        'requests_per_issue': round(issue_step['requests'] / issues, 2) if issues else None,
+        'wall_time': round(sum(step['wall_time'] for step in steps.values()), 3),
+        'requests_by_endpoint': snapshot['requests'],
+        'steps': steps,
+        'workspace': workspace
+    }
+    print(f"  📊 {issues} issues, {result['issues_per_sec']} issues/sec, "
+          f"{result['requests_per_issue']} requests/issue, {result['wall_time']:.2f}s total")
+    return result
+
+
+def compare_with_baseline(results: List[Dict], baseline_path: str, tolerance: float) -> bool:
+    """ベースラインと比較し、issues/sec が許容範囲内か判定"""
+    try:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = {entry['profile']: entry for entry in json.load(f)['results']}
+    except Exception as e:
+        print(f"⚠️ Could not load baseline {baseline_path}: {str(e)}")
+        return True
+    
+    print(f"\n📐 Comparing with baseline: {baseline_path} (tolerance {tolerance:.0%})")
+    ok = True
+    for result in results:
+        previous = baseline.get(result['profile'])
+        if not previous or not previous.get('issues_per_sec'):
+            continue
+        change = result['issues_per_sec'] / previous['issues_per_sec'] - 1
+        regressed = change < -tolerance
+        ok = ok and not regressed
+        status = '❌' if regressed else '✅'
+        print(f"  {status} {result['profile']}: {previous['issues_per_sec']} -> {result['issues_per_sec']} issues/sec ({change:+.1%})")
+    return ok
+
+
+def main(profiles: Optional[List[str]] = None) -> int:
+    """メイン処理"""
+    print("=" * 60)
+    print("⏱️ SETUP THROUGHPUT BENCHMARK")
+    print("=" * 60)
+    print(f"⏰ Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    profiles = profiles or list(PROFILES)
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        print(f"❌ Unknown profiles: {', '.join(unknown)} (available: {', '.join(PROFILES)})")
+        return 1
+    
+    latency = float(os.environ.get('BENCH_LATENCY', '0.05'))
+    scale = int(os.environ.get('BENCH_SCALE', '1'))
+    write_rate = os.environ.get('BENCH_WRITE_RATE', '100000')
+    output = os.environ.get('BENCH_OUTPUT', 'benchmark_result.json')
+    print(f"🌐 Fake server latency: {latency * 1000:.0f}ms, CSV scale: x{scale}")
+    
+    results = [run_profile(profile, PROFILES[profile], latency, write_rate, scale) for profile in profiles]
+    
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'latency': latency,
+            'scale': scale,
+            'results': results
+        }, f, ensure_ascii=False, indent=2)
+    
+    print(f"\n" + "=" * 60)
+    print("📊 BENCHMARK RESULTS")
+    print("=" * 60)
+    print(f"{'profile':<12}{'issues':>8}{'issues/s':>10}{'req/issue':>11}{'wall(s)':>10}")
+    for result in results:
+        print(f"{result['profile']:<12}{result['issues_created']:>8}{result['issues_per_sec']:>10}"
+              f"{str(result['requests_per_issue']):>11}{result['wall_time']:>10.2f}")
+    print(f"💾 Results saved to {output}")
+    
+    ok = all(result['success'] for result in results)
+    baseline = os.environ.get('BENCH_BASELINE')
+    if baseline:
+        ok = compare_with_baseline(results, baseline, float(os.environ.get('BENCH_TOLERANCE', '0.2'))) and ok
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv[1:]))
\ No newline at end of file
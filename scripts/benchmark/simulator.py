@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Issue作成の離散イベントシミュレーター
+実際の BatchProcessor / GitHubAPI / RateLimitGovernor / RetryPolicy を仮想時計の上で動かし、
+疑似GitHubモデル（レイテンシ分布・プライマリ/セカンダリレート制限・5xx）に対する
+実行時間とリクエスト数を数ミリ秒〜数秒で予測する（コホートごとのバッチ設定の検討用）
+
+使い方:
+  python scripts/benchmark/simulator.py [profile ...]
+
+環境変数:
+  SIM_SEED                   乱数シード（デフォルト 0、同じシードなら結果は同一）
+  SIM_ERROR_RATE             5xxを返す割合（デフォルト 0.005）
+  SIM_ACCEPTED_ON_ERROR      5xxでも書き込みが受理されている割合（デフォルト 0.5）
+  SIM_LATENCY_SCALE          レイテンシ分布の倍率（デフォルト 1.0）
+  SIM_CONTENT_LIMIT_PER_MINUTE / SIM_CONTENT_LIMIT_PER_HOUR
+                             コンテンツ作成のセカンダリレート制限（デフォルト 80 / 500）
+  SIM_OUTPUT                 予測結果JSONの出力先（指定時のみ）
+  SIM_VERBOSE                true の場合はセットアップスクリプトのログを表示
+  REQUEST_DELAY, BATCH_PAUSE, CREATION_MODE など Config の環境変数はそのまま反映される
+"""
+
+import io
+import os
+import sys
+import copy
+import json
+import math
+import time
+import random
+import contextlib
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# 共通ライブラリをインポート
+sys.path.append('scripts')
+from benchmark.fake_github_server import FakeGitHubServer, MUTATION_PATTERN
+from common.batch_processor import BatchProcessor
+from common.config import Config, IssueTypeConfig
+from common.csv_loader import CSVLoader
+from common.github_api import GitHubAPI
+from common.issue_processor import IssueProcessor
+from common.metrics import MetricsRecorder
+from common.node_registry import NodeRegistry
+from common.query_cache import QueryCache
+from common.rate_limiter import RateLimitGovernor
+from common.retry_policy import RetryPolicy
+from create_all_issues_smart import run_batch_mode
+
+# 比較する設定プロファイル（Config設定キー -> 値）
+PROFILES = {
+    'current': {},
+    'fixed_delay': {'adaptive_rate_limit': False},
+    'graphql': {'creation_mode': 'graphql'}
+}
+
+# シミュレーション上のAPIのURL（パスだけをモデルに渡す）
+SIMULATED_API_BASE = 'https://api.github.com'
+
+
+class VirtualClock:
+    """仮想時計（sleep は待たずに時刻を進める）"""
+    
+    def __init__(self, start: Optional[float] = None):
+        self.now = time.time() if start is None else start
+        self.started = self.now
+    
+    def time(self) -> float:
+        """現在の仮想時刻"""
+        return self.now
+    
+    def sleep(self, seconds: float):
+        """仮想時刻を進める"""
+        if seconds > 0:
+            self.now += seconds
+    
+    @property
+    def elapsed(self) -> float:
+        """開始からの経過秒数"""
+        return self.now - self.started
+
+
+class LatencyModel:
+    """レイテンシ分布（中央値 median・対数標準偏差 sigma の対数正規分布 + エイリアス1件あたりの追加時間）"""
+    
+    def __init__(self, median: float, sigma: float = 0.35, per_item: float = 0.0):
+        self.median = median
+        self.sigma = sigma
+        self.per_item = per_item
+    
+    def sample(self, rng: random.Random, items: int = 1, scale: float = 1.0) -> float:
+        """レイテンシを1つ生成"""
+        latency = rng.lognormvariate(math.log(self.median), self.sigma) + self.per_item * max(0, items - 1)
+        return latency * scale
+
+
+# リクエスト種別ごとのレイテンシ分布（github.com の実測に近い値）
+DEFAULT_LATENCY = {
+    'rest_read': LatencyModel(0.15, 0.3),
+    'rest_write': LatencyModel(0.45, 0.35),
+    'graphql_read': LatencyModel(0.35, 0.35),
+    'graphql_write': LatencyModel(0.5, 0.4, per_item=0.12)
+}
+
+
+class SimulatedTransport:
+    """PooledTransport と同じインターフェースで疑似GitHubモデルを直接呼び出すトランスポート
+    
+    ネットワークを使わず、リクエストごとにレイテンシ分だけ仮想時計を進める。
+    error_rate の割合で 502 を返し、そのうち accepted_on_error の割合は書き込みを受理済みにする。
+    """
+    
+    def __init__(self, model: FakeGitHubServer, clock: VirtualClock, rng: random.Random,
+                 latency: Dict[str, LatencyModel] = None, latency_scale: float = 1.0,
+                 error_rate: float = 0.0, accepted_on_error: float = 0.5):
+        self.model = model
+        self.clock = clock
+        self.rng = rng
+        self.latency = latency or DEFAULT_LATENCY
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.accepted_on_error = accepted_on_error
+        
+        self.session = None
+        self.http_cache = None
+        self.pool_maxsize = 1
+        self.requests = 0
+    
+    def _latency_kind(self, method: str, path: str, payload: Dict[str, Any]) -> tuple:
+        """(レイテンシ種別, エイリアス数) を判定"""
+        if path == '/graphql':
+            query = payload.get('query') or ''
+            if query.lstrip().startswith('mutation'):
+                return 'graphql_write', max(1, len(MUTATION_PATTERN.findall(query)))
+            return 'graphql_read', 1
+        return ('rest_write' if method == 'POST' else 'rest_read'), 1
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """疑似GitHubモデルにリクエストを送信"""
+        path = urlsplit(url).path
+        raw = kwargs.get('data') or b''
+        if kwargs.get('json') is not None:
+            raw = json.dumps(kwargs['json']).encode('utf-8')
+        payload = json.loads(raw) if raw else {}
+        
+        kind, items = self._latency_kind(method, path, payload)
+        self.clock.sleep(self.latency[kind].sample(self.rng, items, self.latency_scale))
+        self.requests += 1
+        
+        failed = self.rng.random() < self.error_rate
+        if failed and self.rng.random() >= self.accepted_on_error:
+            status, headers, body = 502, {}, {'message': 'Server Error'}
+            with self.model.lock:
+                self.model.requests[f"{method} {path}"] += 1
+        else:
+            token = ((kwargs.get('headers') or {}).get('Authorization') or '').split(' ')[-1]
+            status, headers, body = self.model.handle(method, path, payload, token)
+            if failed:
+                status, body = 502, {'message': 'Server Error'}
+        
+        encoded = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        with self.model.lock:
+            self.model.status_codes[status] += 1
+            self.model.bytes_in += len(raw)
+            self.model.bytes_out += len(encoded)
+        
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = 'utf-8'
+        response.url = url
+        response._content = encoded
+        response.request = SimpleNamespace(method=method, url=url, body=raw)
+        return response
+    
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """GETリクエストを送信"""
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """POSTリクエストを送信"""
+        return self.request('POST', url, **kwargs)
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """接続統計（シミュレーションでは1本の接続を再利用したものとみなす）"""
+        return {
+            'connections_opened': 1 if self.requests else 0,
+            'requests': self.requests,
+            'reused': max(0, self.requests - 1),
+            'reuse_ratio': round((self.requests - 1) / self.requests, 3) if self.requests else 0.0,
+            'hosts': {}
+        }
+    
+    def print_summary(self):
+        """接続統計の表示（シミュレーションでは何もしない）"""
+        pass
+    
+    def close(self):
+        """接続の解放（シミュレーションでは何もしない）"""
+        pass
+
+
+def load_config() -> Config:
+    """Config を作成（トークン・リポジトリが未設定の場合はシミュレーション用の値を一時的に使用）"""
+    defaults = {'TEAM_SETUP_TOKEN': 'simulated-token', 'GITHUB_REPOSITORY': 'bench/academy'}
+    missing = {name: value for name, value in defaults.items() if not os.environ.get(name)}
+    os.environ.update(missing)
+    try:
+        return Config()
+    finally:
+        for name in missing:
+            os.environ.pop(name, None)
+
+
+def simulate(config: Config = None,
+             overrides: Dict[str, Any] = None,
+             data_dir: str = 'data',
+             seed: int = 0,
+             error_rate: float = 0.005,
+             accepted_on_error: float = 0.5,
+             latency_scale: float = 1.0,
+             content_limit_per_minute: Optional[int] = 80,
+             content_limit_per_hour: Optional[int] = 500,
+             rate_limit: int = 5000,
+             graphql_limit: int = 5000,
+             verbose: bool = False) -> Dict[str, Any]:
+    """CSVと設定から create_all_issues_smart.py の実行をシミュレートし、予測結果を返す
+    
+    非同期クライアント・パイプライン・ジャーナルは無効化し、同期のバッチモードで実行する。
+    """
+    config = copy.copy(config or load_config())
+    config.settings = dict(config.settings, **(overrides or {}))
+    config.settings.update({'async_client': False, 'pipeline': False, 'journal_file': ''})
+    
+    clock = VirtualClock()
+    rng = random.Random(seed)
+    # RetryPolicy のジッターはモジュールの random を使うため、シードを固定して終了後に戻す
+    random_state = random.getstate()
+    random.seed(seed)
+    real_started = time.perf_counter()
+    
+    model = FakeGitHubServer(
+        rate_limit=rate_limit,
+        graphql_limit=graphql_limit,
+        content_limit_per_minute=content_limit_per_minute,
+        content_limit_per_hour=content_limit_per_hour,
+        clock=clock.time
+    )
+    transport = SimulatedTransport(model, clock, rng, latency_scale=latency_scale,
+                                   error_rate=error_rate, accepted_on_error=accepted_on_error)
+    
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sys.stdout if verbose else output):
+            issue_type_config = IssueTypeConfig('scripts/config/issue_types.json')
+            
+            # create_projects.py で作成済みのプロジェクトをモデル上に用意する
+            project_ids = {}
+            with model.lock:
+                for issue_type in ('task', 'kpt'):
+                    title = issue_type_config.get_project_name(issue_type)
+                    if title and title not in project_ids:
+                        result, _ = model._run_mutation('createProjectV2', {'title': title})
+                        project_ids[title] = result['projectV2']['id']
+            
+            metrics = MetricsRecorder(clock=clock.time, timer=clock.time, sleeper=clock.sleep)
+            github_api = GitHubAPI(
+                'simulated-token', model.repository,
+                RateLimitGovernor(**config.get_rate_limit_settings(), clock=clock.time, sleep=clock.sleep),
+                RetryPolicy(**config.get_retry_settings(), clock=clock.time),
+                metrics,
+                transport=transport,
+                query_cache=QueryCache(config.get_query_cache_ttl(), clock=clock.time),
+                registry=NodeRegistry('', model.repository, clock=clock.time)
+            )
+            github_api.api_base = SIMULATED_API_BASE
+            github_api.graphql_url = f"{SIMULATED_API_BASE}/graphql"
+            
+            github_api.check_initial_rate_limit()
+            issue_processor = IssueProcessor(issue_type_config)
+            batch_processor = BatchProcessor(
+                github_api,
+                config.get_batch_size(),
+                config.get_batch_pause(),
+                config.get_request_delay(),
+                config.is_adaptive_rate_limit(),
+                None,
+                link_batch_size=config.get_link_batch_size()
+            )
+            if config.get_creation_mode() == 'graphql':
+                batch_processor.enable_graphql_creation(
+                    project_ids, issue_type_config, config.get_graphql_create_batch_size()
+                )
+            
+            existing_index = github_api.fetch_existing_issues() if config.is_skip_existing_issues() else None
+            csv_sources = CSVLoader.get_csv_sources(data_dir)
+            row_selection = config.get_csv_row_selection()
+            results = run_batch_mode(
+                batch_processor, issue_processor, issue_type_config, project_ids,
+                csv_sources, existing_index, clock.time(),
+                CSVLoader.count_issue_rows(csv_sources, row_selection), row_selection
+            )
+    finally:
+        random.setstate(random_state)
+    
+    summary = metrics.summary()
+    snapshot = model.snapshot()
+    titles = [issue['title'] for issue in model.issues]
+    return {
+        'wall_seconds': round(clock.elapsed, 1),
+        'issues_total': results['total'],
+        'issues_created': snapshot['issues'],
+        'duplicates': len(titles) - len(set(titles)),
+        'failed': results['failed'],
+        'linked': results['task_linked'] + results['kpt_linked'],
+        'requests': snapshot['total_requests'],
+        'requests_by_endpoint': snapshot['requests'],
+        'status_codes': snapshot['status_codes'],
+        'retries': summary['retries'],
+        'api_seconds': summary['api_seconds'],
+        'sleep_seconds': {reason: entry['seconds'] for reason, entry in summary['sleeps'].items()},
+        'settings': {
+            'creation_mode': config.get_creation_mode(),
+            'adaptive_rate_limit': config.is_adaptive_rate_limit(),
+            'batch_size': config.get_batch_size(),
+            'batch_pause': config.get_batch_pause(),
+            'request_delay': config.get_request_delay(),
+            'write_rate_per_minute': config.get('write_rate_per_minute'),
+            'write_limit_per_hour': config.get('write_limit_per_hour'),
+            'link_batch_size': config.get_link_batch_size()
+        },
+        'model': {
+            'seed': seed,
+            'error_rate': error_rate,
+            'accepted_on_error': accepted_on_error,
+            'latency_scale': latency_scale,
+            'content_limit_per_minute': content_limit_per_minute,
+            'content_limit_per_hour': content_limit_per_hour,
+            'rate_limit': rate_limit
+        },
+        'simulated_in': round(time.perf_counter() - real_started, 3),
+        'log': output.getvalue() if not verbose else ''
+    }
+
+
+def _env_number(name: str, default: float, cast: Callable = float) -> Any:
+    """数値の環境変数を取得（空文字・不正値の場合はデフォルト）"""
+    try:
+        return cast(os.environ.get(name) or default)
+    except ValueError:
+        print(f"⚠️ Invalid value for {name}: {os.environ.get(name)}")
+        return default
+
+
+def simulation_options() -> Dict[str, Any]:
+    """SIM_* 環境変数からモデルのパラメータを取得"""
+    return {
+        'seed': _env_number('SIM_SEED', 0, int),
+        'error_rate': _env_number('SIM_ERROR_RATE', 0.005),
+        'accepted_on_error': _env_number('SIM_ACCEPTED_ON_ERROR', 0.5),
+        'latency_scale': _env_number('SIM_LATENCY_SCALE', 1.0),
+        'content_limit_per_minute': _env_number('SIM_CONTENT_LIMIT_PER_MINUTE', 80, int),
+        'content_limit_per_hour': _env_number('SIM_CONTENT_LIMIT_PER_HOUR', 500, int),
+        'verbose': os.environ.get('SIM_VERBOSE', '').strip().lower() in ('1', 'true', 'yes', 'on')
+    }
+
+
+def main(profiles: Optional[List[str]] = None) -> int:
+    """メイン処理"""
+    print("=" * 60)
+    print("🔮 ISSUE CREATION SIMULATION")
+    print("=" * 60)
+    print(f"⏰ Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    profiles = profiles or list(PROFILES)
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        print(f"❌ Unknown profiles: {', '.join(unknown)} (available: {', '.join(PROFILES)})")
+        return 1
+    
+    options = simulation_options()
+    print(f"🎲 Seed: {options['seed']}, 5xx rate: {options['error_rate']:.1%}, "
+          f"content limit: {options['content_limit_per_minute']}/min, {options['content_limit_per_hour']}/h")
+    
+    config = load_config()
+    forecasts = {}
+    for profile in profiles:
+        forecast = simulate(config, PROFILES[profile], **options)
+        forecast.pop('log', None)
+        forecasts[profile] = forecast
+    
+    print(f"\n{'profile':<14}{'issues':>8}{'requests':>10}{'retries':>9}{'403':>6}{'5xx':>6}{'forecast':>12}{'sim(s)':>8}")
+    for profile, forecast in forecasts.items():
+        codes = forecast['status_codes']
+        server_errors = sum(count for code, count in codes.items() if code.startswith('5'))
+        minutes, seconds = divmod(int(forecast['wall_seconds']), 60)
+        print(f"{profile:<14}{forecast['issues_created']:>8}{forecast['requests']:>10}{forecast['retries']:>9}"
+              f"{codes.get('403', 0):>6}{server_errors:>6}{f'{minutes}m {seconds:02d}s':>12}{forecast['simulated_in']:>8.2f}")
+        if forecast['duplicates'] or forecast['failed']:
+            print(f"  ⚠️ {profile}: {forecast['duplicates']} duplicates, {forecast['failed']} failed")
+    
+    output = os.environ.get('SIM_OUTPUT')
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'forecasts': forecasts},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 Forecast saved to {output}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv[1:]))
\ No newline at end of file
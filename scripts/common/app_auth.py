@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+GitHub App認証の共通モジュール
+秘密鍵で署名したJWTでインストールトークンを発行し、有効期限の直前までキャッシュして再利用する
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+try:
+    import jwt
+except ImportError:  # PyJWT は GitHub App 認証の利用時のみ必要
+    jwt = None
+
+
+class AppInstallationAuth:
+    """GitHub App インストールトークン管理クラス
+    
+    トークンは有効期限の refresh_margin 秒前（有効期間が短い場合はその半分の時点）まで再利用し、
+    期限が近づいたら1つのスレッドだけが再発行する。
+    installation_id を省略した場合は、リポジトリのインストールIDをJWTで取得する。
+    """
+    
+    # JWTの有効期間（GitHubの上限は10分、時計のずれに備えて発行時刻を60秒前にする）
+    JWT_LIFETIME = 540
+    JWT_BACKDATE = 60
+    
+    def __init__(self, app_id: str, private_key: str,
+                 installation_id: Optional[str] = None,
+                 repository: Optional[str] = None,
+                 api_base: str = 'https://api.github.com',
+                 refresh_margin: float = 300.0,
+                 http: Any = None,
+                 clock: Callable[[], float] = time.time):
+        if jwt is None:
+            raise ImportError("PyJWT is required for GitHub App authentication (pip install 'PyJWT[crypto]')")
+        if not installation_id and not repository:
+            raise ValueError("GitHub App authentication needs an installation ID or a repository")
+        
+        self.app_id = str(app_id)
+        self.private_key = private_key
+        self.installation_id = str(installation_id) if installation_id else None
+        self.repository = repository
+        self.api_base = api_base.rstrip('/')
+        self.refresh_margin = refresh_margin
+        self.http = http or requests
+        self.clock = clock
+        
+        self.lock = threading.Lock()
+        self.cached_token: Optional[str] = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.minted = 0
+    
+    @classmethod
+    def from_environment(cls, repository: str = None, http: Any = None) -> Optional['AppInstallationAuth']:
+        """GITHUB_APP_ID・GITHUB_APP_PRIVATE_KEY（または GITHUB_APP_PRIVATE_KEY_FILE）から作成（未設定の場合は None）"""
+        app_id = os.environ.get('GITHUB_APP_ID')
+        private_key = os.environ.get('GITHUB_APP_PRIVATE_KEY', '').replace('\\n', '\n')
+        key_file = os.environ.get('GITHUB_APP_PRIVATE_KEY_FILE')
+        if not app_id:
+            return None
+        
+        if not private_key and key_file:
+            with open(key_file, 'r', encoding='utf-8') as f:
+                private_key = f.read()
+        if not private_key:
+            raise ValueError("GITHUB_APP_PRIVATE_KEY or GITHUB_APP_PRIVATE_KEY_FILE is required with GITHUB_APP_ID")
+        
+        return cls(
+            app_id,
+            private_key,
+            installation_id=os.environ.get('GITHUB_APP_INSTALLATION_ID') or None,
+            repository=repository or os.environ.get('GITHUB_REPOSITORY'),
+            api_base=os.environ.get('GITHUB_API_URL', 'https://api.github.com'),
+            http=http
+        )
+    
+    def create_jwt(self) -> str:
+        """App自身として認証するJWTを作成（RS256）"""
+        now = int(self.clock())
+        payload = {
+            'iat': now - self.JWT_BACKDATE,
+            'exp': now + self.JWT_LIFETIME,
+            'iss': self.app_id
+        }
+        token = jwt.encode(payload, self.private_key, algorithm='RS256')
+        # PyJWT 1.x は bytes を返す
+        return token.decode('ascii') if isinstance(token, bytes) else token
+    
+    def _app_headers(self) -> Dict[str, str]:
+        """JWTで認証するリクエストのヘッダー"""
+        return {
+            'Authorization': f'Bearer {self.create_jwt()}',
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28'
+        }
+    
+    def _find_installation_id(self) -> str:
+        """リポジトリにインストールされたAppのインストールIDを取得"""
+        response = self.http.get(f"{self.api_base}/repos/{self.repository}/installation",
+                                 headers=self._app_headers(), timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"GitHub App is not installed on {self.repository}: "
+                               f"{response.status_code} - {response.text[:200]}")
+        return str(response.json()['id'])
+    
+    @staticmethod
+    def _parse_expiry(expires_at: str) -> float:
+        """expires_at（例: 2016-07-11T22:14:10Z）をUNIX時刻に変換"""
+        parsed = datetime.strptime(expires_at, '%Y-%m-%dT%H:%M:%SZ')
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+    
+    def _mint(self):
+        """インストールトークンを発行してキャッシュ"""
+        if self.installation_id is None:
+            self.installation_id = self._find_installation_id()
+        
+        response = self.http.post(f"{self.api_base}/app/installations/{self.installation_id}/access_tokens",
+                                  headers=self._app_headers(), timeout=30)
+        if response.status_code != 201:
+            raise RuntimeError(f"Could not create installation token: "
+                               f"{response.status_code} - {response.text[:200]}")
+        
+        data = response.json()
+        expires_at = self._parse_expiry(data['expires_at'])
+        # ロック外で読まれても古いトークンに新しい期限が付かない順に更新する
+        self.cached_token = data['token']
+        self.expires_at = expires_at
+        self.refresh_at = expires_at - min(self.refresh_margin, max(0.0, expires_at - self.clock()) / 2)
+        self.minted += 1
+        expires = datetime.fromtimestamp(self.expires_at).strftime('%H:%M:%S')
+        print(f"🔐 GitHub App installation token issued (installation {self.installation_id}, expires at {expires})")
+    
+    def token(self) -> str:
+        """有効なインストールトークンを取得（期限が近い場合は再発行）"""
+        if self.cached_token and self.clock() < self.refresh_at:
+            return self.cached_token
+        with self.lock:
+            # 待っている間に他のスレッドが再発行した場合はそれを使う
+            if not self.cached_token or self.clock() >= self.refresh_at:
+                self._mint()
+            return self.cached_token
+    
+    def invalidate(self, token: Optional[str] = None):
+        """キャッシュしたトークンを破棄（次の token() で再発行する）
+        
+        token を指定した場合は、それが現在のトークンのときだけ破棄する（他のスレッドが再発行済みならそれを使う）。
+        """
+        with self.lock:
+            if token is not None and token != self.cached_token:
+                return
+            self.cached_token = None
+            self.expires_at = 0.0
+            self.refresh_at = 0.0
\ No newline at end of file
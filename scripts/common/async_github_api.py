@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+非同期GitHub API操作の共通モジュール
+asyncio + httpx による同時実行数制限付きクライアント（HTTP/2多重化に対応）
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Any, Tuple
+
+try:
+    import httpx
+except ImportError:  # httpx は非同期モード利用時のみ必要
+    httpx = None
+
+from .github_api import GitHubAPI
+from .graphql_batch import (
+    build_aliased_mutation, map_alias_results, has_partial_results, calculate_batch_size, split_batches
+)
+from .metrics import graphql_operation, SLEEP_BACKOFF, SLEEP_RATE_LIMIT
+from .query_cache import TAG_REPOSITORY, TAG_PROJECTS
+from .retry_policy import AUTH_FAILURE, PRIMARY_RATE_LIMIT
+from .token_pool import TokenIdentity
+
+
+def is_http2_available() -> bool:
+    """HTTP/2に必要なh2パッケージが利用可能か"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncGitHubAPI:
+    """非同期GitHub API操作クラス
+    
+    GitHubAPI と同じトークンプール・レート制限ガバナーを共有し、
+    セマフォで同時実行数を制限しながらリクエストを並行実行する。
+    Issue作成などの書き込みは write_concurrency で別途制限する（1の場合は作成順を保持）。
+    """
+    
+    def __init__(self, github_api: GitHubAPI,
+                 max_concurrency: int = 8,
+                 write_concurrency: int = 1,
+                 http2: bool = True,
+                 timeout: float = 30.0):
+        if httpx is None:
+            raise ImportError("httpx is required for AsyncGitHubAPI (pip install 'httpx[http2]')")
+        
+        self.github_api = github_api
+        self.rate_limiter = github_api.rate_limiter
+        self.token_pool = github_api.token_pool
+        self.retry_policy = github_api.retry_policy
+        self.metrics = github_api.metrics
+        self.repository = github_api.repository
+        self.max_concurrency = max(1, max_concurrency)
+        self.write_concurrency = max(1, min(write_concurrency, self.max_concurrency))
+        self.timeout = timeout
+        
+        self.http2 = http2 and is_http2_available()
+        if http2 and not self.http2:
+            print("⚠️ h2 package not installed. Falling back to HTTP/1.1 for async client.")
+        
+        # イベントループ内で生成する
+        self.client = None
+        self.semaphore = None
+        self.write_semaphore = None
+    
+    async def __aenter__(self) -> 'AsyncGitHubAPI':
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency
+        )
+        self.client = httpx.AsyncClient(http2=self.http2, limits=limits, timeout=self.timeout)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.write_semaphore = asyncio.Semaphore(self.write_concurrency)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.client is not None:
+            await self.client.aclose()
+        self.client = None
+    
+    def _select(self, resource: str, write: bool) -> Tuple[TokenIdentity, float]:
+        """トークンを選び、ガバナーの待機時間を取得（ロック・レート制限台帳・トークン発行でブロックするため別スレッドで実行）"""
+        identity = self.token_pool.select(resource, write=write)
+        delay = identity.rate_limiter.acquire(resource, write)
+        if identity.auth is not None:
+            identity.auth.token()
+        return identity, delay
+    
+    async def _pace(self, resource: str, write: bool = False) -> TokenIdentity:
+        """残り予算が最も多いトークンを選び、そのガバナーに従って非同期に待機"""
+        identity, delay = await asyncio.to_thread(self._select, resource, write)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self.metrics.record_sleep(SLEEP_RATE_LIMIT, delay)
+            if identity.auth is not None:
+                # 待機中に再発行の時刻を過ぎた場合もイベントループ外で発行する
+                await asyncio.to_thread(identity.auth.token)
+        return identity
+    
+    async def _backoff(self, endpoint: str, decision: Any, resource: str = 'core',
+                       identity: TokenIdentity = None, write: bool = False):
+        """リトライ前に非同期に待機し、リトライと待機時間を記録（別のトークンに切り替えられる場合は待機しない）"""
+        self.metrics.record_retry(endpoint, decision.kind)
+        if (decision.kind == PRIMARY_RATE_LIMIT and identity is not None
+                and self.token_pool.can_rotate(resource, identity, write)):
+            print(f"  🔁 {identity.name} exhausted ({resource}), switching token")
+            return
+        await asyncio.sleep(decision.delay)
+        self.metrics.record_sleep(SLEEP_BACKOFF, decision.delay)
+    
+    async def create_issue(self, issue_data: Dict[str, Any],
+                           index: int, total: int, issue_type: str) -> Optional[Dict[str, Any]]:
+        """単一のIssueを作成（リトライポリシーに従って再試行）"""
+        url = f"{self.github_api.api_base}/repos/{self.repository}/issues"
+        body = self.github_api.payload_encoder.encode(issue_data)
+        reauthenticated = False
+        
+        async with self.write_semaphore:
+            for attempt in range(self.retry_policy.max_retries):
+                started = self.metrics.timer()
+                identity = None
+                try:
+                    async with self.semaphore:
+                        identity = await self._pace('core', write=True)
+                        started = self.metrics.timer()
+                        response = await self.client.post(
+                            url, content=body, headers=identity.rest_json_headers
+                        )
+                    self.metrics.record_response(GitHubAPI.ISSUES_ENDPOINT, response, self.metrics.timer() - started)
+                    await asyncio.to_thread(self.github_api.check_rate_limit_headers, response, identity)
+                    
+                    if response.status_code == 201:
+                        if attempt > 0:
+                            print(f"  ✅ {issue_type} ({index + 1}/{total}) [retry {attempt}]: {issue_data['title'][:50]}...")
+                        else:
+                            print(f"  ✅ {issue_type} ({index + 1}/{total}): {issue_data['title'][:50]}...")
+                        return response.json()
+                    
+                    decision = self.retry_policy.evaluate(response.status_code, response.headers, response.text, attempt)
+                
+                except Exception as e:
+                    self.metrics.record_request(GitHubAPI.ISSUES_ENDPOINT, 'error', self.metrics.timer() - started)
+                    decision = self.retry_policy.evaluate_exception(e, attempt)
+                
+                # インストールトークンが拒否された場合は再発行して1回だけ再送
+                if decision.kind == AUTH_FAILURE and not reauthenticated and identity.reauthenticate(response):
+                    reauthenticated = True
+                    continue
+                
+                if not decision.retry:
+                    print(f"  ❌ {issue_type} failed ({index + 1}/{total}) [{decision.kind}]: {decision.reason}")
+                    break
+                
+                # 書き込みが受理済みの可能性がある場合は再送前に重複を確認
+                if decision.ambiguous and self.github_api.issue_index is not None:
+                    existing = await asyncio.to_thread(
+                        self.github_api.find_recently_created_issue, issue_data, issue_type
+                    )
+                    if existing:
+                        print(f"  ♻️ {issue_type} ({index + 1}/{total}) already created (#{existing.get('number')}): {issue_data['title'][:50]}...")
+                        return existing
+                
+                print(f"  ⏳ {decision.kind} ({index + 1}/{total}) [attempt {attempt + 1}], waiting {decision.delay:.0f}s...")
+                await self._backoff(GitHubAPI.ISSUES_ENDPOINT, decision, 'core', identity, write=True)
+        
+        return None
+    
+    async def _post_graphql(self, payload: Dict, timeout: int = 30, write: bool = False,
+                            idempotent: bool = True) -> Optional[Dict]:
+        """GraphQL APIにPOSTし、リトライポリシーに従って再試行したレスポンス全体を返す"""
+        endpoint = f"POST /graphql {graphql_operation(payload.get('query'))}"
+        body = self.github_api.payload_encoder.encode(payload)
+        reauthenticated = False
+        
+        for attempt in range(self.retry_policy.max_retries):
+            started = self.metrics.timer()
+            identity = None
+            try:
+                async with self.semaphore:
+                    identity = await self._pace('graphql', write=write)
+                    started = self.metrics.timer()
+                    response = await self.client.post(
+                        self.github_api.graphql_url,
+                        content=body,
+                        headers=identity.graphql_headers,
+                        timeout=timeout
+                    )
+                self.metrics.record_response(endpoint, response, self.metrics.timer() - started)
+                await asyncio.to_thread(identity.rate_limiter.update, response.headers, 'graphql')
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    if not data.get('errors'):
+                        return data
+                    decision = self.retry_policy.evaluate_graphql(data['errors'], response.headers, attempt)
+                    # 一部が成功した書き込みは再送すると成功分が重複するため、そのまま返す
+                    if not decision.retry or (not idempotent and has_partial_results(data)):
+                        return data
+                else:
+                    decision = self.retry_policy.evaluate(response.status_code, response.headers, response.text, attempt)
+                    # インストールトークンが拒否された場合は再発行して1回だけ再送
+                    if decision.kind == AUTH_FAILURE and not reauthenticated and identity.reauthenticate(response):
+                        reauthenticated = True
+                        continue
+                    if not decision.retry or (decision.ambiguous and not idempotent):
+                        print(f"❌ GraphQL Error [{decision.kind}]: {response.status_code} - {response.text[:200]}")
+                        return None
+            
+            except Exception as e:
+                self.metrics.record_request(endpoint, 'error', self.metrics.timer() - started)
+                decision = self.retry_policy.evaluate_exception(e, attempt)
+                if not decision.retry or not idempotent:
+                    print(f"❌ GraphQL Request Exception: {str(e)}")
+                    return None
+            
+            print(f"  ⏳ GraphQL {decision.kind} [attempt {attempt + 1}], waiting {decision.delay:.0f}s...")
+            await self._backoff(endpoint, decision, 'graphql', identity, write=write)
+        
+        return None
+    
+    async def graphql_request(self, query: str, variables: Dict = None, timeout: int = 30) -> Dict:
+        """GraphQL APIリクエスト実行"""
+        payload = {'query': query}
+        if variables:
+            payload['variables'] = variables
+        
+        is_mutation = query.lstrip().startswith('mutation')
+        
+        data = await self._post_graphql(payload, timeout, write=is_mutation, idempotent=not is_mutation)
+        if data is None:
+            return {}
+        
+        if 'errors' in data:
+            print(f"❌ GraphQL Errors: {data['errors']}")
+            return {}
+        
+        return data.get('data') or {}
+    
+    async def add_issue_to_project(self, project_id: str, issue: Dict[str, Any]) -> Optional[str]:
+        """IssueをProjectに追加し、アイテムIDを返す"""
+        payload = {
+            'query': GitHubAPI.ADD_PROJECT_ITEM_MUTATION,
+            'variables': {
+                'projectId': project_id,
+                'contentId': issue['node_id']
+            }
+        }
+        
+        data = await self._post_graphql(payload)
+        if data and not data.get('errors') and data.get('data'):
+            return data['data']['addProjectV2ItemById']['item']['id']
+        return None
+    
+    async def graphql_request_full(self, query: str, variables: Dict = None, timeout: int = 30) -> Optional[Dict]:
+        """GraphQL APIリクエストを実行し、data と errors を含むレスポンス全体を返す"""
+        payload = {'query': query}
+        if variables:
+            payload['variables'] = variables
+        
+        return await self._post_graphql(payload, timeout)
+    
+    async def add_issues_to_project_batch(self, project_id: str, issues: List[Dict[str, Any]],
+                                          batch_size: int = 50) -> List[Optional[str]]:
+        """複数のIssueをエイリアス付きミューテーションでProjectに一括追加（バッチは並行送信）"""
+        batch_size = calculate_batch_size(batch_size)
+        
+        async def send(batch: List[Dict[str, Any]]) -> List[Optional[str]]:
+            inputs = [{'projectId': project_id, 'contentId': issue['node_id']} for issue in batch]
+            query, variables, aliases = build_aliased_mutation(
+                'addProjectV2ItemById', 'AddProjectV2ItemByIdInput', inputs, 'item { id }'
+            )
+            data = await self.graphql_request_full(query, variables, timeout=60)
+            results, errors = map_alias_results(data, aliases)
+            
+            item_ids = []
+            for issue, alias, result in zip(batch, aliases, results):
+                if result and result.get('item'):
+                    item_ids.append(result['item']['id'])
+                else:
+                    print(f"    ❌ Link failed for #{issue.get('number', '?')}: {errors.get(alias)}")
+                    item_ids.append(None)
+            return item_ids
+        
+        batch_results = await asyncio.gather(*[send(batch) for batch in split_batches(issues, batch_size)])
+        return [item_id for batch_ids in batch_results for item_id in batch_ids]
+    
+    async def get_repository_info(self) -> Optional[Dict]:
+        """リポジトリ情報と既存プロジェクトを取得（レジストリに有効な記録があればそれを使用）"""
+        registry = self.github_api.registry
+        repo_info = registry.repository_info()
+        if repo_info:
+            return repo_info
+        
+        variables = {
+            'owner': self.github_api.owner,
+            'name': self.github_api.repo_name
+        }
+        
+        # 同期クライアントと結果キャッシュを共有する
+        cache = self.github_api.query_cache
+        result = cache.get(GitHubAPI.REPOSITORY_INFO_QUERY, variables)
+        if result is None:
+            result = await self.graphql_request(GitHubAPI.REPOSITORY_INFO_QUERY, variables)
+            cache.set(GitHubAPI.REPOSITORY_INFO_QUERY, variables, result, [TAG_REPOSITORY, TAG_PROJECTS])
+        repo_info = GitHubAPI.parse_repository_info(result)
+        if repo_info:
+            registry.record_repository_info(repo_info)
+        return repo_info
\ No newline at end of file
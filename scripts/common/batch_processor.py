@@ -5,22 +5,130 @@
 
 import time
 import math
-from typing import Dict, List, Tuple, Optional, Any
+import asyncio
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .github_api import GitHubAPI
+from .issue_processor import compute_fingerprint
+from .metrics import SLEEP_BATCH_PAUSE, SLEEP_BACKOFF, SLEEP_LINK_SPACING
+from .rate_limiter import HOURLY_WINDOW
 
 
 class BatchProcessor:
     """バッチ処理クラス"""
     
-    def __init__(self, github_api: GitHubAPI, 
+    def __init__(self, github_api: GitHubAPI,
                  batch_size: int = 10,
                  batch_pause: float = 15.0,
-                 request_delay: float = 1.0):
+                 request_delay: float = 1.0,
+                 adaptive_pacing: bool = False,
+                 async_api: Any = None,
+                 link_batch_size: int = 50,
+                 journal: Any = None):
         self.github_api = github_api
+        # 待機時間はGitHubAPIと共有のメトリクスに理由別で記録
+        self.metrics = github_api.metrics
         self.batch_size = batch_size
         self.batch_pause = batch_pause
         self.request_delay = request_delay
+        # Trueの場合は固定スリープの代わりにレート制限ガバナーでペーシング
+        self.adaptive_pacing = adaptive_pacing
+        # AsyncGitHubAPIが指定された場合は作成・リンクを並行実行
+        self.async_api = async_api
+        # 1回のGraphQLリクエストでリンクするIssue数（1以下の場合は1件ずつリンク）
+        self.link_batch_size = link_batch_size
+        # GraphQL一括作成モードの設定（enable_graphql_creationで設定）
+        self.graphql_context: Optional[Dict[str, Any]] = None
+        # RunJournalが指定された場合は作成・リンク状態を記録し、再実行時に完了分をスキップ
+        self.journal = journal
+        self.resumed_count = 0
+    
+    def enable_graphql_creation(self, project_ids: Dict[str, str],
+                                issue_type_config: Any, batch_size: int = 10) -> bool:
+        """createIssueミューテーションによる一括作成モードを有効化（作成と同時にProjectへ追加）"""
+        repo_info = self.github_api.get_repository_info()
+        if not repo_info:
+            print("⚠️ Failed to get repository info. Falling back to REST issue creation.")
+            return False
+        
+        project_ids_by_type = {}
+        for issue_type in issue_type_config.get_all_issue_types():
+            project_id = project_ids.get(issue_type_config.get_project_name(issue_type))
+            if project_id:
+                project_ids_by_type[issue_type] = project_id
+        
+        self.graphql_context = {
+            'repository_id': repo_info['repository_id'],
+            'project_ids_by_type': project_ids_by_type,
+            'batch_size': batch_size
+        }
+        print(f"🧬 GraphQL batch creation enabled ({batch_size} issues per request, "
+              f"{len(project_ids_by_type)} projects attached on create)")
+        return True
+    
+    def _record_created(self, issue_data: Dict, issue_type: str, issue: Dict):
+        """作成したIssueをジャーナルに記録"""
+        if not self.journal:
+            return
+        fingerprint = compute_fingerprint(issue_data, issue_type)
+        issue['_fingerprint'] = fingerprint
+        self.journal.record_created(fingerprint, issue_type, issue)
+    
+    def _record_linked(self, issue: Dict, item_id: Optional[str]):
+        """Projectへのリンクをジャーナルに記録"""
+        if self.journal and item_id:
+            self.journal.record_linked(issue.get('_fingerprint') or issue.get('fingerprint'), item_id)
+    
+    def _is_linked(self, issue: Dict) -> bool:
+        """ジャーナル上でリンク済みかを判定"""
+        fingerprint = issue.get('_fingerprint') or issue.get('fingerprint')
+        return bool(self.journal and self.journal.is_linked(fingerprint))
+    
+    def skip_completed_requests(self, all_requests: List[Tuple]) -> Tuple[List[Tuple], List[Dict]]:
+        """ジャーナルで作成済みのリクエストを除外し、(未処理リクエスト, 作成済みIssue) を返す"""
+        if not self.journal:
+            return all_requests, []
+        
+        pending_requests = []
+        resumed_issues = []
+        for issue_data, issue_type in all_requests:
+            fingerprint = compute_fingerprint(issue_data, issue_type)
+            if self.journal.is_created(fingerprint):
+                resumed_issues.append(self.journal.get_issue(fingerprint))
+            else:
+                pending_requests.append((issue_data, issue_type))
+        
+        if resumed_issues:
+            print(f"⏭️ Resuming from journal: {len(resumed_issues)} issues already created, {len(pending_requests)} remaining")
+        self.resumed_count = len(resumed_issues)
+        return pending_requests, resumed_issues
+    
+    def _drop_already_created(self, failed_issues: List[Tuple], created: List[Dict],
+                              full_sweep: bool = True) -> List[Tuple]:
+        """既存Issueインデックスで作成済みと判明したリクエストを除外し、created に追加
+        
+        full_sweep=True の場合は全Issueを再取得する（最初のリトライは全バッチの後に行うため、
+        失敗扱いのリクエストが実行の序盤に受理されている場合もある）。False の場合は直近のIssueのみ取得する。
+        """
+        if self.github_api.issue_index is None or not failed_issues:
+            return failed_issues
+        
+        if full_sweep:
+            self.github_api.refresh_all_issues()
+        else:
+            self.github_api.refresh_recent_issues(len(failed_issues) + 20)
+        
+        still_failed = []
+        for issue_data, issue_type in failed_issues:
+            existing = self.github_api.issue_index.find(issue_data, issue_type)
+            if existing:
+                print(f"  ♻️ Already created (#{existing.get('number')}): {issue_data['title'][:50]}...")
+                self._record_created(issue_data, issue_type, existing)
+                created.append(existing)
+            else:
+                still_failed.append((issue_data, issue_type))
+        return still_failed
     
     def calculate_batches(self, total_count: int) -> int:
         """必要なバッチ数を計算"""
@@ -30,9 +138,21 @@ class BatchProcessor:
         """完了予想時刻を計算"""
         batches = self.calculate_batches(total_issues)
         
-        time_per_issue = self.request_delay
-        time_for_issues = total_issues * time_per_issue
-        time_for_batch_pauses = (batches - 1) * self.batch_pause
+        if self.adaptive_pacing:
+            # バースト分は即時、それ以降はコンテンツ作成レートで律速
+            governor = self.github_api.rate_limiter
+            paced_issues = max(0, total_issues - governor.write_burst)
+            time_for_issues = paced_issues / governor.write_rate
+            # 時間単位の上限を超える分は、上限件数ごとに1時間待ってから同じレートで作成
+            if governor.write_limit_per_hour and total_issues > governor.write_limit_per_hour:
+                hours = (total_issues - 1) // governor.write_limit_per_hour
+                last_hour_issues = total_issues - hours * governor.write_limit_per_hour
+                time_for_issues = hours * HOURLY_WINDOW + max(0, last_hour_issues - governor.write_burst) / governor.write_rate
+            time_for_batch_pauses = 0.0
+        else:
+            time_per_issue = self.request_delay
+            time_for_issues = total_issues * time_per_issue
+            time_for_batch_pauses = (batches - 1) * self.batch_pause
         
         total_seconds = time_for_issues + time_for_batch_pauses
         minutes = int(total_seconds // 60)
@@ -41,26 +161,54 @@ class BatchProcessor:
         print(f"⏱️ Estimated completion time: {minutes}m {seconds}s ({batches} batches)")
         return total_seconds
     
-    def create_issues_batch(self, issues_data: List[Tuple], 
+    def create_issues_batch(self, issues_data: List[Tuple],
                            batch_num: int, total_batches: int,
                            start_time: float = None) -> Tuple[List[Dict], List[Tuple]]:
         """1つのバッチでIssueを作成（失敗したものを返す）"""
+        if not issues_data:
+            return [], []
+        
+        print(f"🚀 Processing batch {batch_num}/{total_batches} ({len(issues_data)} issues)")
+        
+        created_issues, failed_issues = self.create_issues_chunk(issues_data)
+        
+        print(f"📊 Batch {batch_num} result: {len(created_issues)}/{len(issues_data)} issues created, {len(failed_issues)} failed")
+        return created_issues, failed_issues
+    
+    def create_issues_chunk(self, issues_data: List[Tuple]) -> Tuple[List[Dict], List[Tuple]]:
+        """Issueを作成してジャーナルに記録（作成モードに応じてREST/GraphQLを使い分け）"""
         created_issues = []
         failed_issues = []
         
-        if not issues_data:
+        if self.graphql_context:
+            try:
+                outcomes = self.github_api.create_issues_graphql(
+                    issues_data,
+                    self.graphql_context['repository_id'],
+                    self.graphql_context['project_ids_by_type'],
+                    self.graphql_context['batch_size']
+                )
+                # 結果はリクエストごとに (Issue作成用データ, Issue種別, 作成されたIssue) で返る
+                for issue_data, issue_type, issue in outcomes:
+                    if issue:
+                        self._record_created(issue_data, issue_type, issue)
+                        created_issues.append(issue)
+                    else:
+                        failed_issues.append((issue_data, issue_type))
+            except Exception as e:
+                print(f"  ❌ Exception: {str(e)}")
+                created_issues, failed_issues = [], list(issues_data)
             return created_issues, failed_issues
         
-        print(f"🚀 Processing batch {batch_num}/{total_batches} ({len(issues_data)} issues)")
-        
         # シーケンシャル実行（順番保持のため）
         for i, (issue_data, issue_type) in enumerate(issues_data):
             try:
                 issue = self.github_api.create_issue(
                     issue_data, i, len(issues_data), issue_type,
-                    request_delay=self.request_delay
+                    request_delay=0.0 if self.adaptive_pacing else self.request_delay
                 )
                 if issue:
+                    self._record_created(issue_data, issue_type, issue)
                     created_issues.append(issue)
                 else:
                     failed_issues.append((issue_data, issue_type))
@@ -68,40 +216,133 @@ class BatchProcessor:
                 print(f"  ❌ Exception: {str(e)}")
                 failed_issues.append((issue_data, issue_type))
         
+        return created_issues, failed_issues
+    
+    async def create_issues_batch_async(self, issues_data: List[Tuple],
+                                        batch_num: int, total_batches: int) -> Tuple[List[Dict], List[Tuple]]:
+        """1つのバッチでIssueを並行作成（失敗したものを返す）"""
+        created_issues = []
+        failed_issues = []
+        
+        if not issues_data:
+            return created_issues, failed_issues
+        
+        print(f"🚀 Processing batch {batch_num}/{total_batches} ({len(issues_data)} issues, async)")
+        
+        # 書き込みの同時実行数はAsyncGitHubAPI側で制限（1の場合は作成順を保持）
+        tasks = [
+            self.async_api.create_issue(issue_data, i, len(issues_data), issue_type)
+            for i, (issue_data, issue_type) in enumerate(issues_data)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for (issue_data, issue_type), result in zip(issues_data, results):
+            if isinstance(result, Exception):
+                print(f"  ❌ Exception: {str(result)}")
+                failed_issues.append((issue_data, issue_type))
+            elif result:
+                self._record_created(issue_data, issue_type, result)
+                created_issues.append(result)
+            else:
+                failed_issues.append((issue_data, issue_type))
+        
         print(f"📊 Batch {batch_num} result: {len(created_issues)}/{len(issues_data)} issues created, {len(failed_issues)} failed")
         return created_issues, failed_issues
     
-    def process_all_batches(self, all_requests: List[Tuple],
-                           start_time: float = None) -> Tuple[List[Dict], List[Tuple]]:
-        """全バッチを処理"""
+    async def _process_all_batches_async(self, all_requests: List[Tuple]) -> Tuple[List[Dict], List[Tuple]]:
+        """全バッチを非同期クライアントで処理"""
+        total_batches = self.calculate_batches(len(all_requests))
+        all_created_issues = []
+        all_failed_issues = []
+        
+        async with self.async_api:
+            for batch_num in range(total_batches):
+                start_idx = batch_num * self.batch_size
+                end_idx = min(start_idx + self.batch_size, len(all_requests))
+                
+                print(f"\n🔄 Batch {batch_num + 1}/{total_batches}: Processing issues {start_idx + 1}-{end_idx}")
+                
+                batch_created, batch_failed = await self.create_issues_batch_async(
+                    all_requests[start_idx:end_idx], batch_num + 1, total_batches
+                )
+                all_created_issues.extend(batch_created)
+                all_failed_issues.extend(batch_failed)
+                
+                if batch_num < total_batches - 1 and not self.adaptive_pacing:
+                    print(f"  ⏳ Batch pause ({self.batch_pause}s)...")
+                    await asyncio.sleep(self.batch_pause)
+                    self.metrics.record_sleep(SLEEP_BATCH_PAUSE, self.batch_pause)
+        
+        return all_created_issues, all_failed_issues
+    
+    def process_all_batches(self, all_requests: Iterable[Tuple],
+                           start_time: float = None,
+                           total_count: Optional[int] = None) -> Tuple[List[Dict], List[Tuple]]:
+        """全バッチを処理（all_requests はジェネレーターでもよく、バッチ1つ分ずつ読み進める）"""
         if start_time is None:
             start_time = time.time()
         
-        total_batches = self.calculate_batches(len(all_requests))
+        # 非同期クライアントは全リクエストを並行に投入するため一覧にしてから処理
+        if self.async_api and not self.graphql_context:
+            all_requests, resumed_issues = self.skip_completed_requests(list(all_requests))
+            created, failed = asyncio.run(self._process_all_batches_async(all_requests))
+            return resumed_issues + created, failed
+        
+        if isinstance(all_requests, list):
+            # ジャーナルで作成済みの分はスキップ
+            all_requests, resumed_issues = self.skip_completed_requests(all_requests)
+            total_count = len(all_requests)
+        else:
+            resumed_issues = []
+            all_requests = self._iter_pending_requests(all_requests, resumed_issues)
+            if self.journal and self.journal.created:
+                total_count = None  # 再開時は作成済みの件数が読み進めるまで分からない
+        
+        total_batches = self.calculate_batches(total_count) if total_count is not None else '?'
         all_created_issues = []
         all_failed_issues = []
         
-        for batch_num in range(total_batches):
-            start_idx = batch_num * self.batch_size
-            end_idx = min(start_idx + self.batch_size, len(all_requests))
-            batch_requests = all_requests[start_idx:end_idx]
-            
-            print(f"\n🔄 Batch {batch_num + 1}/{total_batches}: Processing issues {start_idx + 1}-{end_idx}")
+        pending = iter(all_requests)
+        batch_requests = list(islice(pending, self.batch_size))
+        batch_num = 0
+        processed = 0
+        while batch_requests:
+            batch_num += 1
+            print(f"\n🔄 Batch {batch_num}/{total_batches}: Processing issues {processed + 1}-{processed + len(batch_requests)}")
             
             batch_created, batch_failed = self.create_issues_batch(
-                batch_requests, batch_num + 1, total_batches, start_time
+                batch_requests, batch_num, total_batches, start_time
             )
             all_created_issues.extend(batch_created)
             all_failed_issues.extend(batch_failed)
+            processed += len(batch_requests)
+            
+            batch_requests = list(islice(pending, self.batch_size))
             
             # バッチ間の休憩（GitHub推奨パターン）
-            if batch_num < total_batches - 1:
+            # 適応的ペーシング時はガバナーが予算に応じて減速するため固定休憩は不要
+            if batch_requests and not self.adaptive_pacing:
                 print(f"  ⏳ Batch pause ({self.batch_pause}s)...")
-                time.sleep(self.batch_pause)
+                self.metrics.sleep(SLEEP_BATCH_PAUSE, self.batch_pause)
         
-        return all_created_issues, all_failed_issues
+        return resumed_issues + all_created_issues, all_failed_issues
     
-    def retry_failed_issues(self, failed_issues: List[Tuple], 
+    def _iter_pending_requests(self, requests: Iterable[Tuple], resumed_issues: List[Dict]) -> Iterator[Tuple]:
+        """ジャーナルで作成済みのリクエストを除外しながら返す（作成済みIssueは resumed_issues に追加）"""
+        self.resumed_count = 0
+        for issue_data, issue_type in requests:
+            if self.journal:
+                fingerprint = compute_fingerprint(issue_data, issue_type)
+                if self.journal.is_created(fingerprint):
+                    resumed_issues.append(self.journal.get_issue(fingerprint))
+                    self.resumed_count += 1
+                    continue
+            yield issue_data, issue_type
+        
+        if self.resumed_count:
+            print(f"⏭️ Resumed from journal: {self.resumed_count} issues were already created")
+    
+    def retry_failed_issues(self, failed_issues: List[Tuple],
                            max_retry_rounds: int = 2) -> List[Dict]:
         """失敗したissueをリトライする"""
         if not failed_issues:
@@ -115,11 +356,17 @@ class BatchProcessor:
         for round_num in range(max_retry_rounds):
             if not remaining_failed:
                 break
-                
+            
             print(f"  🔁 Retry round {round_num + 1}/{max_retry_rounds}: {len(remaining_failed)} issues")
             
             # リトライ前に長めの休憩
-            time.sleep(3.0)
+            self.metrics.sleep(SLEEP_BACKOFF, 3.0)
+            
+            # 失敗扱いでも実際には作成済みのものを既存Issueインデックスで除外
+            remaining_failed = self._drop_already_created(remaining_failed, retry_created,
+                                                          full_sweep=round_num == 0)
+            if not remaining_failed:
+                break
             
             current_round_created, current_round_failed = self.create_issues_batch(
                 remaining_failed, round_num + 1, max_retry_rounds
@@ -131,7 +378,7 @@ class BatchProcessor:
             # 次のラウンドまでの休憩
             if remaining_failed and round_num < max_retry_rounds - 1:
                 print(f"    ⏳ Waiting before next retry round...")
-                time.sleep(5.0)
+                self.metrics.sleep(SLEEP_BACKOFF, 5.0)
         
         if remaining_failed:
             print(f"  ⚠️ {len(remaining_failed)} issues could not be created after all retries")
@@ -144,54 +391,127 @@ class BatchProcessor:
         print(f"  ✅ Retry success: {len(retry_created)} issues created")
         return retry_created
     
-    def link_issues_to_projects(self, task_issues: List[Dict], 
-                               kpt_issues: List[Dict], 
-                               project_ids: Dict[str, str],
-                               issue_type_config: Any) -> Tuple[int, int]:
-        """IssueをProjectsにリンク"""
-        print("\n🔗 Linking issues to projects...")
+    def link_issues_to_project(self, issues: List[Dict], project_id: str,
+                               project_name: str, issue_type: str) -> int:
+        """Issueを1つのProjectにリンクし、リンク済み件数を返す"""
+        if not issues or not project_id:
+            if issues and not project_id:
+                print(f"  ⚠️ Project ID not found for {project_name}. Skipping link.")
+            return 0
         
-        def link_batch(issues: List[Dict], project_id: str, project_name: str, issue_type: str):
-            if not issues or not project_id:
-                if issues and not project_id:
-                    print(f"  ⚠️ Project ID not found for {project_name}. Skipping link.")
-                return 0
-            
-            print(f"  📌 Linking {len(issues)} {issue_type} issues to {project_name}")
-            success_count = 0
-            
-            for i, issue in enumerate(issues):
-                try:
-                    item_id = self.github_api.add_issue_to_project(project_id, issue)
+        print(f"  📌 Linking {len(issues)} {issue_type} issues to {project_name}")
+        total = len(issues)
+        
+        # ジャーナルでリンク済みのものはスキップ
+        pending = [issue for issue in issues if not self._is_linked(issue)]
+        success_count = total - len(pending)
+        if success_count:
+            print(f"    ⏭️ {success_count} issues already linked (journal)")
+        
+        if self.link_batch_size > 1 and pending:
+            # エイリアス付きミューテーションでまとめてリンク
+            try:
+                item_ids = self.github_api.add_issues_to_project_batch(
+                    project_id, pending, self.link_batch_size
+                )
+                for issue, item_id in zip(pending, item_ids):
                     if item_id:
+                        self._record_linked(issue, item_id)
                         success_count += 1
-                    
-                    if (i + 1) % 20 == 0:
-                        print(f"    ✅ Linked {i + 1}/{len(issues)} to {project_name}")
-                except Exception as e:
-                    print(f"    ❌ Link exception: {str(e)}")
-                time.sleep(0.1)  # プロジェクトリンクも少し間隔を空ける
-            
-            print(f"  📊 {project_name}: {success_count}/{len(issues)} issues linked")
+            except Exception as e:
+                print(f"    ❌ Link exception: {str(e)}")
+            print(f"  📊 {project_name}: {success_count}/{total} issues linked")
             return success_count
         
+        for i, issue in enumerate(pending):
+            try:
+                item_id = self.github_api.add_issue_to_project(project_id, issue)
+                if item_id:
+                    self._record_linked(issue, item_id)
+                    success_count += 1
+                
+                if (i + 1) % 20 == 0:
+                    print(f"    ✅ Linked {i + 1}/{len(pending)} to {project_name}")
+            except Exception as e:
+                print(f"    ❌ Link exception: {str(e)}")
+            if not self.adaptive_pacing:
+                self.metrics.sleep(SLEEP_LINK_SPACING, 0.1)  # プロジェクトリンクも少し間隔を空ける
+        
+        print(f"  📊 {project_name}: {success_count}/{total} issues linked")
+        return success_count
+    
+    def link_issues_to_projects(self, task_issues: List[Dict],
+                               kpt_issues: List[Dict],
+                               project_ids: Dict[str, str],
+                               issue_type_config: Any) -> Tuple[int, int]:
+        """IssueをProjectsにリンク"""
+        print("\n🔗 Linking issues to projects...")
+        
         # プロジェクト名を取得
         task_project_name = issue_type_config.get_project_name('task')
         kpt_project_name = issue_type_config.get_project_name('kpt')
         
+        if self.async_api:
+            return asyncio.run(self._link_issues_to_projects_async(
+                [(task_issues, project_ids.get(task_project_name), task_project_name, 'task'),
+                 (kpt_issues, project_ids.get(kpt_project_name), kpt_project_name, 'kpt')]
+            ))
+        
         # プロジェクトにリンク
-        task_linked = link_batch(
-            task_issues, 
-            project_ids.get(task_project_name), 
+        task_linked = self.link_issues_to_project(
+            task_issues,
+            project_ids.get(task_project_name),
             task_project_name,
             'task'
         )
         
-        kpt_linked = link_batch(
+        kpt_linked = self.link_issues_to_project(
             kpt_issues,
             project_ids.get(kpt_project_name),
             kpt_project_name,
             'kpt'
         )
         
-        return task_linked, kpt_linked
\ No newline at end of file
+        return task_linked, kpt_linked
+    
+    async def _link_issues_to_projects_async(self, targets: List[Tuple]) -> Tuple[int, ...]:
+        """IssueをProjectsに並行リンク（targets: (issues, project_id, project_name, issue_type)）"""
+        
+        async def link_batch(issues: List[Dict], project_id: str, project_name: str, issue_type: str) -> int:
+            if not issues or not project_id:
+                if issues and not project_id:
+                    print(f"  ⚠️ Project ID not found for {project_name}. Skipping link.")
+                return 0
+            
+            print(f"  📌 Linking {len(issues)} {issue_type} issues to {project_name} (async)")
+            pending = [issue for issue in issues if not self._is_linked(issue)]
+            success_count = len(issues) - len(pending)
+            if success_count:
+                print(f"    ⏭️ {success_count} issues already linked (journal)")
+            
+            if self.link_batch_size > 1:
+                try:
+                    results = await self.async_api.add_issues_to_project_batch(
+                        project_id, pending, self.link_batch_size
+                    )
+                except Exception as e:
+                    results = [e]
+            else:
+                results = await asyncio.gather(
+                    *[self.async_api.add_issue_to_project(project_id, issue) for issue in pending],
+                    return_exceptions=True
+                )
+            
+            for issue, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    print(f"    ❌ Link exception: {str(result)}")
+                elif result:
+                    self._record_linked(issue, result)
+                    success_count += 1
+            
+            print(f"  📊 {project_name}: {success_count}/{len(issues)} issues linked")
+            return success_count
+        
+        async with self.async_api:
+            counts = await asyncio.gather(*[link_batch(*target) for target in targets])
+        return tuple(counts)
\ No newline at end of file
@@ -5,7 +5,12 @@
 
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from .csv_index import RowRange, parse_row_selection
+from .token_pool import TokenPool
+from .app_auth import AppInstallationAuth
+from .rate_ledger import RateLedger
 
 
 class Config:
@@ -18,23 +23,103 @@ class Config:
         'request_delay': 1.0,
         'retry_delay': 120.0,
         'max_retries': 15,
-        'secondary_limit_delay': 300.0
+        'secondary_limit_delay': 300.0,
+        'server_error_delay': 5.0,
+        'max_backoff': 900.0,
+        'adaptive_rate_limit': True,
+        'rate_limit_healthy_ratio': 0.2,
+        'rate_limit_reserve': 50,
+        'write_rate_per_minute': 80.0,
+        'write_burst': 20,
+        'write_limit_per_hour': 500,
+        'async_client': False,
+        'max_concurrency': 8,
+        'write_concurrency': 1,
+        'http2': True,
+        'pool_connections': 10,
+        'pool_maxsize': 10,
+        'query_cache_ttl': 300.0,
+        'link_batch_size': 50,
+        'creation_mode': 'rest',
+        'graphql_create_batch_size': 10,
+        'journal_file': 'issue_creation_journal.jsonl',
+        'skip_existing_issues': True,
+        'pipeline': False,
+        'pipeline_queue_size': 50,
+        'metrics_file': 'issue_creation_metrics.json',
+        'metrics_prometheus_file': 'issue_creation_metrics.prom',
+        'csv_rows': '',
+        'token_pin_writes': True
     }
     
-    def __init__(self, config_file: str = None):
+    # 環境変数で上書き可能な設定（設定キー: 環境変数名）
+    ENV_OVERRIDES = {
+        'request_delay': 'REQUEST_DELAY',
+        'batch_pause': 'BATCH_PAUSE',
+        'write_rate_per_minute': 'WRITE_RATE_PER_MINUTE',
+        'write_limit_per_hour': 'WRITE_LIMIT_PER_HOUR',
+        'adaptive_rate_limit': 'ADAPTIVE_RATE_LIMIT',
+        'async_client': 'ASYNC_CLIENT',
+        'max_concurrency': 'MAX_CONCURRENCY',
+        'write_concurrency': 'WRITE_CONCURRENCY',
+        'http2': 'HTTP2',
+        'pool_connections': 'POOL_CONNECTIONS',
+        'pool_maxsize': 'POOL_MAXSIZE',
+        'query_cache_ttl': 'QUERY_CACHE_TTL',
+        'link_batch_size': 'LINK_BATCH_SIZE',
+        'creation_mode': 'CREATION_MODE',
+        'graphql_create_batch_size': 'GRAPHQL_CREATE_BATCH_SIZE',
+        'journal_file': 'JOURNAL_FILE',
+        'skip_existing_issues': 'SKIP_EXISTING_ISSUES',
+        'pipeline': 'PIPELINE',
+        'pipeline_queue_size': 'PIPELINE_QUEUE_SIZE',
+        'metrics_file': 'METRICS_FILE',
+        'metrics_prometheus_file': 'METRICS_PROMETHEUS_FILE',
+        'csv_rows': 'CSV_ROWS',
+        'token_pin_writes': 'TOKEN_PIN_WRITES'
+    }
+    
+    def __init__(self, config_file: str = None, require_credentials: bool = True):
         self.config_file = config_file
         self.settings = self.DEFAULT_SETTINGS.copy()
         
-        # 環境変数から基本設定を取得
-        self.token = os.environ.get('TEAM_SETUP_TOKEN')
+        # 環境変数から基本設定を取得（TEAM_SETUP_TOKENS / TEAM_SETUP_TOKENS_FILE で複数トークンを指定可能）
+        self.tokens = TokenPool.tokens_from_environment()
+        self.token = self.tokens[0] if self.tokens else None
         self.repository = os.environ.get('GITHUB_REPOSITORY')
         
-        if not self.token or not self.repository:
-            raise ValueError("TEAM_SETUP_TOKEN and GITHUB_REPOSITORY environment variables are required")
+        # GitHub App 認証（GITHUB_APP_ID が設定されている場合はインストールトークンを優先して使う）
+        self.app_id = os.environ.get('GITHUB_APP_ID')
+        
+        if require_credentials and (not (self.token or self.app_id) or not self.repository):
+            raise ValueError("TEAM_SETUP_TOKEN (or GITHUB_APP_ID) and GITHUB_REPOSITORY environment variables are required")
         
         # 設定ファイルが指定されている場合は読み込み
         if config_file and os.path.exists(config_file):
             self.load_config(config_file)
+        
+        # 環境変数による上書きを適用
+        self._apply_env_overrides()
+    
+    def _apply_env_overrides(self):
+        """環境変数で指定された設定値を適用"""
+        for key, env_name in self.ENV_OVERRIDES.items():
+            value = os.environ.get(env_name)
+            if value is None or value == '':
+                continue
+            
+            default = self.DEFAULT_SETTINGS.get(key)
+            try:
+                if isinstance(default, bool):
+                    self.settings[key] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+                elif isinstance(default, int):
+                    self.settings[key] = int(value)
+                elif isinstance(default, float):
+                    self.settings[key] = float(value)
+                else:
+                    self.settings[key] = value
+            except ValueError:
+                print(f"⚠️ Invalid value for {env_name}: {value}")
     
     def load_config(self, config_file: str):
         """設定ファイルを読み込み"""
@@ -67,11 +152,90 @@ class Config:
         return {
             'retry_delay': self.get('retry_delay', 120.0),
             'max_retries': self.get('max_retries', 15),
-            'secondary_limit_delay': self.get('secondary_limit_delay', 300.0)
+            'secondary_limit_delay': self.get('secondary_limit_delay', 300.0),
+            'server_error_delay': self.get('server_error_delay', 5.0),
+            'max_backoff': self.get('max_backoff', 900.0)
+        }
+    
+    def get_transport_settings(self) -> Dict[str, int]:
+        """共有コネクションプールの設定を取得（プールするホスト数・ホストごとの最大接続数）"""
+        return {
+            'pool_connections': self.get('pool_connections', 10),
+            'pool_maxsize': self.get('pool_maxsize', 10)
+        }
+    
+    def get_query_cache_ttl(self) -> float:
+        """読み取り専用GraphQLクエリ結果のキャッシュ有効期間（秒、0以下でキャッシュ無効）を取得"""
+        return self.get('query_cache_ttl', 300.0)
+    
+    def get_link_batch_size(self) -> int:
+        """1回のGraphQLリクエストでプロジェクトにリンクするIssue数を取得"""
+        return self.get('link_batch_size', 50)
+    
+    def get_creation_mode(self) -> str:
+        """Issue作成モードを取得（rest: 1件ずつREST / graphql: createIssueをまとめて送信）"""
+        return str(self.get('creation_mode', 'rest')).lower()
+    
+    def get_graphql_create_batch_size(self) -> int:
+        """1回のGraphQLリクエストで作成するIssue数を取得"""
+        return self.get('graphql_create_batch_size', 10)
+    
+    def get_journal_file(self) -> str:
+        """実行ジャーナルのパスを取得（空文字の場合はジャーナル無効）"""
+        return self.get('journal_file', '') or ''
+    
+    def is_skip_existing_issues(self) -> bool:
+        """既存Issueを事前取得し、同じIssueの作成をスキップするか"""
+        return bool(self.get('skip_existing_issues', True))
+    
+    def is_pipeline(self) -> bool:
+        """ストリーミングパイプラインで作成・リンクを並行実行するか"""
+        return bool(self.get('pipeline', False))
+    
+    def get_pipeline_queue_size(self) -> int:
+        """パイプライン各段のキュー上限を取得"""
+        return self.get('pipeline_queue_size', 50)
+    
+    def get_metrics_files(self) -> Tuple[str, str]:
+        """メトリクスの出力先（JSON, Prometheusテキスト）を取得（空文字の場合は出力しない）"""
+        return self.get('metrics_file', '') or '', self.get('metrics_prometheus_file', '') or ''
+    
+    def get_csv_row_selection(self) -> Optional[Dict[str, List[RowRange]]]:
+        """作成対象のCSV行の選択を取得（例: "task:10-20,kpt:1-"、未指定の場合は None = 全行）"""
+        return parse_row_selection(self.get('csv_rows', '')) or None
+    
+    def is_adaptive_rate_limit(self) -> bool:
+        """レート制限ヘッダーに基づく適応的ペーシングが有効か"""
+        return bool(self.get('adaptive_rate_limit', True))
+    
+    def get_rate_limit_settings(self) -> Dict[str, float]:
+        """レート制限ガバナーの設定を取得"""
+        return {
+            'healthy_ratio': self.get('rate_limit_healthy_ratio', 0.2),
+            'reserve': self.get('rate_limit_reserve', 50),
+            'write_rate_per_minute': self.get('write_rate_per_minute', 80.0),
+            'write_burst': self.get('write_burst', 20),
+            'write_limit_per_hour': self.get('write_limit_per_hour', 500)
         }
     
-    def load_project_ids(self, file_path: str = 'project_ids.txt') -> Dict[str, str]:
-        """保存されたプロジェクトIDを読み込み"""
+    def create_token_pool(self, rate_limiter: Any = None) -> TokenPool:
+        """設定されたトークン・GitHub Appでトークンプールを作成（rate_limiter は1つ目のトークン用）
+        
+        RATE_LEDGER_FILE（デフォルトは一時ディレクトリ、空文字で無効）の台帳で、
+        同じホストで同じトークンを使う他の実行と予算を共有する。
+        """
+        app_auth = AppInstallationAuth.from_environment(self.repository) if self.app_id else None
+        return TokenPool(self.tokens, rate_limiter, pin_writes=bool(self.get('token_pin_writes', True)),
+                         app_auth=app_auth, ledger=RateLedger.from_environment())
+    
+    def load_project_ids(self, file_path: str = 'project_ids.txt', registry: Any = None) -> Dict[str, str]:
+        """保存されたプロジェクトIDを読み込み（NodeRegistry を渡した場合はレジストリを優先）"""
+        if registry is not None:
+            project_ids = registry.project_ids()
+            if project_ids:
+                print(f"📂 Loaded {len(project_ids)} project IDs from node registry")
+                return project_ids
+        
         project_ids = {}
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -85,15 +249,41 @@ class Config:
         
         return project_ids
     
+    def is_async_client(self) -> bool:
+        """非同期クライアント（AsyncGitHubAPI）を使用するか"""
+        return bool(self.get('async_client', False))
+    
+    def get_async_settings(self) -> Dict[str, Any]:
+        """非同期クライアントの設定を取得"""
+        return {
+            'max_concurrency': self.get('max_concurrency', 8),
+            'write_concurrency': self.get('write_concurrency', 1),
+            'http2': bool(self.get('http2', True))
+        }
+    
     def display_settings(self):
         """現在の設定を表示"""
         print("⚙️ Current Configuration:")
         print(f"  • Repository: {self.repository}")
+        if self.app_id:
+            print(f"  • GitHub App: {self.app_id} (installation token)")
+        if len(self.tokens) + bool(self.app_id) > 1:
+            pinning = 'writes pinned to one token' if self.get('token_pin_writes', True) else 'writes rotated'
+            print(f"  • Token Pool: {len(self.tokens) + bool(self.app_id)} tokens ({pinning})")
         print(f"  • Batch Size: {self.get_batch_size()}")
         print(f"  • Batch Pause: {self.get_batch_pause()}s")
         print(f"  • Request Delay: {self.get_request_delay()}s")
         print(f"  • Max Retries: {self.get('max_retries')}")
         print(f"  • Retry Delay: {self.get('retry_delay')}s")
+        print(f"  • Creation Mode: {self.get_creation_mode()}")
+        print(f"  • Adaptive Rate Limit: {'enabled' if self.is_adaptive_rate_limit() else 'disabled'}")
+        print(f"  • Connection Pool: {self.get('pool_maxsize')} connections per host")
+        if self.is_async_client():
+            print(f"  • Async Client: max concurrency {self.get('max_concurrency')}, write concurrency {self.get('write_concurrency')}")
+        if self.is_pipeline():
+            print(f"  • Streaming Pipeline: queue size {self.get_pipeline_queue_size()}")
+        if self.get('csv_rows'):
+            print(f"  • CSV Rows: {self.get('csv_rows')}")
 
 
 class IssueTypeConfig:
@@ -105,7 +295,7 @@ class IssueTypeConfig:
         
         if config_file and os.path.exists(config_file):
             self.load_issue_types(config_file)
-            
+        
         # 環境変数に基づいてプロジェクト名を強制的に適用
         self._apply_project_names()
     
@@ -121,13 +311,13 @@ class IssueTypeConfig:
             task_project = 'イマココSNS（タスク）'
             kpt_project = 'イマココSNS（KPT）'
             task_csv = 'data/tasks_for_issues.csv'
-            
+        
         if 'task' in self.issue_types:
             self.issue_types['task']['project_name'] = task_project
             self.issue_types['task']['csv_file'] = task_csv
         if 'kpt' in self.issue_types:
             self.issue_types['kpt']['project_name'] = kpt_project
-
+    
     def _load_default_issue_types(self) -> Dict[str, Dict[str, Any]]:
         """デフォルトのIssue種別設定"""
         project_type = os.environ.get('PROJECT_TYPE', 'imakoko')
@@ -138,7 +328,7 @@ class IssueTypeConfig:
         else:
             task_project = 'イマココSNS（タスク）'
             kpt_project = 'イマココSNS（KPT）'
-            
+        
         return {
             'task': {
                 'csv_file': 'data/tasks_for_issues.csv',
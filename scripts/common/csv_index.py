@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+CSV行インデックスの共通モジュール
+CSVの各行（タイトルのある行）の行番号 -> バイトオフセット・タイトル・本文の長さ・内容ハッシュを
+サイドカーファイル（{CSVパス}.idx）に記録し、CSVを mmap して任意の行・範囲を直接読み込む
+"""
+
+import io
+import os
+import csv
+import json
+import mmap
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 行番号の範囲 (開始, 終了)。終了が None の場合は最終行まで
+RowRange = Tuple[int, Optional[int]]
+
+
+def _decode_text(raw: bytes) -> str:
+    """CSVのバイト列をテキストモードの open と同じく改行をLFに揃えて復号（ストリーミング読み込みと同じ値にする）"""
+    return raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def parse_row_selection(spec: str) -> Dict[str, List[RowRange]]:
+    """行選択の指定を解析（例: "task:10-20,task:35,kpt:1-" / 種別を省略した場合は全種別 "*" に適用）"""
+    selection: Dict[str, List[RowRange]] = {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        issue_type, _, rows = part.rpartition(':')
+        start, dash, stop = rows.partition('-')
+        try:
+            row_range = (int(start), (int(stop) if stop else None) if dash else int(start))
+        except ValueError:
+            raise ValueError(f"Invalid row selection: {part}")
+        if row_range[0] < 1 or (row_range[1] is not None and row_range[1] < row_range[0]):
+            raise ValueError(f"Invalid row selection: {part}")
+        selection.setdefault(issue_type.strip() or '*', []).append(row_range)
+    return selection
+
+
+class CSVIndex:
+    """CSV行インデックスクラス
+    
+    行番号はタイトルのある行だけを1から数えたもの（CSVLoader.iter_issue_data と同じ番号）。
+    CSVのサイズ・更新時刻が記録時と異なる場合はインデックスを作り直す。
+    インデックスファイル形式:
+      {"version": 2, "size": ..., "mtime_ns": ..., "fieldnames": [...],
+       "rows": [[オフセット, バイト長, タイトル, 本文の長さ, 内容ハッシュ], ...]}
+    """
+    
+    VERSION = 2
+    SUFFIX = '.idx'
+    
+    def __init__(self, csv_path: str, fieldnames: List[str], rows: List[List[Any]]):
+        self.csv_path = csv_path
+        self.fieldnames = fieldnames
+        self.rows = rows
+    
+    @classmethod
+    def index_path(cls, csv_path: str) -> str:
+        """インデックスファイルのパス"""
+        return f"{csv_path}{cls.SUFFIX}"
+    
+    @staticmethod
+    def _source_stat(csv_path: str) -> Tuple[int, int]:
+        """CSVの (サイズ, 更新時刻ns)"""
+        stat = os.stat(csv_path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    @classmethod
+    def load(cls, csv_path: str) -> 'CSVIndex':
+        """有効なインデックスを読み込み（無い・古い場合は作成して保存）"""
+        size, mtime_ns = cls._source_stat(csv_path)
+        index_path = cls.index_path(csv_path)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if (data.get('version') == cls.VERSION and data.get('size') == size
+                    and data.get('mtime_ns') == mtime_ns):
+                return cls(csv_path, data['fieldnames'], data['rows'])
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        index = cls.build(csv_path)
+        index.save(size, mtime_ns)
+        return index
+    
+    @staticmethod
+    def _iter_records(f) -> Iterator[Tuple[int, bytes]]:
+        """バイナリファイルから (オフセット, 1レコード分のバイト列) を返す
+        
+        レコードの区切りは csv.reader に判定させる（クォート内の改行や、クォートで囲まれていないフィールド中の " も
+        ストリーミング読み込みと同じ扱いになる）。csv.reader は1レコードを返すまでに必要な行だけを読む。
+        """
+        lines: List[bytes] = []
+        
+        def read_lines() -> Iterator[str]:
+            for line in iter(f.readline, b''):
+                lines.append(line)
+                yield _decode_text(line)
+        
+        offset = 0
+        for _ in csv.reader(read_lines()):
+            raw = b''.join(lines)
+            lines.clear()
+            yield offset, raw
+            offset += len(raw)
+        if lines:
+            yield offset, b''.join(lines)
+    
+    @classmethod
+    def build(cls, csv_path: str) -> 'CSVIndex':
+        """CSVを1回走査してインデックスを作成"""
+        fieldnames = []
+        rows = []
+        with open(csv_path, 'rb') as f:
+            for offset, raw in cls._iter_records(f):
+                if not fieldnames:
+                    fieldnames = next(csv.reader(io.StringIO(_decode_text(raw))), [])
+                    continue
+                row = cls._parse(fieldnames, raw)
+                if not row or not (row.get('title') or '').strip():
+                    continue
+                rows.append([
+                    offset,
+                    len(raw),
+                    row['title'],
+                    len(row.get('body') or ''),
+                    hashlib.sha256(raw).hexdigest()[:16]
+                ])
+        print(f"🗂️ Indexed {len(rows)} rows of {csv_path}")
+        return cls(csv_path, fieldnames, rows)
+    
+    def save(self, size: int, mtime_ns: int):
+        """インデックスを一時ファイル経由で保存（書き込めない場合は保存しない）"""
+        index_path = self.index_path(self.csv_path)
+        data = {
+            'version': self.VERSION,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'fieldnames': self.fieldnames,
+            'rows': self.rows
+        }
+        # 複数プロセスが同時に作成しても壊れないようプロセスごとの一時ファイルを使う
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"⚠️ Could not write CSV index {index_path}: {str(e)}")
+    
+    @staticmethod
+    def _parse(fieldnames: List[str], raw: bytes) -> Optional[Dict]:
+        """1レコード分のバイト列を DictReader と同じ形式の辞書に変換（空行は None）"""
+        reader = csv.DictReader(io.StringIO(_decode_text(raw)), fieldnames=fieldnames)
+        return next(reader, None)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def titles(self) -> List[str]:
+        """全行のタイトル（本文は読み込まない）"""
+        return [entry[2] for entry in self.rows]
+    
+    def entry(self, row_number: int) -> Dict[str, Any]:
+        """行番号のインデックス情報を取得"""
+        offset, length, title, body_length, content_hash = self.rows[row_number - 1]
+        return {'offset': offset, 'length': length, 'title': title,
+                'body_length': body_length, 'hash': content_hash}
+    
+    def row_numbers(self, ranges: Optional[List[RowRange]] = None) -> List[int]:
+        """範囲指定を行番号の一覧に展開（範囲外・重複は除く）"""
+        if ranges is None:
+            return list(range(1, len(self.rows) + 1))
+        selected = set()
+        for start, stop in ranges:
+            selected.update(range(start, min(stop or len(self.rows), len(self.rows)) + 1))
+        return sorted(selected)
+    
+    def iter_rows(self, ranges: Optional[List[RowRange]] = None) -> Iterator[Tuple[int, Dict]]:
+        """指定範囲の (行番号, 行) を返す（各行は取り出されたときにCSVから読み込む）"""
+        if not self.rows:
+            return
+        with open(self.csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for row_number in self.row_numbers(ranges):
+                offset, length = self.rows[row_number - 1][:2]
+                yield row_number, self._parse(self.fieldnames, data[offset:offset + length])
+    
+    def read_row(self, row_number: int) -> Dict:
+        """1行だけ読み込み"""
+        for _, row in self.iter_rows([(row_number, row_number)]):
+            return row
\ No newline at end of file
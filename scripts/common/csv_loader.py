@@ -5,7 +5,9 @@ CSV読み込み処理の共通モジュール
 
 import os
 import csv
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .csv_index import CSVIndex, RowRange
 
 
 class CSVLoader:
@@ -30,6 +32,114 @@ class CSVLoader:
         print(f"📋 Loaded: {len(issues)} {issue_type} issues from {file_path}")
         return issues
     
+    @staticmethod
+    def iter_issue_data(file_path: str, issue_type: str) -> Iterator[Dict]:
+        """特定のIssue種別のCSVデータを1行ずつ読み込み（タイトルのない行は除外）"""
+        if not os.path.exists(file_path):
+            print(f"⚠️ CSV file not found: {file_path}")
+            return
+        
+        count = 0
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    if row.get('title', '').strip():
+                        count += 1
+                        yield row
+        except Exception as e:
+            print(f"❌ Error loading {issue_type} CSV: {str(e)}")
+            return
+        
+        print(f"📋 Streamed: {count} {issue_type} issues from {file_path}")
+    
+    @staticmethod
+    def _selected_ranges(selection: Optional[Dict[str, List[RowRange]]], issue_type: str) -> Optional[List[RowRange]]:
+        """Issue種別に適用する行範囲（指定が無い場合は None = 全行）"""
+        if not selection:
+            return None
+        if issue_type in selection:
+            return selection[issue_type]
+        # 種別を省略した指定は全種別に適用、他の種別だけが指定された場合はこの種別を読み込まない
+        return selection.get('*', [])
+    
+    @staticmethod
+    def iter_indexed_issue_data(file_path: str, issue_type: str,
+                                ranges: Optional[List[RowRange]] = None) -> Iterator[Tuple[Dict, int]]:
+        """行インデックスを使って指定範囲の (行, 行番号) を読み込み（前の行は解析しない）"""
+        if not os.path.exists(file_path):
+            print(f"⚠️ CSV file not found: {file_path}")
+            return
+        
+        count = 0
+        try:
+            index = CSVIndex.load(file_path)
+            for row_number, row in index.iter_rows(ranges):
+                count += 1
+                yield row, row_number
+        except Exception as e:
+            print(f"❌ Error loading {issue_type} CSV: {str(e)}")
+            return
+        
+        print(f"📋 Streamed: {count} {issue_type} issues from {file_path} (indexed)")
+    
+    @staticmethod
+    def iter_all_csv_data(csv_sources: List[Tuple[str, str]],
+                          selection: Optional[Dict[str, List[RowRange]]] = None) -> Iterator[Tuple[Dict, int, str]]:
+        """全CSVを順に1行ずつ読み込み、(行, 種別内の番号, Issue種別) を返す（selection指定時は選択した行のみ）"""
+        for file_path, issue_type in csv_sources:
+            ranges = CSVLoader._selected_ranges(selection, issue_type)
+            if ranges is not None:
+                for row, index in CSVLoader.iter_indexed_issue_data(file_path, issue_type, ranges):
+                    yield row, index, issue_type
+                continue
+            for index, row in enumerate(CSVLoader.iter_issue_data(file_path, issue_type), 1):
+                yield row, index, issue_type
+    
+    @staticmethod
+    def count_issue_rows(csv_sources: List[Tuple[str, str]],
+                         selection: Optional[Dict[str, List[RowRange]]] = None) -> int:
+        """タイトルのある行数（selection指定時は選択した行数）を行インデックスから数える"""
+        total = 0
+        for file_path, issue_type in csv_sources:
+            if not os.path.exists(file_path):
+                continue
+            try:
+                index = CSVIndex.load(file_path)
+            except Exception as e:
+                print(f"⚠️ Could not index {file_path}: {str(e)}")
+                continue
+            ranges = CSVLoader._selected_ranges(selection, issue_type)
+            total += len(index) if ranges is None else len(index.row_numbers(ranges))
+        return total
+    
+    @staticmethod
+    def list_row_keys(csv_sources: List[Tuple[str, str]],
+                      selection: Optional[Dict[str, List[RowRange]]] = None) -> List[Tuple[int, str]]:
+        """作成順の (種別内の番号, Issue種別) の一覧を行インデックスから取得（CSVの本文は解析しない）"""
+        keys = []
+        for file_path, issue_type in csv_sources:
+            if not os.path.exists(file_path):
+                continue
+            index = CSVIndex.load(file_path)
+            ranges = CSVLoader._selected_ranges(selection, issue_type)
+            keys.extend((row_number, issue_type) for row_number in index.row_numbers(ranges))
+        return keys
+    
+    @staticmethod
+    def get_csv_sources(data_dir: str = 'data') -> List[Tuple[str, str]]:
+        """プロジェクトタイプに応じた (CSVパス, Issue種別) の一覧を取得（作成順）"""
+        project_type = os.environ.get('PROJECT_TYPE', 'imakoko')
+        
+        if project_type == 'real_estate':
+            # 不動産検索サイトではKPTを生成しない
+            return [(os.path.join(data_dir, 'tasks_for_real_estate.csv'), 'task')]
+        
+        return [
+            (os.path.join(data_dir, 'tasks_for_issues.csv'), 'task'),
+            (os.path.join(data_dir, 'kpt_for_issues.csv'), 'kpt')
+        ]
+    
     @staticmethod
     def load_all_csv_data(data_dir: str = 'data') -> Tuple[List[Dict], List[Dict]]:
         """全てのCSVデータを読み込み"""
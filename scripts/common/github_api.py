@@ -5,57 +5,212 @@ GitHub API操作の共通モジュール
 
 import os
 import requests
-import time
-import random
-import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from .rate_limiter import RateLimitGovernor
+from .token_pool import TokenPool, TokenIdentity
+from .transport import PooledTransport
+from .http_cache import HttpCache
+from .node_registry import NodeRegistry
+from .single_flight import SingleFlight
+from .payload_encoder import PayloadEncoder
+from .query_cache import (
+    QueryCache, TAG_REPOSITORY, TAG_PROJECTS, TAG_LABELS, TAG_DISCUSSION_CATEGORIES
+)
+from .retry_policy import RetryPolicy, RetryDecision, AUTH_FAILURE, PRIMARY_RATE_LIMIT
+from .metrics import (
+    MetricsRecorder, graphql_operation,
+    SLEEP_REQUEST_DELAY, SLEEP_BACKOFF, SLEEP_RATE_LIMIT
+)
+from .graphql_batch import (
+    build_aliased_mutation, map_alias_results, has_partial_results, calculate_batch_size, split_batches
+)
+from .issue_index import ExistingIssueIndex
 
 
 class GitHubAPI:
     """GitHub API操作クラス"""
     
-    def __init__(self, token: str = None, repository: str = None):
-        self.token = token or os.environ.get('TEAM_SETUP_TOKEN')
+    # メトリクスのエンドポイント名
+    RATE_LIMIT_ENDPOINT = 'GET /rate_limit'
+    ISSUES_ENDPOINT = 'POST /repos/:owner/:repo/issues'
+    LABELS_ENDPOINT = 'POST /repos/:owner/:repo/labels'
+    
+    # 同期・非同期クライアントで共有するGraphQLクエリ
+    ADD_PROJECT_ITEM_MUTATION = """
+        mutation($projectId: ID!, $contentId: ID!) {
+            addProjectV2ItemById(input: {projectId: $projectId, contentId: $contentId}) {
+                item { id }
+            }
+        }
+        """
+    
+    LABELS_QUERY = """
+        query($owner: String!, $name: String!, $cursor: String) {
+            repository(owner: $owner, name: $name) {
+                labels(first: 100, after: $cursor) {
+                    nodes { id name }
+                    pageInfo { hasNextPage endCursor }
+                }
+            }
+        }
+        """
+    
+    ISSUES_QUERY = """
+        query($owner: String!, $name: String!, $first: Int!, $cursor: String, $direction: OrderDirection!) {
+            repository(owner: $owner, name: $name) {
+                issues(first: $first, after: $cursor, orderBy: {field: CREATED_AT, direction: $direction}) {
+                    nodes {
+                        id
+                        number
+                        title
+                        url
+                        body
+                        labels(first: 20) { nodes { name } }
+                    }
+                    pageInfo { hasNextPage endCursor }
+                }
+            }
+        }
+        """
+    
+    REPOSITORY_INFO_QUERY = """
+        query($owner: String!, $name: String!) {
+            repository(owner: $owner, name: $name) {
+                id
+                owner {
+                    id
+                    __typename
+                }
+                projectsV2(first: 100) {
+                    nodes {
+                        id
+                        title
+                        number
+                        url
+                    }
+                }
+            }
+        }
+        """
+    
+    def __init__(self, token: str = None, repository: str = None,
+                 rate_limiter: RateLimitGovernor = None,
+                 retry_policy: RetryPolicy = None,
+                 metrics: MetricsRecorder = None,
+                 transport: PooledTransport = None,
+                 query_cache: QueryCache = None,
+                 registry: NodeRegistry = None,
+                 token_pool: TokenPool = None):
         self.repository = repository or os.environ.get('GITHUB_REPOSITORY')
         
-        if not self.token or not self.repository:
-            raise ValueError("TEAM_SETUP_TOKEN and GITHUB_REPOSITORY are required")
+        # レート制限ガバナー（1つ目のトークン用、トークンプールの他のトークンは同じ設定で個別に持つ）
+        self.rate_limiter = rate_limiter or (token_pool.primary.rate_limiter if token_pool else RateLimitGovernor())
+        
+        # トークンプール（token 未指定時は TEAM_SETUP_TOKEN / TEAM_SETUP_TOKENS / TEAM_SETUP_TOKENS_FILE
+        # と GITHUB_APP_ID などの GitHub App 設定）
+        if token_pool is None and self.repository:
+            if token:
+                token_pool = TokenPool([token], self.rate_limiter)
+            elif TokenPool.tokens_from_environment() or os.environ.get('GITHUB_APP_ID'):
+                token_pool = TokenPool.from_environment(self.rate_limiter, repository=self.repository)
+        self.token_pool = token_pool
+        
+        if not self.token_pool or not self.repository:
+            raise ValueError("TEAM_SETUP_TOKEN (or GITHUB_APP_ID) and GITHUB_REPOSITORY are required")
         
         self.owner, self.repo_name = self.repository.split('/')
         
-        # API設定
-        self.api_base = 'https://api.github.com'
-        self.graphql_url = 'https://api.github.com/graphql'
+        # API設定（GitHub Actions が設定する GITHUB_API_URL / GITHUB_GRAPHQL_URL に対応）
+        self.api_base = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.graphql_url = os.environ.get('GITHUB_GRAPHQL_URL', f"{self.api_base}/graphql")
         
-        self.rest_headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'X-GitHub-Api-Version': '2022-11-28'
-        }
+        # REST・GraphQLで共有するコネクションプール（keep-aliveで接続を再利用）
+        self.transport = transport or PooledTransport(http_cache=HttpCache.from_environment())
         
-        self.graphql_headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
+        # 読み取り専用GraphQLクエリの結果キャッシュ（ミューテーションで対象タグを無効化）
+        self.query_cache = query_cache or QueryCache()
+        
+        # 取得・作成したノードIDのレジストリ（ネットワークより先に参照する）
+        self.registry = registry or NodeRegistry.from_environment(self.repository)
+        
+        # 同時に送られた同一の読み取りリクエストを1回の通信にまとめる
+        self.single_flight = SingleFlight()
         
-        # スレッドローカルセッション
-        self.thread_local = threading.local()
+        # リクエスト本文を1回だけコンパクトなUTF-8に変換（リトライ時は同じバイト列を再送）
+        self.payload_encoder = PayloadEncoder()
+        
+        # エラー種別に応じたリトライポリシー（全リクエストで共有）
+        self.retry_policy = retry_policy or RetryPolicy()
+        
+        # リクエスト・リトライ・待機時間のメトリクス（全リクエストで共有）
+        self.metrics = metrics or MetricsRecorder()
+        
+        # ラベル名 -> ノードIDのキャッシュ（GraphQLでのIssue作成用）
+        self.label_ids: Optional[Dict[str, str]] = None
+        
+        # 既存Issueインデックス（fetch_existing_issuesで構築、リトライ時の重複チェックに使用）
+        self.issue_index: Optional[ExistingIssueIndex] = None
+    
+    @property
+    def token(self) -> str:
+        """1つ目のトークン（GitHub App の場合は現在のインストールトークン）"""
+        return self.token_pool.primary.token
+    
+    # 1つ目のトークンの認証ヘッダー（リクエストごとの振り分けは _pace / _get で行う）
+    
+    @property
+    def rest_headers(self) -> Dict[str, str]:
+        """REST API用の認証ヘッダー"""
+        return self.token_pool.primary.rest_headers
+    
+    @property
+    def graphql_headers(self) -> Dict[str, str]:
+        """GraphQL API用の認証ヘッダー"""
+        return self.token_pool.primary.graphql_headers
+    
+    @property
+    def rest_json_headers(self) -> Dict[str, str]:
+        """JSON本文付きRESTリクエスト用の認証ヘッダー"""
+        return self.token_pool.primary.rest_json_headers
     
     def get_session(self) -> requests.Session:
-        """スレッドローカルセッションを取得"""
-        if not hasattr(self.thread_local, "session"):
-            self.thread_local.session = requests.Session()
-            self.thread_local.session.headers.update(self.rest_headers)
-        return self.thread_local.session
+        """共有トランスポートのセッションを取得（ヘッダーはリクエストごとに指定する）"""
+        return self.transport.session
+    
+    def _pace(self, resource: str, write: bool = False, count: int = 1) -> TokenIdentity:
+        """残り予算が最も多いトークンを選び、そのガバナーに従って待機して待機時間を記録"""
+        identity = self.token_pool.select(resource, write=write, count=count)
+        delay = identity.rate_limiter.wait(resource, write=write, count=count)
+        self.metrics.record_sleep(SLEEP_RATE_LIMIT, delay)
+        return identity
+    
+    def _backoff(self, endpoint: str, decision: RetryDecision, resource: str = 'core',
+                 identity: TokenIdentity = None, write: bool = False):
+        """リトライ前の待機を行い、リトライと待機時間を記録
+        
+        プライマリレート制限の場合、予算が残っている別のトークンがあれば待機せずに切り替える。
+        """
+        self.metrics.record_retry(endpoint, decision.kind)
+        if (decision.kind == PRIMARY_RATE_LIMIT and identity is not None
+                and self.token_pool.can_rotate(resource, identity, write)):
+            print(f"  🔁 {identity.name} exhausted ({resource}), switching token")
+            return
+        self.rate_limiter.sleep(decision.delay)
+        self.metrics.record_sleep(SLEEP_BACKOFF, decision.delay)
     
-    def check_rate_limit_headers(self, response: requests.Response) -> Dict[str, Optional[int]]:
+    def check_rate_limit_headers(self, response: requests.Response,
+                                 identity: TokenIdentity = None) -> Dict[str, Optional[int]]:
         """レート制限ヘッダーをチェックし、情報を表示"""
         headers = response.headers
         remaining = headers.get('x-ratelimit-remaining')
-        limit = headers.get('x-ratelimit-limit') 
+        limit = headers.get('x-ratelimit-limit')
         reset_timestamp = headers.get('x-ratelimit-reset')
         
+        # リクエストに使ったトークンのガバナーに最新の予算状態を反映
+        (identity or self.token_pool.primary).rate_limiter.update(headers)
+        
         if remaining and limit:
             remaining_pct = (int(remaining) / int(limit)) * 100
             if remaining_pct < 20:  # 20%以下の場合警告
@@ -73,102 +228,227 @@ class GitHubAPI:
             'reset': int(reset_timestamp) if reset_timestamp else None
         }
     
+    def _get(self, url: str, endpoint: str, timeout: int = 30,
+             identity: TokenIdentity = None) -> requests.Response:
+        """REST GETを実行（同じURLの取得が実行中の場合はその結果を共有）
+        
+        identity を省略した場合は残り予算が最も多いトークンを使う。
+        """
+        def send(selected: TokenIdentity) -> requests.Response:
+            started = self.metrics.timer()
+            response = self.transport.get(url, headers=selected.rest_headers, timeout=timeout)
+            self.metrics.record_response(endpoint, response, self.metrics.timer() - started)
+            selected.rate_limiter.update(response.headers)
+            return response
+        
+        def fetch() -> requests.Response:
+            selected = identity or self.token_pool.select('core')
+            response = send(selected)
+            # インストールトークンが拒否された場合は再発行して1回だけ再送
+            if response.status_code == 401 and selected.reauthenticate(response):
+                response = send(selected)
+            return response
+        
+        key = ('GET', url) if identity is None else ('GET', url, identity.name)
+        return self.single_flight.do(key, fetch)
+    
     def check_initial_rate_limit(self) -> Optional[int]:
-        """初期レート制限状態をチェック"""
+        """初期レート制限状態をチェックし、使用可能な core の残り予算の合計を返す"""
+        total = None
+        for identity in self.token_pool.identities:
+            remaining = self._check_identity_rate_limit(identity)
+            if remaining is not None:
+                total = (total or 0) + remaining
+        if total is not None and len(self.token_pool) > 1:
+            print(f"🔑 Token pool: {len(self.token_pool)} tokens, {total} core requests remaining in total")
+        return total
+    
+    def _check_identity_rate_limit(self, identity: TokenIdentity) -> Optional[int]:
+        """トークン1つの初期レート制限状態をチェック"""
+        label = f" [{identity.name}]" if len(self.token_pool) > 1 else ''
         try:
-            response = requests.get(f"{self.api_base}/rate_limit", headers=self.rest_headers, timeout=10)
+            response = self._get(f"{self.api_base}/rate_limit", self.RATE_LIMIT_ENDPOINT,
+                                 timeout=10, identity=identity)
             if response.status_code == 200:
                 data = response.json()
-                core = data.get('resources', {}).get('core', {})
+                resources = data.get('resources', {})
+                for resource_name in ('core', 'graphql'):
+                    resource = resources.get(resource_name)
+                    if resource:
+                        identity.rate_limiter.record(
+                            resource_name, resource.get('remaining'), resource.get('limit'),
+                            resource.get('reset'), resource.get('used')
+                        )
+                
+                core = resources.get('core', {})
                 remaining = core.get('remaining', 0)
                 limit = core.get('limit', 0)
                 reset_timestamp = core.get('reset', 0)
                 
                 if reset_timestamp:
                     reset_time = datetime.fromtimestamp(reset_timestamp)
-                    print(f"📊 Initial rate limit: {remaining}/{limit} requests remaining")
+                    print(f"📊 Initial rate limit{label}: {remaining}/{limit} requests remaining")
                     print(f"🔄 Rate limit resets at: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     
                     if remaining < 100:
                         print(f"⚠️ Warning: Low rate limit remaining ({remaining}). Consider waiting until reset.")
                 return remaining
+            if response.status_code == 401:
+                print(f"⚠️ Token rejected{label}: {response.status_code}")
         except Exception as e:
-            print(f"⚠️ Could not check rate limit: {str(e)}")
+            print(f"⚠️ Could not check rate limit{label}: {str(e)}")
         return None
     
-    def create_issue(self, issue_data: Dict[str, Any], 
+    def create_issue(self, issue_data: Dict[str, Any],
                     index: int, total: int, issue_type: str,
-                    max_retries: int = 15, 
-                    request_delay: float = 1.0,
-                    retry_delay: float = 120.0,
-                    secondary_limit_delay: float = 300.0) -> Optional[Dict[str, Any]]:
-        """単一のIssueを作成（リトライ機能付き）"""
-        session = self.get_session()
-        
+                    request_delay: float = 1.0) -> Optional[Dict[str, Any]]:
+        """単一のIssueを作成（リトライポリシーに従って再試行）"""
         # レート制限回避のためのディレイ
-        if index > 0:
-            time.sleep(request_delay)
+        if index > 0 and request_delay > 0:
+            self.metrics.sleep(SLEEP_REQUEST_DELAY, request_delay)
+        
+        # 再送前に重複確認が必要か
+        ambiguous_failure = False
+        reauthenticated = False
+        body = self.payload_encoder.encode(issue_data)
         
-        for attempt in range(max_retries):
+        for attempt in range(self.retry_policy.max_retries):
+            # 再送前に既存Issueを確認し、重複作成を防ぐ
+            if ambiguous_failure and self.issue_index is not None:
+                existing = self.find_recently_created_issue(issue_data, issue_type)
+                if existing:
+                    print(f"  ♻️ {issue_type} ({index + 1}/{total}) already created (#{existing.get('number')}): {issue_data['title'][:50]}...")
+                    return existing
+            
+            started = self.metrics.timer()
+            identity = None
             try:
-                response = session.post(
+                identity = self._pace('core', write=True)
+                started = self.metrics.timer()
+                response = self.transport.post(
                     f"{self.api_base}/repos/{self.repository}/issues",
-                    json=issue_data,
+                    data=body,
+                    headers=identity.rest_json_headers,
                     timeout=30
                 )
+                self.metrics.record_response(self.ISSUES_ENDPOINT, response, self.metrics.timer() - started)
+                
+                # レート制限ヘッダーをチェック
+                self.check_rate_limit_headers(response, identity)
                 
                 if response.status_code == 201:
-                    issue = response.json()
-                    # レート制限ヘッダーをチェック
-                    self.check_rate_limit_headers(response)
-                    
                     if attempt > 0:
                         print(f"  ✅ {issue_type} ({index + 1}/{total}) [retry {attempt}]: {issue_data['title'][:50]}...")
                     else:
                         print(f"  ✅ {issue_type} ({index + 1}/{total}): {issue_data['title'][:50]}...")
-                    return issue
+                    return response.json()
                 
-                elif response.status_code == 403:
-                    # GitHub推奨: セカンダリレート制限の可能性
-                    retry_after = response.headers.get('retry-after')
-                    if retry_after:
-                        wait_time = int(retry_after)
-                        print(f"  ⏳ Rate limit (retry-after: {wait_time}s) ({index + 1}/{total}) [attempt {attempt + 1}]")
-                    else:
-                        # 指数バックオフ with jitter
-                        base_delay = retry_delay if attempt == 0 else secondary_limit_delay
-                        jitter = random.uniform(0.8, 1.2)
-                        wait_time = int(base_delay * (2 ** (attempt // 2)) * jitter)
-                        print(f"  ⏳ Rate limit hit ({index + 1}/{total}) [attempt {attempt + 1}], waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                    
-                elif response.status_code >= 500:
-                    print(f"  🔄 Server error ({response.status_code}) ({index + 1}/{total}) [attempt {attempt + 1}]...")
-                    time.sleep(retry_delay * (attempt + 1))
-                    continue
-                
-                else:
-                    print(f"  ❌ {issue_type} failed ({index + 1}/{total}): {response.status_code} - {response.text[:100]}")
-                    break
-                    
+                decision = self.retry_policy.evaluate(response.status_code, response.headers, response.text, attempt)
+            
             except Exception as e:
-                print(f"  ❌ {issue_type} exception ({index + 1}/{total}) [attempt {attempt + 1}]: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (attempt + 1))
-                    continue
+                self.metrics.record_request(self.ISSUES_ENDPOINT, 'error', self.metrics.timer() - started)
+                decision = self.retry_policy.evaluate_exception(e, attempt)
+            
+            # タイムアウトや5xxでは書き込みが受理済みの可能性がある
+            if decision.ambiguous:
+                ambiguous_failure = True
+            
+            # インストールトークンが拒否された場合は再発行して1回だけ再送
+            if decision.kind == AUTH_FAILURE and not reauthenticated and identity.reauthenticate(response):
+                reauthenticated = True
+                continue
+            
+            if not decision.retry:
+                print(f"  ❌ {issue_type} failed ({index + 1}/{total}) [{decision.kind}]: {decision.reason}")
+                break
+            
+            print(f"  ⏳ {decision.kind} ({index + 1}/{total}) [attempt {attempt + 1}], waiting {decision.delay:.0f}s...")
+            self._backoff(self.ISSUES_ENDPOINT, decision, 'core', identity, write=True)
         
         return None
     
+    @staticmethod
+    def _normalize_graphql_issue(node: Dict[str, Any]) -> Dict[str, Any]:
+        """GraphQLのIssueノードをREST API形式のキーに揃える"""
+        return {
+            'node_id': node['id'],
+            'number': node['number'],
+            'html_url': node['url'],
+            'title': node['title'],
+            'body': node.get('body') or '',
+            'labels': [{'name': label['name']} for label in (node.get('labels') or {}).get('nodes', [])]
+        }
+    
+    def _fetch_issue_pages(self, index: ExistingIssueIndex, direction: str,
+                           page_size: int = 100, max_pages: int = None) -> int:
+        """Issueをページングで取得してインデックスに追加し、取得件数を返す"""
+        cursor = None
+        fetched = 0
+        pages = 0
+        
+        while True:
+            variables = {
+                'owner': self.owner,
+                'name': self.repo_name,
+                'first': page_size,
+                'cursor': cursor,
+                'direction': direction
+            }
+            result = self.graphql_request(self.ISSUES_QUERY, variables)
+            if not result or 'repository' not in result:
+                print(f"  ⚠️ Issue listing stopped after {fetched} issues (page {pages + 1} could not be fetched)")
+                break
+            
+            issues = result['repository']['issues']
+            for node in issues['nodes']:
+                index.add(self._normalize_graphql_issue(node))
+                fetched += 1
+            
+            pages += 1
+            if not issues['pageInfo']['hasNextPage'] or (max_pages and pages >= max_pages):
+                break
+            cursor = issues['pageInfo']['endCursor']
+        
+        return fetched
+    
+    def fetch_existing_issues(self) -> ExistingIssueIndex:
+        """リポジトリの全Issueを100件ずつ取得してインデックスを構築"""
+        index = ExistingIssueIndex()
+        fetched = self._fetch_issue_pages(index, 'ASC')
+        print(f"🔎 Indexed {fetched} existing issues in {self.repository}")
+        self.issue_index = index
+        return index
+    
+    def refresh_recent_issues(self, recent_count: int = 20):
+        """直近に作成されたIssueを既存Issueインデックスに取り込む"""
+        if self.issue_index is None:
+            return
+        try:
+            self._fetch_issue_pages(self.issue_index, 'DESC', page_size=min(100, recent_count), max_pages=1)
+        except Exception as e:
+            print(f"  ⚠️ Could not refresh recent issues: {str(e)}")
+    
+    def refresh_all_issues(self):
+        """リポジトリの全Issueを再取得して既存Issueインデックスに取り込む（実行の序盤に作成されたIssueも含める）"""
+        if self.issue_index is None:
+            return
+        try:
+            fetched = self._fetch_issue_pages(self.issue_index, 'ASC')
+            print(f"🔎 Re-indexed {fetched} issues in {self.repository}")
+        except Exception as e:
+            print(f"  ⚠️ Could not refresh issues: {str(e)}")
+    
+    def find_recently_created_issue(self, issue_data: Dict[str, Any], issue_type: str,
+                                    recent_count: int = 20) -> Optional[Dict[str, Any]]:
+        """直近に作成されたIssueをインデックスに取り込み、作成リクエストに一致するものを返す"""
+        if self.issue_index is None:
+            return None
+        self.refresh_recent_issues(recent_count)
+        return self.issue_index.find(issue_data, issue_type)
+    
     def add_issue_to_project(self, project_id: str, issue: Dict[str, Any]) -> Optional[str]:
         """IssueをProjectに追加し、アイテムIDを返す"""
-        query = """
-        mutation($projectId: ID!, $contentId: ID!) {
-            addProjectV2ItemById(input: {projectId: $projectId, contentId: $contentId}) {
-                item { id }
-            }
-        }
-        """
+        query = self.ADD_PROJECT_ITEM_MUTATION
         
         variables = {
             'projectId': project_id,
@@ -177,81 +457,346 @@ class GitHubAPI:
         
         payload = {'query': query, 'variables': variables}
         
-        try:
-            response = requests.post(
-                self.graphql_url, 
-                json=payload, 
-                headers=self.graphql_headers,
-                timeout=30
+        # 同じIssueの再追加は冪等なため、通信エラーでも再送してよい
+        data = self._post_graphql(payload, timeout=30)
+        if data and not data.get('errors') and data.get('data'):
+            return data['data']['addProjectV2ItemById']['item']['id']
+        return None
+    
+    def add_issues_to_project_batch(self, project_id: str, issues: List[Dict[str, Any]],
+                                    batch_size: int = 50) -> List[Optional[str]]:
+        """複数のIssueをエイリアス付きミューテーションでProjectに一括追加し、入力順のアイテムIDを返す"""
+        batch_size = calculate_batch_size(batch_size)
+        item_ids: List[Optional[str]] = []
+        
+        for batch in split_batches(issues, batch_size):
+            inputs = [{'projectId': project_id, 'contentId': issue['node_id']} for issue in batch]
+            query, variables, aliases = build_aliased_mutation(
+                'addProjectV2ItemById', 'AddProjectV2ItemByIdInput', inputs, 'item { id }'
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                if 'errors' not in data and 'data' in data:
-                    return data['data']['addProjectV2ItemById']['item']['id']
-            return None
-        except:
-            return None
+            data = self.graphql_request_full(query, variables, timeout=60)
+            results, errors = map_alias_results(data, aliases)
+            
+            for issue, alias, result in zip(batch, aliases, results):
+                if result and result.get('item'):
+                    item_ids.append(result['item']['id'])
+                else:
+                    print(f"    ❌ Link failed for #{issue.get('number', '?')}: {errors.get(alias)}")
+                    item_ids.append(None)
+        
+        return item_ids
     
-    def graphql_request(self, query: str, variables: Dict = None, timeout: int = 30) -> Dict:
-        """GraphQL APIリクエスト実行"""
-        payload = {'query': query}
-        if variables:
-            payload['variables'] = variables
+    def get_label_ids(self, label_names: List[str]) -> Dict[str, str]:
+        """ラベル名からノードIDを取得（存在しないラベルはREST APIで作成）"""
+        if self.label_ids is None:
+            # 全ラベルがレジストリに記録済みの場合は一覧を取得しない
+            known = self.registry.label_ids(label_names)
+            if known is not None:
+                return known
+            
+            # 複数のワーカーが同時に呼び出しても一覧の取得は1回だけ行う
+            self.single_flight.do('labels', self._load_label_ids)
+        
+        for name in label_names:
+            if name not in self.label_ids:
+                # 同じラベルを同時に作成しようとした場合は1回のPOSTを共有する
+                self.single_flight.do(('label', name), lambda: self._create_label(name))
         
+        return {name: self.label_ids[name] for name in label_names if name in self.label_ids}
+    
+    def _create_label(self, name: str):
+        """ラベルをREST APIで作成してキャッシュに追加"""
+        if name in self.label_ids:
+            return
         try:
-            response = requests.post(
-                self.graphql_url, 
-                json=payload, 
-                headers=self.graphql_headers,
-                timeout=timeout
+            identity = self._pace('core', write=True)
+            started = self.metrics.timer()
+            response = self.transport.post(
+                f"{self.api_base}/repos/{self.repository}/labels",
+                data=self.payload_encoder.encode({'name': name, 'color': 'ededed'}),
+                headers=identity.rest_json_headers,
+                timeout=30
             )
+            self.metrics.record_response(self.LABELS_ENDPOINT, response, self.metrics.timer() - started)
+            self.check_rate_limit_headers(response, identity)
+            if response.status_code == 201:
+                self.label_ids[name] = response.json()['node_id']
+                self.query_cache.invalidate(TAG_LABELS)
+                self.registry.record_labels({name: self.label_ids[name]})
+                print(f"  🏷️ Created label: {name}")
+            else:
+                print(f"  ⚠️ Failed to create label {name}: {response.status_code}")
+        except Exception as e:
+            print(f"  ⚠️ Failed to create label {name}: {str(e)}")
+    
+    def _load_label_ids(self):
+        """リポジトリの全ラベルを取得してラベル名 -> ノードIDのキャッシュを構築"""
+        if self.label_ids is not None:
+            return
+        label_ids = {}
+        cursor = None
+        while True:
+            variables = {'owner': self.owner, 'name': self.repo_name, 'cursor': cursor}
+            result = self.graphql_request(self.LABELS_QUERY, variables, cache_tags=[TAG_LABELS])
+            if not result or 'repository' not in result:
+                break
+            labels = result['repository']['labels']
+            for label in labels['nodes']:
+                label_ids[label['name']] = label['id']
+            if not labels['pageInfo']['hasNextPage']:
+                break
+            cursor = labels['pageInfo']['endCursor']
+        self.label_ids = label_ids
+        self.registry.record_labels(label_ids)
+    
+    def create_issues_graphql(self, issues_data: List[Tuple[Dict, str]],
+                              repository_id: str,
+                              project_ids_by_type: Dict[str, str],
+                              batch_size: int = 10,
+                              attempt: int = 0) -> List[Tuple[Dict, str, Optional[Dict]]]:
+        """エイリアス付きcreateIssueミューテーションで複数Issueを作成し、同時にProjectへ追加
+        
+        戻り値はリクエストごとの (Issue作成用データ, Issue種別, 作成されたIssue または None)。
+        結果はミューテーションのエイリアスでリクエストと対応付ける。
+        作成された Issue は REST API と同じキー（node_id, number, html_url, title, labels）に揃える。
+        バッチの一部がレート制限で失敗した場合は、待機後に失敗した分だけを再送する（attempt は再送回数）。
+        """
+        outcomes = []
+        batch_size = calculate_batch_size(batch_size)
+        
+        for batch in split_batches(issues_data, batch_size):
+            label_names = sorted({label for issue_data, _ in batch for label in issue_data.get('labels', [])})
+            label_ids = self.get_label_ids(label_names)
             
-            if response.status_code != 200:
-                print(f"❌ GraphQL Error: {response.status_code} - {response.text}")
-                return {}
+            inputs = []
+            for issue_data, issue_type in batch:
+                input_data = {
+                    'repositoryId': repository_id,
+                    'title': issue_data['title'],
+                    'body': issue_data.get('body', ''),
+                    'labelIds': [label_ids[label] for label in issue_data.get('labels', []) if label in label_ids]
+                }
+                project_id = project_ids_by_type.get(issue_type)
+                if project_id:
+                    input_data['projectV2Ids'] = [project_id]
+                inputs.append(input_data)
             
-            data = response.json()
-            if 'errors' in data:
-                print(f"❌ GraphQL Errors: {data['errors']}")
-                return {}
+            query, variables, aliases = build_aliased_mutation(
+                'createIssue', 'CreateIssueInput', inputs, 'issue { id number url title }'
+            )
+            failures: List[RetryDecision] = []
+            data = self.graphql_request_full(query, variables, timeout=60, write=True,
+                                             write_count=len(batch), failures=failures)
+            results, errors = map_alias_results(data, aliases)
+            requests_by_alias = dict(zip(aliases, batch))
+            issues_by_alias = {}
+            for alias, result in zip(aliases, results):
+                issue = (result or {}).get('issue')
+                if issue:
+                    issue_data, issue_type = requests_by_alias[alias]
+                    issues_by_alias[alias] = {
+                        'node_id': issue['id'],
+                        'number': issue['number'],
+                        'html_url': issue['url'],
+                        'title': issue['title'],
+                        'labels': [{'name': label} for label in issue_data.get('labels', [])],
+                        'linked_to_project': bool(project_ids_by_type.get(issue_type))
+                    }
+                    print(f"  ✅ {issue_type} #{issue['number']}: {issue['title'][:50]}...")
             
-            return data.get('data', {})
+            # タイムアウトや5xxではバッチが作成済みの可能性があるため、失敗扱いにする前に本文のマーカーで確認
+            if data is None and failures and failures[-1].ambiguous and self.issue_index is not None:
+                self.refresh_recent_issues(len(batch) + 20)
+                for alias in aliases:
+                    issue_data, issue_type = requests_by_alias[alias]
+                    existing = self.issue_index.find(issue_data, issue_type)
+                    if existing:
+                        # Projectへの追加は確認できないため、リンク処理に任せる（再追加は冪等）
+                        issues_by_alias[alias] = dict(existing, linked_to_project=False)
+                        print(f"  ♻️ {issue_type} already created (#{existing.get('number')}): {issue_data['title'][:50]}...")
             
-        except Exception as e:
-            print(f"❌ GraphQL Request Exception: {str(e)}")
+            # 成功したエイリアスを再作成しないよう、レート制限で失敗した分だけを再送する
+            retried = None
+            if data is not None and failures and failures[-1].retry and attempt + 1 < self.retry_policy.max_retries:
+                pending = [requests_by_alias[alias] for alias in aliases if alias not in issues_by_alias]
+                decision = failures[-1]
+                print(f"  ⏳ GraphQL {decision.kind}: retrying {len(pending)} of {len(batch)} issues, waiting {decision.delay:.0f}s...")
+                self._backoff(f"POST /graphql {graphql_operation(query)}", decision, 'graphql', write=True)
+                retried = iter(self.create_issues_graphql(pending, repository_id, project_ids_by_type,
+                                                          batch_size, attempt + 1))
+            
+            for alias in aliases:
+                if retried is not None and alias not in issues_by_alias:
+                    outcomes.append(next(retried))
+                    continue
+                issue_data, issue_type = requests_by_alias[alias]
+                issue = issues_by_alias.get(alias)
+                if issue is None:
+                    print(f"  ❌ {issue_type} failed: {issue_data['title'][:50]}... ({errors.get(alias)})")
+                outcomes.append((issue_data, issue_type, issue))
+        
+        return outcomes
+    
+    def _post_graphql(self, payload: Dict, timeout: int = 30, write: bool = False,
+                      write_count: int = 1, idempotent: bool = True,
+                      failures: Optional[List[RetryDecision]] = None) -> Optional[Dict]:
+        """GraphQL APIにPOSTし、リトライポリシーに従って再試行したレスポンス全体を返す
+        
+        レート制限以外のGraphQLエラーはそのまま返す。idempotent=False の場合、
+        書き込みが受理済みの可能性があるエラー（5xx・通信エラー）では再送せず、
+        一部のエイリアスが成功したレスポンスはレート制限でもそのまま返す（成功分を再作成しないため）。
+        None または再送可能なエラー付きのレスポンスを返す場合は、failures に最後のリトライ判定を追加する。
+        同じクエリ・変数の読み取りが実行中の場合は、その結果を共有する。
+        """
+        query = payload.get('query') or ''
+        if write or query.lstrip().startswith('mutation'):
+            return self._send_graphql(payload, timeout, write, write_count, idempotent, failures)
+        
+        key = ('POST', self.graphql_url) + QueryCache.make_key(query, payload.get('variables'))
+        return self.single_flight.do(key, lambda: self._send_graphql(payload, timeout, write, write_count, idempotent))
+    
+    def _send_graphql(self, payload: Dict, timeout: int, write: bool,
+                      write_count: int, idempotent: bool,
+                      failures: Optional[List[RetryDecision]] = None) -> Optional[Dict]:
+        """GraphQL APIへのPOSTとリトライ"""
+        endpoint = f"POST /graphql {graphql_operation(payload.get('query'))}"
+        body = self.payload_encoder.encode(payload)
+        reauthenticated = False
+        decision = None
+        
+        for attempt in range(self.retry_policy.max_retries):
+            started = self.metrics.timer()
+            identity = None
+            try:
+                identity = self._pace('graphql', write=write, count=write_count)
+                started = self.metrics.timer()
+                response = self.transport.post(
+                    self.graphql_url,
+                    data=body,
+                    headers=identity.graphql_headers,
+                    timeout=timeout
+                )
+                self.metrics.record_response(endpoint, response, self.metrics.timer() - started)
+                identity.rate_limiter.update(response.headers, 'graphql')
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    if not data.get('errors'):
+                        return data
+                    decision = self.retry_policy.evaluate_graphql(data['errors'], response.headers, attempt)
+                    if not decision.retry:
+                        return data
+                    if not idempotent and has_partial_results(data):
+                        if failures is not None:
+                            failures.append(decision)
+                        return data
+                else:
+                    decision = self.retry_policy.evaluate(response.status_code, response.headers, response.text, attempt)
+                    # インストールトークンが拒否された場合は再発行して1回だけ再送
+                    if decision.kind == AUTH_FAILURE and not reauthenticated and identity.reauthenticate(response):
+                        reauthenticated = True
+                        continue
+                    if not decision.retry or (decision.ambiguous and not idempotent):
+                        print(f"❌ GraphQL Error [{decision.kind}]: {response.status_code} - {response.text[:200]}")
+                        if failures is not None:
+                            failures.append(decision)
+                        return None
+            
+            except Exception as e:
+                self.metrics.record_request(endpoint, 'error', self.metrics.timer() - started)
+                decision = self.retry_policy.evaluate_exception(e, attempt)
+                if not decision.retry or not idempotent:
+                    print(f"❌ GraphQL Request Exception: {str(e)}")
+                    if failures is not None:
+                        failures.append(decision)
+                    return None
+            
+            print(f"  ⏳ GraphQL {decision.kind} [attempt {attempt + 1}], waiting {decision.delay:.0f}s...")
+            self._backoff(endpoint, decision, 'graphql', identity, write=write)
+        
+        if failures is not None and decision is not None:
+            failures.append(decision)
+        return None
+    
+    def graphql_request_full(self, query: str, variables: Dict = None, timeout: int = 30,
+                             write: bool = False, write_count: int = 1,
+                             failures: Optional[List[RetryDecision]] = None) -> Optional[Dict]:
+        """GraphQL APIリクエストを実行し、data と errors を含むレスポンス全体を返す（失敗時は failures に判定を追加）"""
+        payload = {'query': query}
+        if variables:
+            payload['variables'] = variables
+        
+        # 作成系ミューテーションは再送すると重複する可能性がある
+        return self._post_graphql(payload, timeout, write, write_count, idempotent=not write, failures=failures)
+    
+    def graphql_request(self, query: str, variables: Dict = None, timeout: int = 30,
+                        cache_tags: List[str] = None, invalidates: List[str] = None) -> Dict:
+        """GraphQL APIリクエスト実行
+        
+        cache_tags を指定した読み取りクエリは結果キャッシュを使用する。
+        invalidates を指定したミューテーションは、送信後に該当タグのキャッシュを無効化する。
+        """
+        payload = {'query': query}
+        if variables:
+            payload['variables'] = variables
+        
+        # ミューテーションはコンテンツ作成としてペーシングし、曖昧な失敗では再送しない
+        is_mutation = query.lstrip().startswith('mutation')
+        
+        use_cache = cache_tags is not None and not is_mutation
+        if use_cache:
+            cached = self.query_cache.get(query, variables)
+            if cached is not None:
+                return cached
+        
+        data = self._post_graphql(payload, timeout, write=is_mutation, idempotent=not is_mutation)
+        
+        # 失敗時も書き込みが受理済みの可能性があるため無効化する
+        if invalidates:
+            self.query_cache.invalidate(*invalidates)
+        
+        if data is None:
             return {}
+        
+        if 'errors' in data:
+            print(f"❌ GraphQL Errors: {data['errors']}")
+            return {}
+        
+        result = data.get('data') or {}
+        if use_cache:
+            self.query_cache.set(query, variables, result, cache_tags)
+        return result
     
     # Repository and Project Management Methods
     
-    def get_repository_info(self) -> Optional[Dict]:
-        """リポジトリ情報と既存プロジェクトを取得"""
-        query = """
-        query($owner: String!, $name: String!) {
-            repository(owner: $owner, name: $name) {
-                id
-                owner {
-                    id
-                    __typename
-                }
-                projectsV2(first: 100) {
-                    nodes {
-                        id
-                        title
-                        number
-                        url
-                    }
-                }
-            }
-        }
+    def get_repository_info(self, refresh: bool = False) -> Optional[Dict]:
+        """リポジトリ情報と既存プロジェクトを取得（レジストリに有効な記録があればそれを使用）
+        
+        refresh=True の場合はレジストリとクエリキャッシュを使わずに取得し、削除済みのプロジェクトをレジストリから除く。
         """
+        if refresh:
+            self.query_cache.invalidate(TAG_REPOSITORY, TAG_PROJECTS)
+        else:
+            repo_info = self.registry.repository_info()
+            if repo_info:
+                return repo_info
         
         variables = {
             'owner': self.owner,
             'name': self.repo_name
         }
         
-        result = self.graphql_request(query, variables)
+        result = self.graphql_request(self.REPOSITORY_INFO_QUERY, variables,
+                                      cache_tags=[TAG_REPOSITORY, TAG_PROJECTS])
+        repo_info = self.parse_repository_info(result)
+        if repo_info:
+            self.registry.record_repository_info(repo_info)
+        return repo_info
+    
+    @staticmethod
+    def parse_repository_info(result: Dict) -> Optional[Dict]:
+        """リポジトリ情報クエリの結果を整形"""
         if result and 'repository' in result:
             return {
                 'repository_id': result['repository']['id'],
@@ -288,9 +833,11 @@ class GitHubAPI:
             'repositoryId': repo_info['repository_id']
         }
         
-        result = self.graphql_request(query, variables)
+        result = self.graphql_request(query, variables, invalidates=[TAG_PROJECTS])
         if result and 'createProjectV2' in result:
-            return result['createProjectV2']['projectV2']['id']
+            project = result['createProjectV2']['projectV2']
+            self.registry.record_project(project)
+            return project['id']
         return None
     
     # Discussion Management Methods
@@ -318,7 +865,7 @@ class GitHubAPI:
             'name': self.repo_name
         }
         
-        result = self.graphql_request(query, variables)
+        result = self.graphql_request(query, variables, cache_tags=[TAG_DISCUSSION_CATEGORIES])
         if result and 'repository' in result:
             return result['repository']['discussionCategories']['nodes']
         return []
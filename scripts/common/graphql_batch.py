@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+GraphQLエイリアスバッチの共通モジュール
+複数のミューテーションを1つのGraphQLドキュメントにまとめて送信する
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# GitHubのセカンダリレート制限ではミューテーション1件あたり5ポイントとして計算される
+MUTATION_POINTS = 5
+
+# 1リクエストあたりのポイント上限（GraphQLは毎分2000ポイントまで）
+DEFAULT_MAX_POINTS = 250
+
+
+def calculate_batch_size(requested_size: int, max_points: int = DEFAULT_MAX_POINTS) -> int:
+    """ポイント上限内に収まるバッチサイズを計算"""
+    return max(1, min(requested_size, max_points // MUTATION_POINTS))
+
+
+def split_batches(items: List[Any], batch_size: int) -> List[List[Any]]:
+    """リストをバッチサイズごとに分割"""
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+def build_aliased_mutation(mutation_name: str, input_type: str,
+                           inputs: List[Dict[str, Any]], selection: str) -> Tuple[str, Dict[str, Any], List[str]]:
+    """エイリアス付きミューテーションを組み立てる
+    
+    a0: mutation_name(input: $i0) { selection } a1: ... の形式で、
+    各入力は $i0, $i1 ... の変数として渡す。
+    戻り値は (クエリ, 変数, エイリアス一覧)。
+    """
+    aliases = [f"a{i}" for i in range(len(inputs))]
+    declarations = ', '.join(f"$i{i}: {input_type}!" for i in range(len(inputs)))
+    fields = '\n'.join(
+        f"    {alias}: {mutation_name}(input: $i{i}) {{ {selection} }}"
+        for i, alias in enumerate(aliases)
+    )
+    
+    query = f"mutation({declarations}) {{\n{fields}\n}}"
+    variables = {f"i{i}": input_data for i, input_data in enumerate(inputs)}
+    return query, variables, aliases
+
+
+def has_partial_results(data: Optional[Dict]) -> bool:
+    """エラー付きのレスポンスに成功したフィールド（エイリアス）の結果が含まれるか"""
+    return any(result is not None for result in ((data or {}).get('data') or {}).values())
+
+
+def map_alias_results(data: Optional[Dict], aliases: List[str]) -> Tuple[List[Optional[Dict]], Dict[str, str]]:
+    """レスポンスをエイリアスごとの結果とエラーに振り分ける
+    
+    部分的に失敗した場合も成功したエイリアスの結果は返す。
+    戻り値は (エイリアス順の結果リスト, {エイリアス: エラーメッセージ})。
+    """
+    data = data or {}
+    payload = data.get('data') or {}
+    
+    errors = {}
+    general_error = None
+    for error in data.get('errors') or []:
+        path = error.get('path') or []
+        alias = path[0] if path else None
+        message = error.get('message', 'Unknown error')
+        if alias in aliases:
+            errors[alias] = message
+        elif general_error is None:
+            general_error = message
+    
+    results = []
+    for alias in aliases:
+        result = payload.get(alias)
+        if result is None and alias not in errors:
+            # エイリアスを特定できないエラーは結果のないエイリアスに適用
+            errors[alias] = general_error or 'No result returned'
+        results.append(result)
+    
+    return results, errors
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+HTTP条件付きリクエストキャッシュの共通モジュール
+REST GET のレスポンスを ETag / Last-Modified と共にディスクに保存し、
+再取得時は If-None-Match / If-Modified-Since を送信して 304 ならキャッシュした本文を返す
+（GitHubの 304 レスポンスはプライマリレート制限を消費しない）
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpCache:
+    """ETag / Last-Modified によるディスクキャッシュクラス
+    
+    キャッシュキーは URL と Authorization ヘッダーのハッシュ（トークンごとに結果が異なるため）。
+    ETag も Last-Modified も無いレスポンスは保存しない。
+    """
+    
+    DEFAULT_DIRECTORY = '.setup_cache/http'
+    
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        
+        os.makedirs(self.directory, exist_ok=True)
+    
+    @classmethod
+    def from_environment(cls) -> Optional['HttpCache']:
+        """環境変数 HTTP_CACHE_DIR からキャッシュを作成（空文字の場合はキャッシュ無効）"""
+        directory = os.environ.get('HTTP_CACHE_DIR', cls.DEFAULT_DIRECTORY)
+        if not directory:
+            return None
+        try:
+            return cls(directory)
+        except OSError as e:
+            print(f"⚠️ HTTP cache disabled: {str(e)}")
+            return None
+    
+    def _path(self, url: str, headers: Optional[Dict[str, str]]) -> str:
+        """キャッシュファイルのパスを取得"""
+        authorization = (headers or {}).get('Authorization', '')
+        key = hashlib.sha256(f"{url}\n{authorization}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        """キャッシュエントリを読み込み（壊れている場合は None）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _store(self, path: str, url: str, response: requests.Response):
+        """検証子付きの 200 レスポンスを保存"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': dict(response.headers),
+            'body': response.content.decode('utf-8', errors='replace'),
+            'stored_at': time.time()
+        }
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"  ⚠️ Could not write HTTP cache entry: {str(e)}")
+            return
+        with self.lock:
+            self.stores += 1
+    
+    @staticmethod
+    def _cached_response(entry: Dict[str, Any], not_modified: requests.Response) -> requests.Response:
+        """304 レスポンスとキャッシュ本文から 200 レスポンスを組み立てる"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry['url']
+        response.encoding = 'utf-8'
+        response._content = entry['body'].encode('utf-8')
+        # レート制限ヘッダーなどは 304 の最新値で上書きする
+        headers = CaseInsensitiveDict(entry.get('headers') or {})
+        headers.update(not_modified.headers)
+        headers.pop('Content-Length', None)
+        response.headers = headers
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
+    
+    def get(self, session: requests.Session, url: str, headers: Optional[Dict[str, str]] = None,
+            **kwargs: Any) -> requests.Response:
+        """条件付きGETを送信し、304 の場合はキャッシュした本文を返す"""
+        path = self._path(url, headers)
+        entry = self._load(path)
+        
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = session.get(url, headers=request_headers, **kwargs)
+        
+        if response.status_code == 304 and entry:
+            with self.lock:
+                self.hits += 1
+            return self._cached_response(entry, response)
+        
+        with self.lock:
+            self.misses += 1
+        self._store(path, url, response)
+        return response
+    
+    def stats(self) -> Dict[str, Any]:
+        """ヒット・ミス件数とヒット率を取得"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+    
+    def print_summary(self):
+        """キャッシュの統計を表示"""
+        stats = self.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"💽 HTTP cache: {stats['hits']} hits / {stats['hits'] + stats['misses']} GETs "
+                  f"({stats['hit_rate'] * 100:.1f}% served by 304)")
\ No newline at end of file
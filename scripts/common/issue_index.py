@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+既存Issueインデックスの共通モジュール
+リポジトリの既存Issueをタイトル・フィンガープリントで索引し、重複作成を防ぐ
+"""
+
+import threading
+from typing import Dict, Any, Optional
+
+from .issue_processor import compute_fingerprint, extract_fingerprint_marker
+
+
+class ExistingIssueIndex:
+    """既存Issueインデックスクラス
+    
+    本文末尾の非表示マーカーに埋め込まれたフィンガープリントで照合し、
+    マーカーのない（以前の実行で作成された）Issueだけをタイトルで照合する。
+    マーカーのフィンガープリントが異なるIssue（CSVの行を編集した場合など）はタイトルが同じでも一致としない。
+    """
+    
+    def __init__(self):
+        self.by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        self.by_title: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.by_fingerprint) + len(self.by_title)
+    
+    def add(self, issue: Dict[str, Any]):
+        """Issueをインデックスに追加（キーは REST API 形式の Issue）"""
+        fingerprint = extract_fingerprint_marker(issue.get('body', ''))
+        entry = {key: value for key, value in issue.items() if key != 'body'}
+        
+        with self.lock:
+            if fingerprint:
+                self.by_fingerprint[fingerprint] = entry
+            else:
+                self.by_title.setdefault(issue.get('title', ''), entry)
+    
+    def find(self, issue_data: Dict[str, Any], issue_type: str) -> Optional[Dict[str, Any]]:
+        """作成リクエストに一致する既存Issueを検索"""
+        fingerprint = compute_fingerprint(issue_data, issue_type)
+        with self.lock:
+            existing = self.by_fingerprint.get(fingerprint) or self.by_title.get(issue_data.get('title', ''))
+        return dict(existing) if existing else None
\ No newline at end of file
@@ -4,16 +4,50 @@ Issue処理の共通モジュール
 """
 
 import re
-from typing import Dict, List, Tuple, Any
+import json
+import hashlib
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple, Any, Optional
 
 from .config import IssueTypeConfig
 
+# Issue本文末尾に埋め込む非表示マーカー（再実行時の重複検出用）
+FINGERPRINT_MARKER_FORMAT = '<!-- academy-setup:fingerprint={} -->'
+FINGERPRINT_MARKER_PATTERN = re.compile(r'\s*<!-- academy-setup:fingerprint=([0-9a-f]+) -->\s*$')
+
+
+def strip_fingerprint_marker(body: str) -> str:
+    """本文からフィンガープリントマーカーを除去"""
+    return FINGERPRINT_MARKER_PATTERN.sub('', body or '')
+
+
+def extract_fingerprint_marker(body: str) -> Optional[str]:
+    """本文に埋め込まれたフィンガープリントを取得"""
+    match = FINGERPRINT_MARKER_PATTERN.search(body or '')
+    return match.group(1) if match else None
+
+
+def compute_fingerprint(issue_data: Dict[str, Any], issue_type: str) -> str:
+    """Issue作成リクエストのフィンガープリントを計算（入力行の同一性判定用）"""
+    source = json.dumps([
+        issue_type,
+        issue_data.get('title', ''),
+        strip_fingerprint_marker(issue_data.get('body', '')),
+        sorted(issue_data.get('labels', []))
+    ], ensure_ascii=False)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:32]
+
 
 class IssueProcessor:
     """Issue処理クラス"""
     
     def __init__(self, issue_type_config: IssueTypeConfig):
         self.issue_type_config = issue_type_config
+        # 既存Issueと一致したため作成対象から除外したIssue（リンク処理用）
+        self.existing_issues: List[Dict] = []
+        # iter_issue_requests で読み込んだ行数・生成したリクエスト数（Issue種別ごと）
+        self.row_counts: Counter = Counter()
+        self.prepared_counts: Counter = Counter()
     
     def prepare_issue_data(self, issues: List[Dict], issue_type: str) -> List[Tuple[Dict, str]]:
         """Issue作成用のデータを準備（番号付きタイトル）"""
@@ -24,51 +58,62 @@ class IssueProcessor:
             print(f"⚠️ Unknown issue type: {issue_type}")
             return []
         
+        for index, row in enumerate(issues, 1):
+            request = self.build_issue_request(row, index, issue_type, config)
+            if request:
+                issue_requests.append(request)
+        
+        return issue_requests
+    
+    def build_issue_request(self, row: Dict, index: int, issue_type: str,
+                            config: Dict[str, Any]) -> Optional[Tuple[Dict, str]]:
+        """CSVの1行からIssue作成用のデータを作成（index はタイトル番号）"""
         title_prefix = config.get('title_prefix', '')
         default_labels = config.get('labels', [])
         numbered_title = config.get('numbered_title', True)
         
-        for index, row in enumerate(issues, 1):
-            title = row.get('title', '').strip()
-            body = row.get('body', '').strip()
-            
-            if not title:
-                continue
-            
-            # タイトルに番号を追加（設定に応じて）
-            if numbered_title and title_prefix:
-                # タイトル接頭辞で始まる場合は、番号を置き換え
-                if title.startswith(title_prefix):
-                    match = re.match(rf'{title_prefix}[\d\s:.]*(.+)', title)
-                    if match:
-                        clean_title = match.group(1).strip()
-                    else:
-                        clean_title = title
-                    numbered_title_text = f"{title_prefix}{index:03d}: {clean_title}"
+        title = row.get('title', '').strip()
+        body = row.get('body', '').strip()
+        
+        if not title:
+            return None
+        
+        # タイトルに番号を追加（設定に応じて）
+        if numbered_title and title_prefix:
+            # タイトル接頭辞で始まる場合は、番号を置き換え
+            if title.startswith(title_prefix):
+                match = re.match(rf'{title_prefix}[\d\s:.]*(.+)', title)
+                if match:
+                    clean_title = match.group(1).strip()
                 else:
-                    numbered_title_text = f"{title_prefix}{index:03d}: {title}"
+                    clean_title = title
+                numbered_title_text = f"{title_prefix}{index:03d}: {clean_title}"
             else:
-                # 番号付けしない場合（KPT等）はそのまま使用
-                numbered_title_text = title
-            
-            # CSVからラベルを取得（"task,Required"のような形式に対応）
-            labels_str = row.get('labels', '').strip()
-            if labels_str.startswith('"') and labels_str.endswith('"'):
-                labels_str = labels_str[1:-1]  # クォートを除去
-            existing_labels = [label.strip() for label in labels_str.split(',') if label.strip()]
-            
-            # デフォルトラベルがない場合は追加
-            all_labels = list(set(existing_labels + default_labels))
-            
-            issue_data = {
-                'title': numbered_title_text,
-                'body': body,
-                'labels': all_labels
-            }
-            
-            issue_requests.append((issue_data, issue_type))
+                numbered_title_text = f"{title_prefix}{index:03d}: {title}"
+        else:
+            # 番号付けしない場合（KPT等）はそのまま使用
+            numbered_title_text = title
         
-        return issue_requests
+        # CSVからラベルを取得（"task,Required"のような形式に対応）
+        labels_str = row.get('labels', '').strip()
+        if labels_str.startswith('"') and labels_str.endswith('"'):
+            labels_str = labels_str[1:-1]  # クォートを除去
+        existing_labels = [label.strip() for label in labels_str.split(',') if label.strip()]
+        
+        # デフォルトラベルがない場合は追加
+        all_labels = list(set(existing_labels + default_labels))
+        
+        issue_data = {
+            'title': numbered_title_text,
+            'body': body,
+            'labels': all_labels
+        }
+        
+        # 再実行時の重複検出用にフィンガープリントを本文末尾へ埋め込む
+        fingerprint = compute_fingerprint(issue_data, issue_type)
+        issue_data['body'] = f"{body}\n\n{FINGERPRINT_MARKER_FORMAT.format(fingerprint)}"
+        
+        return issue_data, issue_type
     
     def classify_created_issues(self, created_issues: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
         """作成されたIssueをタイプ別に分類"""
@@ -84,18 +129,81 @@ class IssueProcessor:
         
         return task_created, kpt_created
     
-    def prepare_all_issue_data(self, task_data: List[Dict], 
-                              kpt_data: List[Dict]) -> List[Tuple[Dict, str]]:
-        """全Issue種別のデータを準備"""
+    def drop_existing_issues(self, issue_requests: List[Tuple[Dict, str]],
+                             existing_index: Any) -> List[Tuple[Dict, str]]:
+        """既存Issueと一致するリクエストを除外"""
+        pending_requests = []
+        for issue_data, issue_type in issue_requests:
+            existing = existing_index.find(issue_data, issue_type)
+            if existing:
+                self.existing_issues.append(existing)
+            else:
+                pending_requests.append((issue_data, issue_type))
+        return pending_requests
+    
+    def prepare_all_issue_data(self, task_data: List[Dict],
+                              kpt_data: List[Dict],
+                              existing_index: Any = None) -> List[Tuple[Dict, str]]:
+        """全Issue種別のデータを準備（existing_index指定時は既存Issueを除外）"""
         all_requests = []
         
         # 各Issue種別のデータを準備
         task_requests = self.prepare_issue_data(task_data, 'task')
         kpt_requests = self.prepare_issue_data(kpt_data, 'kpt')
         
+        if existing_index is not None:
+            task_requests = self.drop_existing_issues(task_requests, existing_index)
+            kpt_requests = self.drop_existing_issues(kpt_requests, existing_index)
+            if self.existing_issues:
+                print(f"⏭️ Skipping {len(self.existing_issues)} issues that already exist in the repository")
+        
         all_requests = task_requests + kpt_requests
         print(f"📋 Prepared requests: {len(all_requests)} issues total")
         print(f"  • Task: {len(task_requests)} issues")
         print(f"  • KPT: {len(kpt_requests)} issues")
         
-        return all_requests
\ No newline at end of file
+        return all_requests
+    
+    def build_issue_requests(self, rows: Iterable[Tuple[Dict, int, str]]) -> Iterator[Tuple[Dict, int, str]]:
+        """(行, 番号, Issue種別) を1件ずつ (Issue作成用データ, 番号, Issue種別) に変換"""
+        configs = {}
+        for row, index, issue_type in rows:
+            if issue_type not in configs:
+                configs[issue_type] = self.issue_type_config.get_issue_type(issue_type)
+                if not configs[issue_type]:
+                    print(f"⚠️ Unknown issue type: {issue_type}")
+            config = configs[issue_type]
+            if not config:
+                continue
+            
+            request = self.build_issue_request(row, index, issue_type, config)
+            if request:
+                yield request[0], index, issue_type
+    
+    def iter_prepared_requests(self, prepared: Iterable[Tuple[Dict, int, str]],
+                               existing_index: Any = None) -> Iterator[Tuple[Dict, str]]:
+        """準備済みのIssue作成用データを集計しながら返す（existing_index指定時は既存Issueを除外）"""
+        for issue_data, _, issue_type in prepared:
+            self.row_counts[issue_type] += 1
+            
+            if existing_index is not None:
+                existing = existing_index.find(issue_data, issue_type)
+                if existing:
+                    self.existing_issues.append(existing)
+                    continue
+            
+            self.prepared_counts[issue_type] += 1
+            yield issue_data, issue_type
+    
+    def iter_issue_requests(self, rows: Iterable[Tuple[Dict, int, str]],
+                            existing_index: Any = None) -> Iterator[Tuple[Dict, str]]:
+        """(行, 番号, Issue種別) を1件ずつIssue作成用のデータに変換（existing_index指定時は既存Issueを除外）"""
+        return self.iter_prepared_requests(self.build_issue_requests(rows), existing_index)
+    
+    def print_prepared_summary(self):
+        """iter_issue_requests の集計を表示"""
+        if self.existing_issues:
+            print(f"⏭️ Skipped {len(self.existing_issues)} issues that already exist in the repository")
+        print(f"📋 Prepared requests: {sum(self.prepared_counts.values())} issues total")
+        print(f"  • Task: {self.prepared_counts['task']} issues")
+        print(f"  • KPT: {self.prepared_counts['kpt']} issues")
\ No newline at end of file
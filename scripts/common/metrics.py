@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+APIメトリクスの共通モジュール
+エンドポイント別のリクエスト数・ステータス・レイテンシ、リトライ回数、転送量、
+意図的な待機時間（理由別）を記録し、JSON・Prometheusテキスト形式で出力する
+"""
+
+import re
+import json
+import math
+import time
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# 待機理由
+SLEEP_REQUEST_DELAY = 'request_delay'
+SLEEP_BATCH_PAUSE = 'batch_pause'
+SLEEP_BACKOFF = 'backoff'
+SLEEP_LINK_SPACING = 'link_spacing'
+SLEEP_RATE_LIMIT = 'rate_limit_pacing'
+
+GRAPHQL_OPERATION_PATTERN = re.compile(r'\{\s*(?:\w+\s*:\s*)?(\w+)')
+
+
+def graphql_operation(query: str) -> str:
+    """GraphQLクエリの最初のフィールド名（操作名）を取得"""
+    match = GRAPHQL_OPERATION_PATTERN.search(query or '')
+    return match.group(1) if match else 'unknown'
+
+
+def _request_size(response: Any) -> int:
+    """レスポンスに対応するリクエスト本文のバイト数（requests / httpx 両対応）"""
+    request = getattr(response, 'request', None)
+    if request is None:
+        return 0
+    body = getattr(request, 'body', None)
+    if body is None:
+        try:
+            body = getattr(request, 'content', None)
+        except Exception:
+            body = None
+    if body is None:
+        return 0
+    return len(body.encode('utf-8')) if isinstance(body, str) else len(body)
+
+
+class MetricsRecorder:
+    """APIメトリクス記録クラス
+    
+    GitHubAPI・AsyncGitHubAPI・BatchProcessor で共有し、1回の実行分を集計する。
+    GitHub側の遅さ（レイテンシ）と自前のペーシング（待機時間）を切り分けるためのもの。
+    timer（レイテンシ計測）と sleeper（待機）は仮想時計に差し替えられる。
+    """
+    
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    PERCENTILES = (50, 90, 95, 99)
+    
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 timer: Callable[[], float] = time.perf_counter,
+                 sleeper: Callable[[float], None] = time.sleep):
+        self.clock = clock
+        self.timer = timer
+        self.sleeper = sleeper
+        self.started = clock()
+        self.lock = threading.Lock()
+        
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.retries: Dict[str, Counter] = {}
+        self.sleeps: Dict[str, Dict[str, float]] = {}
+    
+    def _endpoint(self, endpoint: str) -> Dict[str, Any]:
+        """エンドポイントの集計領域を取得（ロック内で呼び出す）"""
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = {
+                'count': 0,
+                'status_codes': Counter(),
+                'latencies': [],
+                'bytes_sent': 0,
+                'bytes_received': 0
+            }
+        return self.endpoints[endpoint]
+    
+    def record_request(self, endpoint: str, status: Any, latency: float,
+                       bytes_sent: int = 0, bytes_received: int = 0):
+        """リクエスト1件を記録（通信エラーの場合 status は 'error'）"""
+        with self.lock:
+            stats = self._endpoint(endpoint)
+            stats['count'] += 1
+            stats['status_codes'][str(status)] += 1
+            stats['latencies'].append(latency)
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+    
+    def record_response(self, endpoint: str, response: Any, latency: float):
+        """HTTPレスポンスからリクエスト1件を記録（HTTPキャッシュから返した場合は 304 として記録）"""
+        status = 304 if getattr(response, 'from_cache', False) else response.status_code
+        self.record_request(
+            endpoint, status, latency,
+            _request_size(response), len(response.content or b'')
+        )
+    
+    def record_retry(self, endpoint: str, kind: str):
+        """リトライを記録"""
+        with self.lock:
+            self.retries.setdefault(endpoint, Counter())[kind] += 1
+    
+    def record_sleep(self, reason: str, seconds: float):
+        """意図的な待機時間を記録"""
+        if seconds <= 0:
+            return
+        with self.lock:
+            entry = self.sleeps.setdefault(reason, {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+    
+    def sleep(self, reason: str, seconds: float, sleeper: Optional[Callable[[float], None]] = None):
+        """待機して待機時間を記録"""
+        if seconds <= 0:
+            return
+        (sleeper or self.sleeper)(seconds)
+        self.record_sleep(reason, seconds)
+    
+    @staticmethod
+    def percentile(sorted_values: List[float], pct: float) -> float:
+        """ソート済みの値からパーセンタイルを計算（最近傍順位法）"""
+        if not sorted_values:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+    
+    def summary(self) -> Dict[str, Any]:
+        """集計結果を取得"""
+        with self.lock:
+            endpoints = {}
+            for endpoint, stats in sorted(self.endpoints.items()):
+                latencies = sorted(stats['latencies'])
+                endpoints[endpoint] = {
+                    'count': stats['count'],
+                    'status_codes': dict(stats['status_codes']),
+                    'latency_seconds': {
+                        'total': round(sum(latencies), 4),
+                        'mean': round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+                        'max': round(latencies[-1], 4) if latencies else 0.0,
+                        **{f"p{pct}": round(self.percentile(latencies, pct), 4) for pct in self.PERCENTILES}
+                    },
+                    'bytes_sent': stats['bytes_sent'],
+                    'bytes_received': stats['bytes_received'],
+                    'retries': dict(self.retries.get(endpoint, {}))
+                }
+            
+            sleeps = {reason: {'count': entry['count'], 'seconds': round(entry['seconds'], 3)}
+                      for reason, entry in sorted(self.sleeps.items())}
+            
+            return {
+                'elapsed_seconds': round(self.clock() - self.started, 3),
+                'requests': sum(stats['count'] for stats in self.endpoints.values()),
+                'retries': sum(sum(counter.values()) for counter in self.retries.values()),
+                'bytes_sent': sum(stats['bytes_sent'] for stats in self.endpoints.values()),
+                'bytes_received': sum(stats['bytes_received'] for stats in self.endpoints.values()),
+                'api_seconds': round(sum(sum(stats['latencies']) for stats in self.endpoints.values()), 3),
+                'sleep_seconds': round(sum(entry['seconds'] for entry in self.sleeps.values()), 3),
+                'endpoints': endpoints,
+                'sleeps': sleeps
+            }
+    
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Prometheusラベル値をエスケープ"""
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def to_prometheus(self, prefix: str = 'academy_setup') -> str:
+        """Prometheusテキスト形式に変換"""
+        with self.lock:
+            endpoints = {endpoint: dict(stats, latencies=list(stats['latencies']),
+                                        status_codes=Counter(stats['status_codes']))
+                         for endpoint, stats in self.endpoints.items()}
+            retries = {endpoint: Counter(counter) for endpoint, counter in self.retries.items()}
+            sleeps = {reason: dict(entry) for reason, entry in self.sleeps.items()}
+        
+        lines = [
+            f"# HELP {prefix}_requests_total GitHub API requests by endpoint and status.",
+            f"# TYPE {prefix}_requests_total counter"
+        ]
+        for endpoint, stats in sorted(endpoints.items()):
+            for status, count in sorted(stats['status_codes'].items()):
+                lines.append(f'{prefix}_requests_total{{endpoint="{self._escape(endpoint)}",status="{status}"}} {count}')
+        
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds GitHub API request latency.",
+            f"# TYPE {prefix}_request_duration_seconds histogram"
+        ]
+        for endpoint, stats in sorted(endpoints.items()):
+            label = f'endpoint="{self._escape(endpoint)}"'
+            latencies = stats['latencies']
+            for bucket in self.LATENCY_BUCKETS:
+                count = sum(1 for latency in latencies if latency <= bucket)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="{bucket}"}} {count}')
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="+Inf"}} {len(latencies)}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{{label}}} {sum(latencies):.6f}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{{label}}} {len(latencies)}')
+        
+        lines += [
+            f"# HELP {prefix}_request_bytes_total Request and response body bytes by endpoint.",
+            f"# TYPE {prefix}_request_bytes_total counter"
+        ]
+        for endpoint, stats in sorted(endpoints.items()):
+            label = f'endpoint="{self._escape(endpoint)}"'
+            lines.append(f'{prefix}_request_bytes_total{{{label},direction="sent"}} {stats["bytes_sent"]}')
+            lines.append(f'{prefix}_request_bytes_total{{{label},direction="received"}} {stats["bytes_received"]}')
+        
+        lines += [
+            f"# HELP {prefix}_retries_total Retries by endpoint and error kind.",
+            f"# TYPE {prefix}_retries_total counter"
+        ]
+        for endpoint, counter in sorted(retries.items()):
+            for kind, count in sorted(counter.items()):
+                lines.append(f'{prefix}_retries_total{{endpoint="{self._escape(endpoint)}",kind="{kind}"}} {count}')
+        
+        lines += [
+            f"# HELP {prefix}_sleep_seconds_total Deliberate sleep time by reason.",
+            f"# TYPE {prefix}_sleep_seconds_total counter"
+        ]
+        for reason, entry in sorted(sleeps.items()):
+            lines.append(f'{prefix}_sleep_seconds_total{{reason="{reason}"}} {entry["seconds"]:.6f}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def export(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        """JSON・Prometheusテキスト形式のファイルに出力"""
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            print(f"📈 Metrics saved to {json_path}")
+        if prometheus_path:
+            with open(prometheus_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            print(f"📈 Prometheus metrics saved to {prometheus_path}")
+    
+    def print_summary(self):
+        """時間の内訳（API待ち・意図的な待機）を表示"""
+        summary = self.summary()
+        print(f"📈 API metrics:")
+        print(f"  • Requests: {summary['requests']} ({summary['retries']} retries)")
+        print(f"  • Time in GitHub API: {summary['api_seconds']:.1f}s")
+        print(f"  • Time in deliberate sleeps: {summary['sleep_seconds']:.1f}s")
+        for reason, entry in summary['sleeps'].items():
+            print(f"    - {reason}: {entry['seconds']:.1f}s ({entry['count']} times)")
+        for endpoint, stats in summary['endpoints'].items():
+            latency = stats['latency_seconds']
+            print(f"  • {endpoint}: {stats['count']} requests, "
+                  f"p50 {latency['p50'] * 1000:.0f}ms, p95 {latency['p95'] * 1000:.0f}ms")
\ No newline at end of file
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+ノードIDレジストリの共通モジュール
+セットアップ中に取得・作成したノードID（リポジトリ、オーナー、プロジェクト、フィールド、
+単一選択オプション、ラベル）をバージョン付きJSONファイルに記録し、後続ステップで再利用する
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class NodeRegistry:
+    """ノードIDレジストリクラス
+    
+    各スクリプトはネットワークより先にレジストリを参照し、未登録か max_age 秒より古い場合のみ再取得する。
+    ファイル形式:
+      {"version": 1, "repository": "owner/repo", "updated_at": ..., "nodes": {キー: {"id": ..., "updated_at": ..., ...}}}
+    キー:
+      - repository / owner
+      - project:{タイトル}                 （number, url）
+      - fields:{プロジェクトID}            （fields: {フィールド名: {"id": ..., "options": {オプション名: ID}}}）
+      - label:{ラベル名}
+    """
+    
+    VERSION = 1
+    DEFAULT_PATH = 'setup_registry.json'
+    DEFAULT_MAX_AGE = 86400.0
+    
+    def __init__(self, path: str = DEFAULT_PATH, repository: str = None,
+                 max_age: float = DEFAULT_MAX_AGE, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.repository = repository
+        self.max_age = max_age
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        
+        self._load()
+    
+    @classmethod
+    def from_environment(cls, repository: str = None) -> 'NodeRegistry':
+        """環境変数 NODE_REGISTRY_FILE / NODE_REGISTRY_MAX_AGE からレジストリを作成（ファイル名が空の場合は保存しない）"""
+        path = os.environ.get('NODE_REGISTRY_FILE', cls.DEFAULT_PATH)
+        try:
+            max_age = float(os.environ.get('NODE_REGISTRY_MAX_AGE') or cls.DEFAULT_MAX_AGE)
+        except ValueError:
+            print(f"⚠️ Invalid value for NODE_REGISTRY_MAX_AGE: {os.environ.get('NODE_REGISTRY_MAX_AGE')}")
+            max_age = cls.DEFAULT_MAX_AGE
+        return cls(path, repository, max_age)
+    
+    def _load(self):
+        """既存のレジストリを読み込み（バージョン・リポジトリが異なる場合は使用しない）"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read node registry {self.path}: {str(e)}")
+            return
+        
+        if data.get('version') != self.VERSION:
+            print(f"⚠️ Ignoring node registry {self.path}: version {data.get('version')} (expected {self.VERSION})")
+            return
+        if self.repository and data.get('repository') != self.repository:
+            print(f"⚠️ Ignoring node registry {self.path}: recorded for {data.get('repository')}")
+            return
+        
+        self.nodes = data.get('nodes') or {}
+        print(f"🗂️ Node registry loaded: {len(self.nodes)} entries ({self.path})")
+    
+    def save(self):
+        """レジストリを一時ファイル経由でアトミックに保存"""
+        if not self.path:
+            return
+        with self.lock:
+            data = {
+                'version': self.VERSION,
+                'repository': self.repository,
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'nodes': self.nodes
+            }
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """有効なエントリを取得（未登録・期限切れの場合は None）"""
+        with self.lock:
+            entry = self.nodes.get(key)
+            if entry is None:
+                return None
+            if self.max_age > 0 and self.clock() - entry.get('updated_at', 0) > self.max_age:
+                return None
+            return entry
+    
+    def get_id(self, key: str) -> Optional[str]:
+        """有効なエントリのノードIDを取得"""
+        entry = self.get(key)
+        return entry['id'] if entry else None
+    
+    def put(self, key: str, node_id: str, save: bool = True, **attributes: Any):
+        """エントリを記録"""
+        with self.lock:
+            self.nodes[key] = {'id': node_id, 'updated_at': self.clock(), **attributes}
+        if save:
+            self.save()
+    
+    def forget(self, key: str):
+        """エントリを削除（ノードが削除されていた場合など）"""
+        with self.lock:
+            removed = self.nodes.pop(key, None)
+        if removed is not None:
+            self.save()
+    
+    # リポジトリ・プロジェクト
+    
+    def record_project(self, project: Dict[str, Any], save: bool = True):
+        """プロジェクトを記録"""
+        self.put(f"project:{project['title']}", project['id'], save,
+                 number=project.get('number'), url=project.get('url'))
+    
+    def record_repository_info(self, repo_info: Dict[str, Any]):
+        """リポジトリ情報（リポジトリ・オーナー・既存プロジェクト）を記録（一覧に無いプロジェクトは削除）"""
+        self.put('repository', repo_info['repository_id'], save=False)
+        self.put('owner', repo_info['owner_id'], save=False)
+        titles = {f"project:{project['title']}" for project in repo_info.get('existing_projects', [])}
+        with self.lock:
+            for key in [key for key in self.nodes if key.startswith('project:') and key not in titles]:
+                del self.nodes[key]
+        for project in repo_info.get('existing_projects', []):
+            self.record_project(project, save=False)
+        self.save()
+    
+    def projects(self) -> List[Dict[str, Any]]:
+        """有効なプロジェクトの一覧を取得"""
+        with self.lock:
+            keys = [key for key in self.nodes if key.startswith('project:')]
+        projects = []
+        for key in keys:
+            entry = self.get(key)
+            if entry:
+                projects.append({'id': entry['id'], 'title': key.split(':', 1)[1],
+                                 'number': entry.get('number'), 'url': entry.get('url')})
+        return projects
+    
+    def repository_info(self) -> Optional[Dict[str, Any]]:
+        """リポジトリ情報を get_repository_info と同じ形式で取得（未登録・期限切れの場合は None）"""
+        repository_id = self.get_id('repository')
+        owner_id = self.get_id('owner')
+        if not repository_id or not owner_id:
+            return None
+        return {
+            'repository_id': repository_id,
+            'owner_id': owner_id,
+            'existing_projects': self.projects()
+        }
+    
+    def project_ids(self) -> Dict[str, str]:
+        """プロジェクトタイトル -> ノードID を取得"""
+        return {project['title']: project['id'] for project in self.projects()}
+    
+    # プロジェクトフィールド
+    
+    def record_fields(self, project_id: str, fields: Dict[str, Dict[str, Any]]):
+        """プロジェクトのフィールド一覧（フィールド名 -> {id, options}）を記録"""
+        self.put(f"fields:{project_id}", project_id, fields=fields)
+    
+    def record_field(self, project_id: str, name: str, field_id: str, options: Dict[str, str] = None):
+        """プロジェクトに作成したフィールドを記録（一覧が未登録の場合は記録しない）"""
+        entry = self.get(f"fields:{project_id}")
+        if entry is None:
+            return
+        fields = dict(entry.get('fields') or {})
+        fields[name] = {'id': field_id, 'options': options or {}}
+        self.record_fields(project_id, fields)
+    
+    def fields(self, project_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """プロジェクトのフィールド一覧を取得（未登録・期限切れの場合は None）"""
+        entry = self.get(f"fields:{project_id}")
+        return entry.get('fields') if entry else None
+    
+    # ラベル
+    
+    def record_labels(self, label_ids: Dict[str, str]):
+        """ラベル名 -> ノードID を記録"""
+        if not label_ids:
+            return
+        for name, label_id in label_ids.items():
+            self.put(f"label:{name}", label_id, save=False)
+        self.save()
+    
+    def label_ids(self, names: List[str]) -> Optional[Dict[str, str]]:
+        """ラベルのノードIDを取得（1つでも未登録・期限切れの場合は None）"""
+        label_ids = {}
+        for name in names:
+            label_id = self.get_id(f"label:{name}")
+            if not label_id:
+                return None
+            label_ids[name] = label_id
+        return label_ids
\ No newline at end of file
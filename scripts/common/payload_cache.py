@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+コンパイル済みペイロードキャッシュの共通モジュール
+CSVから生成したIssue作成用データ（番号付きタイトル・ラベル・フィンガープリント入り本文）を
+CSVの内容と issue_types 設定のハッシュをキーにJSONLファイルへ保存し、入力が同じ実行では再利用する
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .csv_index import RowRange
+from .csv_loader import CSVLoader
+
+
+class PayloadCache:
+    """コンパイル済みペイロードキャッシュクラス
+    
+    {キー}.jsonl に1行1件の {"type", "row", "payload"} を、{キー}.meta.json に種別ごとの件数・ラベルを保存する。
+    メタデータは全件を書き終えた後に保存するため、メタデータがあるキーだけを有効とみなす。
+    行選択（CSV_ROWS）がある実行はキャッシュがあれば使い、無い場合はコンパイルしない。
+    """
+    
+    VERSION = 1
+    DEFAULT_DIRECTORY = '.setup_cache/payloads'
+    
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.status = None
+        self.payloads = 0
+        self.key_seconds = 0.0
+        
+        os.makedirs(self.directory, exist_ok=True)
+    
+    @classmethod
+    def from_environment(cls) -> Optional['PayloadCache']:
+        """環境変数 PAYLOAD_CACHE_DIR からキャッシュを作成（空文字の場合はキャッシュ無効）"""
+        directory = os.environ.get('PAYLOAD_CACHE_DIR', cls.DEFAULT_DIRECTORY)
+        if not directory:
+            return None
+        try:
+            return cls(directory)
+        except OSError as e:
+            print(f"⚠️ Payload cache disabled: {str(e)}")
+            return None
+    
+    @classmethod
+    def compute_key(cls, csv_sources: List[Tuple[str, str]], issue_type_config: Any) -> str:
+        """CSVの内容・Issue種別・issue_types 設定からキーを作成"""
+        digest = hashlib.sha256()
+        digest.update(f"v{cls.VERSION}\n".encode('utf-8'))
+        digest.update(json.dumps(issue_type_config.get_all_issue_types(), sort_keys=True,
+                                 ensure_ascii=False).encode('utf-8'))
+        for file_path, issue_type in csv_sources:
+            digest.update(f"\n{issue_type}:{os.path.basename(file_path)}\n".encode('utf-8'))
+            if not os.path.exists(file_path):
+                digest.update(b'missing')
+                continue
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()[:32]
+    
+    def _paths(self, key: str) -> Tuple[str, str]:
+        """(ペイロードファイル, メタデータファイル) のパス"""
+        return (os.path.join(self.directory, f"{key}.jsonl"),
+                os.path.join(self.directory, f"{key}.meta.json"))
+    
+    @staticmethod
+    def _selected(selection: Optional[Dict[str, List[RowRange]]], issue_type: str, row: int) -> bool:
+        """行が選択範囲に含まれるか"""
+        if not selection:
+            return True
+        ranges = selection.get(issue_type, selection.get('*', []))
+        return any(start <= row and (stop is None or row <= stop) for start, stop in ranges)
+    
+    def _read(self, payload_path: str,
+              selection: Optional[Dict[str, List[RowRange]]]) -> Iterator[Tuple[Dict, int, str]]:
+        """コンパイル済みペイロードを読み込み"""
+        with open(payload_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if self._selected(selection, record['type'], record['row']):
+                    self.payloads += 1
+                    yield record['payload'], record['row'], record['type']
+    
+    def _compile(self, prepared: Iterator[Tuple[Dict, int, str]],
+                 payload_path: str, meta_path: str, key: str) -> Iterator[Tuple[Dict, int, str]]:
+        """ペイロードを返しながらファイルに書き出し、最後まで書けた場合のみメタデータを保存"""
+        temp_path = f"{payload_path}.{os.getpid()}.tmp"
+        counts: Dict[str, int] = {}
+        labels: Dict[str, set] = {}
+        try:
+            f = open(temp_path, 'w', encoding='utf-8')
+        except OSError as e:
+            print(f"⚠️ Could not write payload cache: {str(e)}")
+            f = None
+        
+        completed = False
+        try:
+            for issue_data, row, issue_type in prepared:
+                if f is not None:
+                    try:
+                        f.write(json.dumps({'type': issue_type, 'row': row, 'payload': issue_data},
+                                           ensure_ascii=False) + '\n')
+                    except OSError as e:
+                        # 書き込めなくなってもIssue作成は続ける
+                        print(f"⚠️ Could not write payload cache: {str(e)}")
+                        f.close()
+                        f = None
+                counts[issue_type] = counts.get(issue_type, 0) + 1
+                labels.setdefault(issue_type, set()).update(issue_data.get('labels', []))
+                self.payloads += 1
+                yield issue_data, row, issue_type
+            completed = f is not None
+        finally:
+            if f is not None:
+                f.close()
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        if not completed:
+            return
+        try:
+            os.replace(temp_path, payload_path)
+            with open(meta_path, 'w', encoding='utf-8') as meta:
+                json.dump({
+                    'version': self.VERSION,
+                    'key': key,
+                    'compiled_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'counts': counts,
+                    'labels': {issue_type: sorted(names) for issue_type, names in labels.items()}
+                }, meta, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not write payload cache: {str(e)}")
+    
+    def iter_payloads(self, csv_sources: List[Tuple[str, str]], issue_processor: Any,
+                      selection: Optional[Dict[str, List[RowRange]]] = None) -> Iterator[Tuple[Dict, int, str]]:
+        """(Issue作成用データ, 番号, Issue種別) を返す（キャッシュが有効ならCSVを解析しない）"""
+        started = time.perf_counter()
+        key = self.compute_key(csv_sources, issue_processor.issue_type_config)
+        payload_path, meta_path = self._paths(key)
+        self.key_seconds = time.perf_counter() - started
+        
+        if os.path.exists(meta_path) and os.path.exists(payload_path):
+            self.status = 'hit'
+            print(f"📦 Using compiled payloads ({key[:12]})")
+            yield from self._read(payload_path, selection)
+            return
+        
+        prepared = issue_processor.build_issue_requests(CSVLoader.iter_all_csv_data(csv_sources, selection))
+        if selection:
+            # 一部の行だけではキャッシュを作成できない
+            self.status = 'bypassed'
+            yield from prepared
+            return
+        
+        self.status = 'compiled'
+        yield from self._compile(prepared, payload_path, meta_path, key)
+    
+    def print_summary(self):
+        """キャッシュの利用状況を表示"""
+        if self.status == 'hit':
+            print(f"📦 Payload cache: {self.payloads} payloads loaded without parsing CSV "
+                  f"(inputs hashed in {self.key_seconds:.3f}s)")
+        elif self.status == 'compiled':
+            print(f"📦 Payload cache: compiled {self.payloads} payloads for later runs")
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+リクエストペイロードのエンコードの共通モジュール
+JSONペイロードを1回だけコンパクトなUTF-8バイト列に変換し、リトライ時はそのバイト列を再送する
+（requests の json= は ensure_ascii=True のため、日本語1文字が6バイトの \\uXXXX になる）
+"""
+
+import json
+import threading
+from typing import Any, Dict
+
+# UTF-8バイト列で送信する場合の Content-Type
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+class PayloadEncoder:
+    """ペイロードエンコードクラス
+    
+    区切り文字の空白を省き、非ASCII文字をエスケープせずにUTF-8で出力する。
+    requests の json= と同じASCIIエスケープ形式との差を削減量として集計する
+    （エスケープ形式のサイズは出力した文字列の非ASCII文字数から推定し、2回目のエンコードはしない）。
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        
+        self.payloads = 0
+        self.bytes = 0
+        self.ascii_bytes = 0
+    
+    def encode(self, payload: Any) -> bytes:
+        """ペイロードをコンパクトなUTF-8のJSONバイト列に変換"""
+        text = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        body = text.encode('utf-8')
+        # 非ASCII文字は \uXXXX（6バイト）にエスケープされる
+        non_ascii = 0 if text.isascii() else len(text) - len(text.encode('ascii', 'ignore'))
+        ascii_size = len(text) + non_ascii * 5
+        with self.lock:
+            self.payloads += 1
+            self.bytes += len(body)
+            self.ascii_bytes += ascii_size
+        return body
+    
+    def stats(self) -> Dict[str, Any]:
+        """エンコードしたペイロード数・バイト数・削減量を取得"""
+        with self.lock:
+            saved = self.ascii_bytes - self.bytes
+            return {
+                'payloads': self.payloads,
+                'bytes': self.bytes,
+                'ascii_bytes': self.ascii_bytes,
+                'bytes_saved': saved,
+                'saved_ratio': round(saved / self.ascii_bytes, 3) if self.ascii_bytes else 0.0
+            }
+    
+    def print_summary(self):
+        """削減量を表示"""
+        stats = self.stats()
+        if stats['payloads']:
+            print(f"🗜️ Request payloads: {stats['bytes'] / 1024:.1f} KB as compact UTF-8 "
+                  f"({stats['bytes_saved'] / 1024:.1f} KB / {stats['saved_ratio'] * 100:.1f}% saved vs ASCII-escaped JSON)")
\ No newline at end of file
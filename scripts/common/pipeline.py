@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+ストリーミングパイプラインの共通モジュール
+CSV読み込み → ペイロード生成 → Issue作成 → Projectリンク を有界キューで接続して並行実行する
+"""
+
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .batch_processor import BatchProcessor
+from .csv_loader import CSVLoader
+from .issue_processor import IssueProcessor, compute_fingerprint
+
+
+class IssuePipeline:
+    """ストリーミングIssue作成パイプラインクラス
+    
+    各段は専用スレッドで動作し、有界キュー（queue_size）で接続する。
+    下流が詰まると上流はキューへの投入で待機するため、CSVの大きさに関わらずメモリ使用量は一定。
+    Issue 1件目のリンクは50件目の作成と並行して行われる。
+    """
+    
+    # ストリーム終端を表す番兵
+    _END = object()
+    
+    def __init__(self, batch_processor: BatchProcessor,
+                 issue_processor: IssueProcessor,
+                 issue_type_config: Any,
+                 project_ids: Dict[str, str],
+                 queue_size: int = 50,
+                 existing_index: Any = None,
+                 flush_interval: float = 1.0,
+                 row_selection: Optional[Dict] = None):
+        self.batch_processor = batch_processor
+        self.issue_processor = issue_processor
+        self.issue_type_config = issue_type_config
+        self.project_ids = project_ids
+        self.queue_size = max(1, queue_size)
+        self.existing_index = existing_index
+        self.flush_interval = flush_interval
+        self.row_selection = row_selection
+        
+        self.stop_event = threading.Event()
+        self.errors: List[str] = []
+        self.lock = threading.Lock()
+        
+        # 集計（作成済みIssue本体は保持しない）
+        self.stats = {
+            'total': 0,
+            'task_created': 0,
+            'kpt_created': 0,
+            'task_linked': 0,
+            'kpt_linked': 0,
+            'existing': 0,
+            'resumed': 0,
+            'retry_created': 0,
+            'failed': 0
+        }
+        self.failed_requests: List[Tuple[Dict, str]] = []
+    
+    def _count(self, key: str, amount: int = 1):
+        """集計値を加算"""
+        with self.lock:
+            self.stats[key] += amount
+    
+    def _put(self, target: queue.Queue, item: Any):
+        """停止要求を確認しながらキューに投入（バックプレッシャー）"""
+        while not self.stop_event.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+    
+    def _close(self, target: queue.Queue):
+        """下流へ終端を必ず渡す（停止時にキューが満杯なら未処理の要素を捨てて空ける）"""
+        while True:
+            try:
+                target.put(self._END, timeout=0.5)
+                return
+            except queue.Full:
+                if self.stop_event.is_set():
+                    try:
+                        target.get_nowait()
+                    except queue.Empty:
+                        pass
+    
+    def _get(self, source: queue.Queue) -> Any:
+        """停止要求を確認しながらキューから取得（停止後は終端を返す）"""
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return self._END
+    
+    def _fail(self, stage: str, error: Exception):
+        """ステージの例外を記録してパイプライン全体を停止"""
+        print(f"  ❌ Pipeline {stage} stage failed: {str(error)}")
+        with self.lock:
+            self.errors.append(f"{stage}: {str(error)}")
+        self.stop_event.set()
+    
+    def _read(self, csv_sources: List[Tuple[str, str]], rows: queue.Queue):
+        """CSVを1行ずつ読み込む"""
+        try:
+            for item in CSVLoader.iter_all_csv_data(csv_sources, self.row_selection):
+                if self.stop_event.is_set():
+                    break
+                self._put(rows, item)
+        except Exception as e:
+            self._fail('reader', e)
+        finally:
+            self._close(rows)
+    
+    def _build(self, rows: queue.Queue, requests: queue.Queue, links: queue.Queue):
+        """ペイロードを生成し、作成済み・既存のものはリンク段へ直接渡す"""
+        journal = self.batch_processor.journal
+        try:
+            while True:
+                item = self._get(rows)
+                if item is self._END:
+                    break
+                row, index, issue_type = item
+                
+                config = self.issue_type_config.get_issue_type(issue_type)
+                request = self.issue_processor.build_issue_request(row, index, issue_type, config) if config else None
+                if not request:
+                    continue
+                issue_data, _ = request
+                self._count('total')
+                
+                fingerprint = compute_fingerprint(issue_data, issue_type)
+                if journal and journal.is_created(fingerprint):
+                    self._count('resumed')
+                    self._count(f'{issue_type}_created')
+                    self._put(links, (journal.get_issue(fingerprint), issue_type))
+                    continue
+                
+                if self.existing_index is not None:
+                    existing = self.existing_index.find(issue_data, issue_type)
+                    if existing:
+                        self._count('existing')
+                        self._put(links, (existing, issue_type))
+                        continue
+                
+                self._put(requests, request)
+        except Exception as e:
+            self._fail('builder', e)
+        finally:
+            self._close(requests)
+    
+    def _create(self, requests: queue.Queue, links: queue.Queue):
+        """Issueを作成順に作成し、成功したものをリンク段へ渡す"""
+        if self.batch_processor.graphql_context:
+            chunk_size = self.batch_processor.graphql_context['batch_size']
+        else:
+            chunk_size = self.batch_processor.batch_size
+        
+        finished = False
+        try:
+            while not finished:
+                # 先頭は待機して取得し、残りはキューにあるだけまとめる
+                chunk = []
+                item = self._get(requests)
+                while True:
+                    if item is self._END:
+                        finished = True
+                        break
+                    chunk.append(item)
+                    if len(chunk) >= chunk_size:
+                        break
+                    try:
+                        item = requests.get_nowait()
+                    except queue.Empty:
+                        break
+                
+                if not chunk:
+                    continue
+                
+                created, failed = self.batch_processor.create_issues_chunk(chunk)
+                task_created, kpt_created = self.issue_processor.classify_created_issues(created)
+                for issue_type, issues in (('task', task_created), ('kpt', kpt_created)):
+                    self._count(f'{issue_type}_created', len(issues))
+                    for issue in issues:
+                        self._put(links, (issue, issue_type))
+                with self.lock:
+                    self.failed_requests.extend(failed)
+        except Exception as e:
+            self._fail('creator', e)
+        finally:
+            self._close(links)
+    
+    def _flush_links(self, buffers: Dict[str, List[Dict]]):
+        """リンク待ちのIssueをProjectごとにまとめてリンク"""
+        for issue_type, issues in buffers.items():
+            if not issues:
+                continue
+            project_name = self.issue_type_config.get_project_name(issue_type)
+            project_id = self.project_ids.get(project_name)
+            linked = self.batch_processor.link_issues_to_project(issues, project_id, project_name, issue_type)
+            self._count(f'{issue_type}_linked', linked)
+            buffers[issue_type] = []
+    
+    def _link(self, links: queue.Queue):
+        """Issueをバッファし、バッチサイズに達するか入力が途切れたらリンク"""
+        buffers: Dict[str, List[Dict]] = {}
+        batch_size = max(1, self.batch_processor.link_batch_size)
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = links.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    self._flush_links(buffers)
+                    continue
+                
+                if item is self._END:
+                    break
+                
+                issue, issue_type = item
+                if issue.get('linked_to_project'):
+                    # 作成と同時にProjectへ追加済み
+                    self._count(f'{issue_type}_linked')
+                    continue
+                
+                buffers.setdefault(issue_type, []).append(issue)
+                if len(buffers[issue_type]) >= batch_size:
+                    self._flush_links({issue_type: buffers[issue_type]})
+                    buffers[issue_type] = []
+            
+            # 停止時もバッファ済みのIssueはリンクする
+            self._flush_links(buffers)
+        except Exception as e:
+            self._fail('linker', e)
+    
+    def run(self, csv_sources: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """パイプラインを実行し、集計結果を返す"""
+        print(f"\n🚰 Streaming pipeline started (queue size: {self.queue_size})")
+        
+        rows = queue.Queue(maxsize=self.queue_size)
+        requests = queue.Queue(maxsize=self.queue_size)
+        links = queue.Queue(maxsize=self.queue_size)
+        
+        stages = [
+            threading.Thread(target=self._read, args=(csv_sources, rows), name='pipeline-reader'),
+            threading.Thread(target=self._build, args=(rows, requests, links), name='pipeline-builder'),
+            threading.Thread(target=self._create, args=(requests, links), name='pipeline-creator'),
+            threading.Thread(target=self._link, args=(links,), name='pipeline-linker')
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+        
+        # 失敗分はパイプライン終了後にまとめてリトライしてリンク
+        if self.failed_requests and not self.errors:
+            retry_created = self.batch_processor.retry_failed_issues(self.failed_requests)
+            task_retry, kpt_retry = self.issue_processor.classify_created_issues(retry_created)
+            self.stats['retry_created'] = len(retry_created)
+            self.stats['task_created'] += len(task_retry)
+            self.stats['kpt_created'] += len(kpt_retry)
+            for issue_type, issues in (('task', task_retry), ('kpt', kpt_retry)):
+                already_linked = [issue for issue in issues if issue.get('linked_to_project')]
+                self.stats[f'{issue_type}_linked'] += len(already_linked)
+                self._flush_links({issue_type: [issue for issue in issues if not issue.get('linked_to_project')]})
+        
+        self.stats['failed'] = len(self.failed_requests) - self.stats['retry_created']
+        self.stats['errors'] = list(self.errors)
+        return dict(self.stats)
\ No newline at end of file
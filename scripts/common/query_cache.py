@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+GraphQLクエリ結果キャッシュの共通モジュール
+読み取り専用クエリの結果を (クエリ, 変数) をキーにTTL付きで保持し、
+ミューテーションで対象が変わった場合はタグ単位で無効化する
+"""
+
+import copy
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 無効化タグ
+TAG_REPOSITORY = 'repository'
+TAG_PROJECTS = 'projects'
+TAG_LABELS = 'labels'
+TAG_DISCUSSION_CATEGORIES = 'discussion_categories'
+
+
+def project_fields_tag(project_id: str) -> str:
+    """プロジェクトのフィールド一覧のタグ"""
+    return f"project_fields:{project_id}"
+
+
+class QueryCache:
+    """クエリ結果キャッシュクラス
+    
+    同じ実行内で同じ読み取りクエリを繰り返し送らないためのもの。
+    ttl 秒を過ぎたエントリは再取得する（ttl が0以下の場合はキャッシュ無効）。
+    """
+    
+    def __init__(self, ttl: float = 300.0, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        
+        # キー -> (有効期限, 結果, タグ)
+        self.entries: Dict[Tuple[str, str], Tuple[float, Any, Tuple[str, ...]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """キャッシュが有効か"""
+        return self.ttl > 0
+    
+    @staticmethod
+    def make_key(query: str, variables: Optional[Dict] = None) -> Tuple[str, str]:
+        """クエリ（空白を正規化）と変数からキーを作成"""
+        return ' '.join(query.split()), json.dumps(variables or {}, sort_keys=True, ensure_ascii=False)
+    
+    def get(self, query: str, variables: Optional[Dict] = None) -> Optional[Any]:
+        """有効なキャッシュ結果を取得（無い場合は None）"""
+        if not self.enabled:
+            return None
+        key = self.make_key(query, variables)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+    
+    def set(self, query: str, variables: Optional[Dict], result: Any, tags: Iterable[str] = ()):
+        """結果をキャッシュ（空の結果は保存しない）"""
+        if not self.enabled or not result:
+            return
+        key = self.make_key(query, variables)
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, copy.deepcopy(result), tuple(tags))
+    
+    def invalidate(self, *tags: str) -> int:
+        """いずれかのタグを持つエントリを削除し、削除件数を返す"""
+        tags = set(tags)
+        with self.lock:
+            keys = [key for key, entry in self.entries.items() if tags.intersection(entry[2])]
+            for key in keys:
+                del self.entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def clear(self):
+        """全エントリを削除"""
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス・無効化の件数を取得"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries)
+            }
+    
+    def print_summary(self):
+        """キャッシュの統計を表示"""
+        stats = self.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"🗃️ Query cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['invalidations']} invalidated")
\ No newline at end of file
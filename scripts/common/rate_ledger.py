@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+プロセス間レート制限台帳の共通モジュール
+同じホストで同じトークンを使う複数の実行が、トークンごとの残り予算・リセット時刻・
+コンテンツ作成用トークンバケットをSQLiteファイル（ファイルロック）で共有する
+"""
+
+import os
+import time
+import array
+import atexit
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+from .rate_limiter import reserve_window_slots, write_refill_rate
+
+
+class RateLedger:
+    """レート制限台帳クラス
+    
+    budgets: (トークンキー, リソース) ごとの最新の残り予算。同じリセット時刻の記録は少ない方を残す
+    （複数プロセスのレスポンスは順不同で届くため）。
+    writes: トークンキーごとのコンテンツ作成用トークンバケット（待機時間は要求順に予約する）。
+    hourly_writes: トークンキーごとの直近の書き込み予約時刻（時間単位の上限用のリングバッファ）。
+    participants: トークンキーごとに予算を使用中のプロセス（ACTIVE_SECONDS 以内に記録したもの）。
+    トークンそのものは保存せず、ハッシュをキーにする。
+    """
+    
+    VERSION = 2
+    DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'team-setup-rate-ledger.sqlite')
+    # 最後の記録からこの秒数以内のプロセスを予算の分け合い相手とみなす
+    ACTIVE_SECONDS = 120.0
+    
+    def __init__(self, path: str = DEFAULT_PATH, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # 書き込みは BEGIN IMMEDIATE でファイルロックを取ってから行う（ロック待ちは busy timeout まで）
+        self.connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # 台帳はリセット時刻までしか意味を持たないため、同期書き込みは行わない
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self._create_tables()
+        
+        # 終了時に分け合い相手から外れる（異常終了時は ACTIVE_SECONDS 後に外れる）
+        atexit.register(self.leave)
+    
+    @classmethod
+    def from_environment(cls) -> Optional['RateLedger']:
+        """環境変数 RATE_LEDGER_FILE から台帳を作成（空文字の場合は台帳を使わない）"""
+        path = os.environ.get('RATE_LEDGER_FILE', cls.DEFAULT_PATH)
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Rate ledger disabled: {str(e)}")
+            return None
+    
+    @staticmethod
+    def token_key(token: str) -> str:
+        """トークンのハッシュ（台帳にはトークンを保存しない）"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+    
+    def _create_tables(self):
+        """テーブルを作成"""
+        with self.lock:
+            self.connection.executescript(f"""
+                CREATE TABLE IF NOT EXISTS budgets (
+                    token_key TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    remaining INTEGER NOT NULL,
+                    rate_limit INTEGER,
+                    reset INTEGER,
+                    used INTEGER,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (token_key, resource)
+                );
+                CREATE TABLE IF NOT EXISTS writes (
+                    token_key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS hourly_writes (
+                    token_key TEXT PRIMARY KEY,
+                    slots BLOB NOT NULL,
+                    position INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS participants (
+                    token_key TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    seen REAL NOT NULL,
+                    PRIMARY KEY (token_key, pid)
+                );
+                PRAGMA user_version = {self.VERSION};
+            """)
+    
+    def _transaction(self, statements: Callable[[sqlite3.Connection], object]) -> object:
+        """ファイルロックを取ったトランザクション内で実行"""
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self.connection)
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+            return result
+    
+    def record(self, token_key: str, resource: str, remaining: int, limit: Optional[int],
+               reset: Optional[int], used: Optional[int] = None):
+        """レスポンスヘッダーの予算状態を記録（古いリセット時刻・多い残り予算の記録では上書きしない）"""
+        now = self.clock()
+        
+        def statements(connection: sqlite3.Connection):
+            connection.execute(
+                'INSERT OR REPLACE INTO participants (token_key, pid, seen) VALUES (?, ?, ?)',
+                (token_key, self.pid, now)
+            )
+            row = connection.execute(
+                'SELECT remaining, reset FROM budgets WHERE token_key = ? AND resource = ?',
+                (token_key, resource)
+            ).fetchone()
+            if row is not None:
+                current_remaining, current_reset = row
+                if reset is not None and current_reset is not None:
+                    if reset < current_reset or (reset == current_reset and remaining >= current_remaining):
+                        return
+            connection.execute(
+                'INSERT OR REPLACE INTO budgets (token_key, resource, remaining, rate_limit, reset, used, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (token_key, resource, remaining, limit, reset, used, now)
+            )
+        
+        self._transaction(statements)
+    
+    def budget(self, token_key: str, resource: str) -> Dict[str, Optional[int]]:
+        """トークンのリソースの最新予算状態を取得（記録が無い場合は空）"""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT remaining, rate_limit, reset, used FROM budgets WHERE token_key = ? AND resource = ?',
+                (token_key, resource)
+            ).fetchone()
+        if row is None:
+            return {}
+        return {'remaining': row[0], 'limit': row[1], 'reset': row[2], 'used': row[3]}
+    
+    def participants(self, token_key: str) -> int:
+        """トークンの予算を使用中のプロセス数（このプロセスを含む）"""
+        since = self.clock() - self.ACTIVE_SECONDS
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT COUNT(*) FROM participants WHERE token_key = ? AND seen >= ? AND pid != ?',
+                (token_key, since, self.pid)
+            ).fetchone()
+        return row[0] + 1
+    
+    def take_write(self, token_key: str, count: int, write_rate: float, write_burst: int,
+                   write_limit_per_hour: int = 0) -> float:
+        """コンテンツ作成用トークンを count 個消費し、必要な待機時間（分・時間単位の制限のうち長い方）を返す"""
+        now = self.clock()
+        
+        def statements(connection: sqlite3.Connection) -> float:
+            row = connection.execute('SELECT tokens, updated FROM writes WHERE token_key = ?',
+                                     (token_key,)).fetchone()
+            tokens, updated = row if row is not None else (float(write_burst), now)
+            tokens = min(float(write_burst), tokens + max(0.0, now - updated) * write_rate) - float(count)
+            connection.execute('INSERT OR REPLACE INTO writes (token_key, tokens, updated) VALUES (?, ?, ?)',
+                               (token_key, tokens, now))
+            connection.execute('INSERT OR REPLACE INTO participants (token_key, pid, seen) VALUES (?, ?, ?)',
+                               (token_key, self.pid, now))
+            delay = 0.0 if tokens >= 0 else -tokens / write_rate
+            
+            if write_limit_per_hour:
+                row = connection.execute('SELECT slots, position FROM hourly_writes WHERE token_key = ?',
+                                         (token_key,)).fetchone()
+                slots = array.array('d')
+                position = 0
+                if row is not None:
+                    slots.frombytes(row[0])
+                    position = row[1]
+                if len(slots) != write_limit_per_hour:
+                    # 上限を変更した場合は記録をやり直す
+                    slots = array.array('d', [float('-inf')] * write_limit_per_hour)
+                    position = 0
+                hourly_delay, position = reserve_window_slots(slots, position, count, now)
+                connection.execute('INSERT OR REPLACE INTO hourly_writes (token_key, slots, position) VALUES (?, ?, ?)',
+                                   (token_key, slots.tobytes(), position))
+                delay = max(delay, hourly_delay)
+            return delay
+        
+        return self._transaction(statements)
+    
+    def write_budget(self, token_key: str, write_rate_per_minute: float, write_burst: int,
+                     write_limit_per_hour: int = 500) -> 'LedgerWriteBudget':
+        """トークンのコンテンツ作成用バケット（RateLimitGovernor の write_budget として使う）"""
+        return LedgerWriteBudget(self, token_key, write_rate_per_minute, write_burst, write_limit_per_hour)
+    
+    def leave(self):
+        """このプロセスを予算の分け合い相手から外す"""
+        try:
+            self._transaction(lambda connection: connection.execute(
+                'DELETE FROM participants WHERE pid = ?', (self.pid,)
+            ))
+        except sqlite3.Error:
+            pass
+    
+    def close(self):
+        """台帳を閉じる"""
+        self.leave()
+        with self.lock:
+            self.connection.close()
+
+
+class LedgerWriteBudget:
+    """台帳上のコンテンツ作成用トークンバケット（SharedWriteBudget と同じ take() を持つ）"""
+    
+    def __init__(self, ledger: RateLedger, token_key: str,
+                 write_rate_per_minute: float = 80.0, write_burst: int = 20,
+                 write_limit_per_hour: int = 500):
+        self.ledger = ledger
+        self.token_key = token_key
+        self.write_rate = write_refill_rate(write_rate_per_minute, write_burst)
+        self.write_burst = write_burst
+        self.write_limit_per_hour = write_limit_per_hour
+    
+    def take(self, count: int = 1) -> float:
+        """トークンを count 個消費し、必要な待機時間を返す"""
+        return self.ledger.take_write(self.token_key, count, self.write_rate, self.write_burst,
+                                      self.write_limit_per_hour)
\ No newline at end of file
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+レート制限ガバナーの共通モジュール
+x-ratelimit-* ヘッダーから実際の残り予算を把握し、リクエスト間隔を調整する
+"""
+
+import time
+import threading
+import multiprocessing
+from typing import Any, Callable, Dict, Mapping, MutableSequence, Optional, Tuple
+
+# コンテンツ作成の時間単位の制限（GitHub: 1時間あたり500件）を数える時間窓。
+# 到着時刻は応答遅延の分だけ予約時刻からずれるため、数秒の余裕を持たせる
+HOURLY_WINDOW = 3605.0
+
+
+def write_refill_rate(write_rate_per_minute: float, write_burst: int) -> float:
+    """分単位のバケットの補充レート（件/秒）。どの1分間でもバースト分を含めて write_rate_per_minute 件以下にする"""
+    return max(write_rate_per_minute - write_burst, 1.0) / 60.0
+
+
+def reserve_window_slots(slots: MutableSequence[float], position: int, count: int, now: float,
+                         window: float = HOURLY_WINDOW) -> Tuple[float, int]:
+    """直近 len(slots) 件の書き込み時刻（リングバッファ）に count 件を予約し、(必要な待機時間, 次の位置) を返す
+    
+    各書き込みは len(slots) 件前の書き込みから window 秒以上後に予約するため、
+    どの時間窓でも書き込みは len(slots) 件以下になる。
+    """
+    size = len(slots)
+    at = now
+    for _ in range(count):
+        at = max(at, slots[position] + window)
+        slots[position] = at
+        position = (position + 1) % size
+    return at - now, position
+
+
+class SharedWriteBudget:
+    """プロセス間で共有するコンテンツ作成用トークンバケット
+    
+    セカンダリレート制限はトークン単位のため、同じトークンを使う全ワーカープロセスで1つを共有する。
+    待機時間は要求順に割り当てる（予約方式）ため、各ワーカーは順番に枠を得て、
+    大きなリポジトリを処理するワーカーが他のワーカーの枠を奪うことはない。
+    分単位のバケットに加え、write_limit_per_hour 件の時間単位の上限も予約時刻で守る（0 の場合は無効）。
+    """
+    
+    def __init__(self, write_rate_per_minute: float = 80.0, write_burst: int = 20,
+                 write_limit_per_hour: int = 500, clock: Callable[[], float] = time.time):
+        self.write_rate = write_refill_rate(write_rate_per_minute, write_burst)
+        self.write_burst = write_burst
+        self.write_limit_per_hour = write_limit_per_hour
+        self.clock = clock
+        
+        # 子プロセスへ引き継ぐため multiprocessing の共有メモリに保持する
+        self.lock = multiprocessing.Lock()
+        self.tokens = multiprocessing.RawValue('d', float(write_burst))
+        self.updated = multiprocessing.RawValue('d', clock())
+        self.hourly_slots = multiprocessing.RawArray('d', [float('-inf')] * write_limit_per_hour) \
+            if write_limit_per_hour else None
+        self.hourly_position = multiprocessing.RawValue('i', 0)
+    
+    def take(self, count: int = 1) -> float:
+        """トークンを count 個消費し、必要な待機時間（分・時間単位の制限のうち長い方）を返す"""
+        with self.lock:
+            now = self.clock()
+            elapsed = max(0.0, now - self.updated.value)
+            tokens = min(float(self.write_burst), self.tokens.value + elapsed * self.write_rate)
+            self.updated.value = now
+            self.tokens.value = tokens - float(count)
+            delay = 0.0 if self.tokens.value >= 0 else -self.tokens.value / self.write_rate
+            
+            if self.hourly_slots is not None:
+                hourly_delay, self.hourly_position.value = reserve_window_slots(
+                    self.hourly_slots, self.hourly_position.value, count, now
+                )
+                delay = max(delay, hourly_delay)
+            return delay
+
+
+class RateLimitGovernor:
+    """レート制限ガバナークラス（リーキーバケット方式）
+    
+    予算が十分な間は待機せず、残りが healthy_ratio を下回ると
+    リセットまでの残り時間に残り予算を均等に割り振るよう滑らかに減速する。
+    コンテンツ作成系リクエストはセカンダリレート制限に合わせ、分単位はトークンバケット、
+    時間単位（write_limit_per_hour 件、0 の場合は無効）は直近の書き込み時刻で制御する。
+    write_budget（または default_write_budget）を指定した場合は、そのプロセス間共有のバケットを使う。
+    attach_ledger で台帳（RateLedger）を接続すると、予算状態を同じトークンを使う他のプロセスと共有し、
+    減速時の間隔を使用中のプロセス数倍にして残り予算を分け合う。
+    """
+    
+    # プロセス内の全ガバナーが使う共有バケット（フリート実行のワーカーが設定する）
+    default_write_budget: Optional[SharedWriteBudget] = None
+    
+    def __init__(self,
+                 healthy_ratio: float = 0.2,
+                 reserve: int = 50,
+                 write_rate_per_minute: float = 80.0,
+                 write_burst: int = 20,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep,
+                 write_budget: Optional[SharedWriteBudget] = None,
+                 write_limit_per_hour: int = 500):
+        self.healthy_ratio = healthy_ratio
+        self.reserve = reserve
+        self.write_rate_per_minute = write_rate_per_minute
+        self.write_rate = write_refill_rate(write_rate_per_minute, write_burst)
+        self.write_burst = write_burst
+        self.write_limit_per_hour = write_limit_per_hour
+        self.clock = clock
+        self.sleep = sleep
+        self.write_budget = write_budget or RateLimitGovernor.default_write_budget
+        
+        # リソース別（core / graphql など）の最新の予算状態
+        self.budgets: Dict[str, Dict[str, Optional[int]]] = {}
+        
+        # コンテンツ作成用トークンバケット
+        self.write_tokens = float(write_burst)
+        self.write_updated = clock()
+        self.hourly_slots = [float('-inf')] * write_limit_per_hour if write_limit_per_hour else None
+        self.hourly_position = 0
+        
+        # プロセス間で予算状態を共有する台帳（attach_ledger で接続）
+        self.ledger: Any = None
+        self.ledger_key: Optional[str] = None
+        
+        self.lock = threading.Lock()
+    
+    def attach_ledger(self, ledger: Any, key: str):
+        """台帳を接続（共有バケットが未指定の場合はコンテンツ作成用バケットも台帳上のものを使う）"""
+        self.ledger = ledger
+        self.ledger_key = key
+        if self.write_budget is None:
+            self.write_budget = ledger.write_budget(key, self.write_rate_per_minute, self.write_burst,
+                                                    self.write_limit_per_hour)
+    
+    def clone(self) -> 'RateLimitGovernor':
+        """同じ設定で予算状態を持たない新しいガバナーを作成（トークンごとのガバナー用）"""
+        return RateLimitGovernor(
+            healthy_ratio=self.healthy_ratio,
+            reserve=self.reserve,
+            write_rate_per_minute=self.write_rate_per_minute,
+            write_burst=self.write_burst,
+            clock=self.clock,
+            sleep=self.sleep,
+            write_limit_per_hour=self.write_limit_per_hour
+        )
+    
+    def update(self, headers: Mapping[str, str], resource: str = None) -> Dict[str, Optional[int]]:
+        """レスポンスヘッダーから予算状態を更新"""
+        remaining = headers.get('x-ratelimit-remaining')
+        limit = headers.get('x-ratelimit-limit')
+        reset_timestamp = headers.get('x-ratelimit-reset')
+        used = headers.get('x-ratelimit-used')
+        resource = headers.get('x-ratelimit-resource') or resource or 'core'
+        
+        return self.record(
+            resource,
+            int(remaining) if remaining else None,
+            int(limit) if limit else None,
+            int(reset_timestamp) if reset_timestamp else None,
+            int(used) if used else None
+        )
+    
+    def record(self, resource: str, remaining: Optional[int], limit: Optional[int],
+               reset: Optional[int], used: Optional[int] = None) -> Dict[str, Optional[int]]:
+        """リソースの予算状態を記録"""
+        budget = {
+            'remaining': remaining,
+            'limit': limit,
+            'reset': reset,
+            'used': used
+        }
+        
+        if remaining is not None:
+            with self.lock:
+                self.budgets[resource] = budget
+            if self.ledger is not None:
+                self.ledger.record(self.ledger_key, resource, remaining, limit, reset, used)
+        return budget
+    
+    def get_budget(self, resource: str = 'core') -> Dict[str, Optional[int]]:
+        """リソースの最新予算状態を取得（台帳を接続している場合は全プロセスの最新の記録）"""
+        if self.ledger is not None:
+            shared = self.ledger.budget(self.ledger_key, resource)
+            if shared:
+                return shared
+        with self.lock:
+            return dict(self.budgets.get(resource, {}))
+    
+    def compute_delay(self, resource: str = 'core') -> float:
+        """次のリクエストまでに必要な待機時間を計算"""
+        budget = self.get_budget(resource)
+        remaining = budget.get('remaining')
+        limit = budget.get('limit')
+        reset_timestamp = budget.get('reset')
+        
+        # まだヘッダーを受け取っていない場合は全速
+        if remaining is None or not limit:
+            return 0.0
+        
+        seconds_to_reset = max(0.0, (reset_timestamp or 0) - self.clock())
+        
+        # 予備分を使い切った場合はリセットまで待機
+        if remaining <= self.reserve:
+            return seconds_to_reset
+        
+        ratio = remaining / limit
+        if ratio >= self.healthy_ratio:
+            return 0.0
+        
+        # 残り予算をリセットまでの時間に均等配分し、枯渇に近いほど重み付け
+        ideal_interval = seconds_to_reset / (remaining - self.reserve)
+        weight = 1.0 - ratio / self.healthy_ratio
+        
+        # 同じトークンを使う他のプロセスと残り予算を分け合う
+        if self.ledger is not None:
+            ideal_interval *= self.ledger.participants(self.ledger_key)
+        return ideal_interval * weight
+    
+    def _take_write_token(self, count: int = 1) -> float:
+        """書き込み用トークンを count 個消費し、必要な待機時間（分・時間単位の制限のうち長い方）を返す"""
+        if self.write_budget is not None:
+            return self.write_budget.take(count)
+        with self.lock:
+            now = self.clock()
+            elapsed = max(0.0, now - self.write_updated)
+            self.write_tokens = min(float(self.write_burst), self.write_tokens + elapsed * self.write_rate)
+            self.write_updated = now
+            self.write_tokens -= float(count)
+            delay = 0.0 if self.write_tokens >= 0 else -self.write_tokens / self.write_rate
+            
+            if self.hourly_slots is not None:
+                hourly_delay, self.hourly_position = reserve_window_slots(
+                    self.hourly_slots, self.hourly_position, count, now
+                )
+                delay = max(delay, hourly_delay)
+            return delay
+    
+    def acquire(self, resource: str = 'core', write: bool = False, count: int = 1) -> float:
+        """リクエスト枠を確保し、必要な待機秒数を返す（待機はしない）
+        
+        count は1リクエストに含まれる書き込み件数（エイリアスバッチ用）。
+        """
+        delay = self.compute_delay(resource)
+        if write:
+            delay = max(delay, self._take_write_token(count))
+        return delay
+    
+    def wait(self, resource: str = 'core', write: bool = False, count: int = 1) -> float:
+        """リクエスト前に必要なだけ待機し、待機秒数を返す"""
+        delay = self.acquire(resource, write, count)
+        
+        if delay > 0:
+            if delay >= 5:
+                print(f"  ⏳ Rate limit pacing ({resource}): waiting {delay:.1f}s...")
+            self.sleep(delay)
+        return delay
+    
+    def is_healthy(self, resource: str = 'core') -> bool:
+        """予算に十分な余裕があるかを判定"""
+        return self.compute_delay(resource) == 0.0
\ No newline at end of file
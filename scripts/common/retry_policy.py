@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+リトライポリシーの共通モジュール
+レスポンスのステータス・ヘッダー・本文からエラー種別を判定し、待機時間とリトライ可否を決定する
+"""
+
+import time
+import random
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # httpx は非同期モード利用時のみ必要
+    httpx = None
+
+# エラー種別
+PRIMARY_RATE_LIMIT = 'primary_rate_limit'
+SECONDARY_RATE_LIMIT = 'secondary_rate_limit'
+ABUSE_DETECTION = 'abuse_detection'
+AUTH_FAILURE = 'auth_failure'
+PERMISSION_DENIED = 'permission_denied'
+NOT_FOUND = 'not_found'
+VALIDATION_ERROR = 'validation_error'
+SERVER_ERROR = 'server_error'
+NETWORK_ERROR = 'network_error'
+GRAPHQL_ERROR = 'graphql_error'
+UNKNOWN_ERROR = 'unknown_error'
+
+# リトライしても結果が変わらないエラー種別（即座に失敗させる）
+NON_RETRYABLE = {AUTH_FAILURE, PERMISSION_DENIED, NOT_FOUND, VALIDATION_ERROR, GRAPHQL_ERROR, UNKNOWN_ERROR}
+
+# 書き込みが受理済みの可能性があるエラー種別（再送前に重複確認が必要）
+AMBIGUOUS = {SERVER_ERROR, NETWORK_ERROR}
+
+# 通信エラー（接続失敗・タイムアウト）として扱う例外型。それ以外の例外はプログラムの不具合なのでリトライしない
+NETWORK_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout) + \
+    ((httpx.TransportError,) if httpx is not None else ())
+
+# 分類関数: (ステータスコード, ヘッダー, 本文) -> エラー種別（判定できない場合は None）
+Classifier = Callable[[int, Mapping[str, str], str], Optional[str]]
+
+
+class RetryDecision:
+    """リトライ判定結果"""
+    
+    def __init__(self, kind: str, retry: bool, delay: float = 0.0, reason: str = ''):
+        self.kind = kind
+        self.retry = retry
+        self.delay = delay
+        self.reason = reason
+    
+    @property
+    def ambiguous(self) -> bool:
+        """書き込みが受理済みの可能性があるか"""
+        return self.kind in AMBIGUOUS
+    
+    def __repr__(self) -> str:
+        return f"RetryDecision(kind={self.kind!r}, retry={self.retry}, delay={self.delay:.1f})"
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    """ヘッダー値を整数で取得"""
+    value = headers.get(name) if headers is not None else None
+    try:
+        return int(float(value)) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """リトライポリシークラス
+    
+    エラー種別ごとの待機時間:
+      - プライマリレート制限: x-ratelimit-reset の時刻まで待機
+      - セカンダリレート制限・不正利用検出: retry-after の秒数だけ待機（無い場合は指数バックオフ）
+      - サーバーエラー・通信エラー: server_error_delay からの指数バックオフ
+      - 認証・権限・バリデーションエラー: リトライせず即座に失敗
+    add_classifier で独自の分類関数を先頭に追加でき、retryable で種別ごとのリトライ可否を上書きできる。
+    """
+    
+    def __init__(self,
+                 max_retries: int = 15,
+                 retry_delay: float = 120.0,
+                 secondary_limit_delay: float = 300.0,
+                 server_error_delay: float = 5.0,
+                 max_backoff: float = 900.0,
+                 clock: Callable[[], float] = time.time):
+        self.max_retries = max(1, max_retries)
+        self.retry_delay = retry_delay
+        self.secondary_limit_delay = secondary_limit_delay
+        self.server_error_delay = server_error_delay
+        self.max_backoff = max_backoff
+        self.clock = clock
+        
+        self.classifiers: List[Classifier] = []
+        self.retryable: Dict[str, bool] = {}
+        
+        # 種別ごとの発生回数
+        self.counts: Dict[str, int] = {}
+    
+    def add_classifier(self, classifier: Classifier):
+        """独自の分類関数を追加（組み込みの判定より優先）"""
+        self.classifiers.insert(0, classifier)
+    
+    def is_retryable(self, kind: str) -> bool:
+        """エラー種別がリトライ対象か"""
+        if kind in self.retryable:
+            return self.retryable[kind]
+        return kind not in NON_RETRYABLE
+    
+    def classify(self, status_code: int, headers: Mapping[str, str], body: str = '') -> str:
+        """HTTPレスポンスのエラー種別を判定"""
+        for classifier in self.classifiers:
+            kind = classifier(status_code, headers, body)
+            if kind:
+                return kind
+        
+        message = (body or '').lower()
+        
+        if status_code in (403, 429):
+            if _header_int(headers, 'x-ratelimit-remaining') == 0:
+                return PRIMARY_RATE_LIMIT
+            if 'abuse' in message:
+                return ABUSE_DETECTION
+            if 'secondary rate limit' in message or headers.get('retry-after') or status_code == 429:
+                return SECONDARY_RATE_LIMIT
+            if 'rate limit' in message:
+                return PRIMARY_RATE_LIMIT
+            return PERMISSION_DENIED
+        
+        if status_code == 401:
+            return AUTH_FAILURE
+        if status_code == 404:
+            return NOT_FOUND
+        if status_code in (400, 409, 410, 422):
+            return VALIDATION_ERROR
+        if status_code >= 500:
+            return SERVER_ERROR
+        return UNKNOWN_ERROR
+    
+    def classify_graphql_errors(self, errors: List[Dict[str, Any]], headers: Mapping[str, str]) -> str:
+        """HTTP 200 で返る GraphQL エラーの種別を判定"""
+        for error in errors or []:
+            error_type = str(error.get('type', '')).upper()
+            message = str(error.get('message', '')).lower()
+            if error_type == 'RATE_LIMITED' or 'api rate limit exceeded' in message:
+                return PRIMARY_RATE_LIMIT
+            if 'secondary rate limit' in message:
+                return SECONDARY_RATE_LIMIT
+            if 'abuse' in message:
+                return ABUSE_DETECTION
+        
+        for error in errors or []:
+            error_type = str(error.get('type', '')).upper()
+            if error_type in ('FORBIDDEN', 'INSUFFICIENT_SCOPES'):
+                return PERMISSION_DENIED
+            if error_type == 'NOT_FOUND':
+                return NOT_FOUND
+            if error_type == 'UNPROCESSABLE':
+                return VALIDATION_ERROR
+        return GRAPHQL_ERROR
+    
+    def _backoff(self, base: float, attempt: int) -> float:
+        """指数バックオフ（ジッター付き）"""
+        delay = base * (2 ** attempt) * random.uniform(0.8, 1.2)
+        return min(delay, self.max_backoff)
+    
+    def _decide(self, kind: str, attempt: int, headers: Mapping[str, str], reason: str) -> RetryDecision:
+        """エラー種別と試行回数からリトライ判定を作成"""
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        
+        if not self.is_retryable(kind) or attempt + 1 >= self.max_retries:
+            return RetryDecision(kind, False, 0.0, reason)
+        
+        headers = headers or {}
+        retry_after = _header_int(headers, 'retry-after')
+        reset = _header_int(headers, 'x-ratelimit-reset')
+        
+        if retry_after is not None:
+            # retry-after は全種別で最優先
+            delay = float(retry_after)
+        elif kind == PRIMARY_RATE_LIMIT:
+            delay = max(0.0, reset - self.clock()) if reset else self.retry_delay
+        elif kind in (SECONDARY_RATE_LIMIT, ABUSE_DETECTION):
+            # GitHub推奨: retry-after が無い場合は最低1分待ち、以降は指数的に延ばす
+            base = self.retry_delay if attempt == 0 else self.secondary_limit_delay
+            delay = self._backoff(base, attempt // 2)
+        else:
+            delay = self._backoff(self.server_error_delay, attempt)
+        
+        return RetryDecision(kind, True, delay, reason)
+    
+    def evaluate(self, status_code: int, headers: Mapping[str, str], body: str, attempt: int) -> RetryDecision:
+        """HTTPエラーレスポンスのリトライ判定"""
+        kind = self.classify(status_code, headers, body)
+        return self._decide(kind, attempt, headers, f"{status_code} - {(body or '')[:100]}")
+    
+    def evaluate_graphql(self, errors: List[Dict[str, Any]], headers: Mapping[str, str], attempt: int) -> RetryDecision:
+        """GraphQLエラーのリトライ判定"""
+        kind = self.classify_graphql_errors(errors, headers)
+        return self._decide(kind, attempt, headers, str(errors)[:200])
+    
+    def evaluate_exception(self, error: Exception, attempt: int) -> RetryDecision:
+        """通信例外のリトライ判定（接続失敗・タイムアウト以外は即座に失敗）"""
+        if not isinstance(error, NETWORK_EXCEPTIONS):
+            return self._decide(UNKNOWN_ERROR, attempt, {}, f"{type(error).__name__}: {str(error)}")
+        return self._decide(NETWORK_ERROR, attempt, {}, str(error))
\ No newline at end of file
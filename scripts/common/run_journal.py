@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+実行ジャーナルの共通モジュール
+Issue作成・リンクの完了状態を追記専用JSONLに記録し、中断した実行を再開できるようにする
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, Optional
+
+
+class RunJournal:
+    """実行ジャーナルクラス
+    
+    1行1レコードで以下のイベントを追記し、書き込みごとに fsync する。
+      - created: 入力行のフィンガープリント -> 作成された Issue（番号・ノードID）
+      - linked:  フィンガープリント -> Projectアイテムの追加完了
+    途中で強制終了して末尾行が壊れていても、読み込み時にその行だけ無視する。
+    """
+    
+    DEFAULT_PATH = 'issue_creation_journal.jsonl'
+    
+    def __init__(self, path: str = DEFAULT_PATH, repository: str = None):
+        self.path = path
+        self.repository = repository
+        self.created: Dict[str, Dict[str, Any]] = {}
+        self.linked: Dict[str, Optional[str]] = {}
+        self.lock = threading.Lock()
+        
+        self._load()
+        self.file = open(self.path, 'a', encoding='utf-8')
+    
+    def _load(self):
+        """既存のジャーナルを読み込み"""
+        if not os.path.exists(self.path):
+            return
+        
+        skipped = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    skipped += 1
+                    continue
+                
+                # 別リポジトリのジャーナルは使用しない
+                if self.repository and record.get('repository') != self.repository:
+                    continue
+                
+                fingerprint = record.get('fingerprint')
+                if record.get('event') == 'created':
+                    self.created[fingerprint] = record['issue']
+                elif record.get('event') == 'linked':
+                    self.linked[fingerprint] = record.get('item_id')
+        
+        if self.created:
+            print(f"📒 Journal loaded: {len(self.created)} created, {len(self.linked)} linked ({self.path})")
+        if skipped:
+            print(f"  ⚠️ Skipped {skipped} corrupted journal lines")
+    
+    def _append(self, record: Dict[str, Any]):
+        """レコードを追記してディスクに同期"""
+        record['repository'] = self.repository
+        record['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+    
+    def is_created(self, fingerprint: str) -> bool:
+        """作成済みかを判定"""
+        return fingerprint in self.created
+    
+    def is_linked(self, fingerprint: str) -> bool:
+        """Projectへのリンク済みかを判定"""
+        return fingerprint in self.linked
+    
+    def get_issue(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """作成済みIssueの記録を取得"""
+        issue = self.created.get(fingerprint)
+        return dict(issue) if issue else None
+    
+    def record_created(self, fingerprint: str, issue_type: str, issue: Dict[str, Any]):
+        """Issue作成を記録"""
+        entry = {
+            'issue_type': issue_type,
+            'node_id': issue.get('node_id'),
+            'number': issue.get('number'),
+            'html_url': issue.get('html_url'),
+            'title': issue.get('title'),
+            'labels': [{'name': label['name']} for label in issue.get('labels', [])],
+            'linked_to_project': bool(issue.get('linked_to_project')),
+            'fingerprint': fingerprint
+        }
+        self.created[fingerprint] = entry
+        self._append({'event': 'created', 'fingerprint': fingerprint, 'issue': entry})
+        
+        # 作成と同時にProjectへ追加済みの場合はリンクも記録
+        if entry['linked_to_project']:
+            self.record_linked(fingerprint)
+    
+    def record_linked(self, fingerprint: str, item_id: str = None):
+        """Projectへのリンクを記録"""
+        if not fingerprint:
+            return
+        self.linked[fingerprint] = item_id
+        self._append({'event': 'linked', 'fingerprint': fingerprint, 'item_id': item_id})
+    
+    def close(self):
+        """ジャーナルファイルを閉じる"""
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+シャード実行の共通モジュール
+作成対象の行を BATCH_NUMBER 番目のシャードの分だけに絞り込み、複数のランナー・時間帯に分けて作成する
+"""
+
+import os
+import math
+import time
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from .csv_index import RowRange
+from .csv_loader import CSVLoader
+
+
+class ShardSpec:
+    """シャード指定クラス
+    
+    range: 全行（CSV_ROWS 指定時は選択した行）を作成順に並べ、size 件ずつの連続した範囲を1シャードとする。
+    size を省略した場合は count 個に均等に分ける。
+    hash: 種別と行番号のハッシュで count 個に振り分ける（行が増えても既存の行の担当は変わらない）。
+    タイトル番号はCSV内の行番号から付けるため、どのシャードで作成しても同じタイトルになる。
+    """
+    
+    STRATEGIES = ('range', 'hash')
+    MARKER_FORMAT = 'batch_{}_completed.txt'
+    
+    def __init__(self, number: int, size: Optional[int] = None, count: Optional[int] = None,
+                 strategy: str = 'range', directory: str = '.'):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown shard strategy: {strategy} (expected one of {', '.join(self.STRATEGIES)})")
+        if number < 1:
+            raise ValueError(f"Shard number must be 1 or greater: {number}")
+        if strategy == 'hash' and not count:
+            raise ValueError("Hash sharding needs a shard count (SHARD_COUNT)")
+        if not size and not count:
+            raise ValueError("Range sharding needs a shard size (BATCH_SIZE) or a shard count (SHARD_COUNT)")
+        if count and number > count:
+            raise ValueError(f"Shard number {number} is greater than the shard count {count}")
+        
+        self.number = number
+        self.size = size
+        self.count = count
+        self.strategy = strategy
+        self.directory = directory
+    
+    @classmethod
+    def from_environment(cls) -> Optional['ShardSpec']:
+        """BATCH_NUMBER・BATCH_SIZE・SHARD_COUNT・SHARD_STRATEGY から作成（BATCH_NUMBER が未設定の場合は None）"""
+        number = os.environ.get('BATCH_NUMBER', '').strip()
+        if not number:
+            return None
+        
+        size = os.environ.get('BATCH_SIZE', '').strip()
+        count = os.environ.get('SHARD_COUNT', '').strip()
+        try:
+            number, size, count = int(number), int(size) if size else None, int(count) if count else None
+        except ValueError:
+            raise ValueError("BATCH_NUMBER, BATCH_SIZE and SHARD_COUNT must be integers")
+        # SHARD_COUNT だけを指定した場合はハッシュで振り分ける
+        strategy = os.environ.get('SHARD_STRATEGY', '').strip().lower() or ('hash' if count and not size else 'range')
+        return cls(number, size, count, strategy, os.environ.get('SHARD_MARKER_DIR', '.'))
+    
+    def _hash_slot(self, row_number: int, issue_type: str) -> int:
+        """行の担当シャード番号（1始まり）"""
+        digest = hashlib.sha256(f"{issue_type}:{row_number}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') % self.count + 1
+    
+    def owns(self, position: int, total: int, row_number: int, issue_type: str) -> bool:
+        """作成順で position 番目（1始まり、全 total 件）の行がこのシャードの担当か"""
+        if self.strategy == 'hash':
+            return self._hash_slot(row_number, issue_type) == self.number
+        size = self.size or math.ceil(total / self.count)
+        return (self.number - 1) * size < position <= self.number * size
+    
+    def row_selection(self, csv_sources: List[Tuple[str, str]],
+                      selection: Optional[Dict[str, List[RowRange]]] = None) -> Dict[str, List[RowRange]]:
+        """このシャードが担当する行の選択（CSVLoader・PayloadCache の row_selection としてそのまま使える）"""
+        keys = CSVLoader.list_row_keys(csv_sources, selection)
+        shard_selection: Dict[str, List[RowRange]] = {issue_type: [] for _, issue_type in csv_sources}
+        for position, (row_number, issue_type) in enumerate(keys, 1):
+            if not self.owns(position, len(keys), row_number, issue_type):
+                continue
+            ranges = shard_selection[issue_type]
+            # 連続する行番号は1つの範囲にまとめる
+            if ranges and ranges[-1][1] == row_number - 1:
+                ranges[-1] = (ranges[-1][0], row_number)
+            else:
+                ranges.append((row_number, row_number))
+        return shard_selection
+    
+    def describe(self) -> str:
+        """シャード指定の説明"""
+        if self.strategy == 'hash':
+            return f"{self.number}/{self.count} (hash)"
+        if self.size:
+            return f"{self.number} (rows {(self.number - 1) * self.size + 1}-{self.number * self.size})"
+        return f"{self.number}/{self.count} (range)"
+    
+    @property
+    def marker_path(self) -> str:
+        """完了マーカーのパス"""
+        return os.path.join(self.directory, self.MARKER_FORMAT.format(self.number))
+    
+    def is_completed(self) -> bool:
+        """このシャードが前回の実行で完了しているか"""
+        return os.path.exists(self.marker_path)
+    
+    def write_marker(self, repository: str, selection: Dict[str, List[RowRange]], results: Dict[str, Any]):
+        """完了マーカーを書き込み（失敗が残っていない場合のみ呼ぶ）"""
+        rows = ', '.join(
+            f"{issue_type} {sum(stop - start + 1 for start, stop in ranges)}"
+            for issue_type, ranges in selection.items()
+        )
+        with open(self.marker_path, 'w', encoding='utf-8') as f:
+            f.write(f"Shard {self.describe()} completed\n")
+            f.write(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Repository: {repository}\n")
+            f.write(f"Rows: {rows}\n")
+            f.write(f"Created: {results.get('task_created', 0) + results.get('kpt_created', 0)}\n")
+            f.write(f"Existing: {results.get('existing', 0)}\n")
+        print(f"🏁 Shard completion marker written: {self.marker_path}")
\ No newline at end of file
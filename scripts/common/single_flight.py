@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+リクエスト合流（single-flight）の共通モジュール
+同じキーの処理が実行中の場合は新たに実行せず、実行中の処理の結果を共有する
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """実行中の処理"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """リクエスト合流クラス
+    
+    先に来た呼び出し（リーダー）だけが処理を実行し、実行中に同じキーで来た呼び出しは
+    完了を待って同じ結果（例外の場合は同じ例外）を受け取る。完了後の呼び出しは再度実行する
+    （結果の保持は QueryCache・NodeRegistry の役割）。
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, _Call] = {}
+        
+        self.executions = 0
+        self.shared = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """キーごとに1回だけ fn を実行し、結果を返す"""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self.calls[key] = call
+                self.executions += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # 呼び出し側が結果を書き換えても互いに影響しないようにする
+            return copy.deepcopy(call.result) if isinstance(call.result, (dict, list)) else call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, int]:
+        """実行回数と合流した呼び出し数を取得"""
+        with self.lock:
+            return {'executions': self.executions, 'shared': self.shared}
+    
+    def print_summary(self):
+        """合流の統計を表示"""
+        stats = self.stats()
+        if stats['shared']:
+            print(f"🤝 Coalesced reads: {stats['shared']} duplicate in-flight requests avoided")
\ No newline at end of file
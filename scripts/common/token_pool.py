@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+トークンプールの共通モジュール
+複数のトークン（GitHub App のインストールトークンを含む）のレート制限予算を
+x-ratelimit-* ヘッダーから個別に把握し、リクエストごとに残り予算が最も多いトークンを選ぶ
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from .rate_limiter import RateLimitGovernor
+from .payload_encoder import JSON_CONTENT_TYPE
+from .app_auth import AppInstallationAuth
+from .rate_ledger import RateLedger
+
+
+class TokenIdentity:
+    """プール内の1トークン（認証ヘッダー・専用のレート制限ガバナー・利用状況）
+    
+    auth（AppInstallationAuth）を指定した場合はインストールトークンを使い、
+    トークンが再発行されるたびに認証ヘッダーを作り直す。
+    """
+    
+    def __init__(self, token: Optional[str], name: str, rate_limiter: RateLimitGovernor,
+                 auth: Optional[AppInstallationAuth] = None):
+        self.static_token = token
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.auth = auth
+        
+        self.header_token: Optional[str] = None
+        self.headers: Dict[str, Dict[str, str]] = {}
+        
+        self.requests = 0
+        self.writes = 0
+    
+    @property
+    def token(self) -> str:
+        """現在のトークン"""
+        return self.auth.token() if self.auth is not None else self.static_token
+    
+    @property
+    def ledger_key(self) -> str:
+        """レート制限台帳のキー（GitHub App はインストール単位、それ以外はトークンのハッシュ）"""
+        if self.auth is not None:
+            return f"app-{self.auth.app_id}:{self.auth.installation_id or self.auth.repository}"
+        return RateLedger.token_key(self.static_token)
+    
+    def _current_headers(self) -> Dict[str, Dict[str, str]]:
+        """現在のトークンの認証ヘッダー（トークンが変わった場合のみ作り直す）"""
+        token = self.token
+        if token != self.header_token:
+            rest = {
+                'Authorization': f'token {token}',
+                'Accept': 'application/vnd.github.v3+json',
+                'X-GitHub-Api-Version': '2022-11-28'
+            }
+            self.headers = {
+                'rest': rest,
+                'graphql': {'Authorization': f'Bearer {token}', 'Content-Type': JSON_CONTENT_TYPE},
+                # エンコード済みのJSON本文を送るRESTリクエスト用
+                'rest_json': {**rest, 'Content-Type': JSON_CONTENT_TYPE}
+            }
+            self.header_token = token
+        return self.headers
+    
+    @property
+    def rest_headers(self) -> Dict[str, str]:
+        """REST API用の認証ヘッダー"""
+        return self._current_headers()['rest']
+    
+    @property
+    def graphql_headers(self) -> Dict[str, str]:
+        """GraphQL API用の認証ヘッダー"""
+        return self._current_headers()['graphql']
+    
+    @property
+    def rest_json_headers(self) -> Dict[str, str]:
+        """JSON本文付きRESTリクエスト用の認証ヘッダー"""
+        return self._current_headers()['rest_json']
+    
+    def reauthenticate(self, response: Any) -> bool:
+        """401 で拒否されたインストールトークンを破棄し、再発行して再送できるかを返す（個人トークンは False）"""
+        if self.auth is None:
+            return False
+        authorization = response.request.headers.get('Authorization', '')
+        self.auth.invalidate(authorization.split(' ')[-1] or None)
+        print(f"  🔐 {self.name}: installation token was rejected, issuing a new one")
+        return True
+    
+    def headroom(self, resource: str = 'core') -> float:
+        """予備分を除いた残り予算（まだヘッダーを受け取っていない場合は無限大）"""
+        budget = self.rate_limiter.get_budget(resource)
+        remaining = budget.get('remaining')
+        if remaining is None:
+            return float('inf')
+        return float(remaining - self.rate_limiter.reserve)
+
+
+class TokenPool:
+    """トークンプールクラス
+    
+    読み取りは残り予算（予備分を除く）が最も多いトークンに振り分ける。
+    コンテンツ作成（Issue・ラベル作成）はセカンダリレート制限と作成者の一貫性のため、
+    pin_writes=True の場合は最初に選んだ1つのトークンに固定する。
+    トークンごとにガバナーを持ち、1つ目のトークンは指定されたガバナーをそのまま使う。
+    app_auth を指定した場合はインストールトークンを1つ目に置き、予算が同じなら優先して使う。
+    ledger を指定した場合は各トークンのガバナーを台帳に接続し、同じトークンを使う他のプロセスと予算を共有する。
+    """
+    
+    def __init__(self, tokens: List[str], rate_limiter: RateLimitGovernor = None, pin_writes: bool = True,
+                 app_auth: Optional[AppInstallationAuth] = None, ledger: Optional[RateLedger] = None):
+        tokens = list(dict.fromkeys(token for token in tokens if token))
+        if not tokens and app_auth is None:
+            raise ValueError("At least one token is required")
+        
+        rate_limiter = rate_limiter or RateLimitGovernor()
+        self.identities = []
+        if app_auth is not None:
+            self.identities.append(TokenIdentity(None, f"app-{app_auth.app_id}", rate_limiter, auth=app_auth))
+        for number, token in enumerate(tokens, 1):
+            governor = rate_limiter.clone() if self.identities else rate_limiter
+            self.identities.append(TokenIdentity(token, f"token-{number} (…{token[-4:]})", governor))
+        
+        self.ledger = ledger
+        if ledger is not None:
+            for identity in self.identities:
+                identity.rate_limiter.attach_ledger(ledger, identity.ledger_key)
+        self.pin_writes = pin_writes
+        self.write_identity: Optional[TokenIdentity] = None
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def tokens_from_environment() -> List[str]:
+        """TEAM_SETUP_TOKEN・TEAM_SETUP_TOKENS（カンマ・空白区切り）・TEAM_SETUP_TOKENS_FILE（1行1トークン）を読み込み"""
+        tokens = [os.environ.get('TEAM_SETUP_TOKEN', '').strip()]
+        tokens.extend(re.split(r'[\s,]+', os.environ.get('TEAM_SETUP_TOKENS', '')))
+        
+        tokens_file = os.environ.get('TEAM_SETUP_TOKENS_FILE')
+        if tokens_file:
+            try:
+                with open(tokens_file, 'r', encoding='utf-8') as f:
+                    tokens.extend(line.strip() for line in f if not line.lstrip().startswith('#'))
+            except OSError as e:
+                print(f"⚠️ Could not read token file {tokens_file}: {str(e)}")
+        
+        return list(dict.fromkeys(token for token in tokens if token))
+    
+    @classmethod
+    def from_environment(cls, rate_limiter: RateLimitGovernor = None, pin_writes: bool = True,
+                         repository: str = None) -> 'TokenPool':
+        """環境変数のトークン・GitHub App設定からプールを作成"""
+        return cls(cls.tokens_from_environment(), rate_limiter, pin_writes,
+                   AppInstallationAuth.from_environment(repository))
+    
+    @property
+    def primary(self) -> TokenIdentity:
+        """1つ目のトークン"""
+        return self.identities[0]
+    
+    def __len__(self) -> int:
+        return len(self.identities)
+    
+    def _best(self, resource: str, exclude: TokenIdentity = None) -> Optional[TokenIdentity]:
+        """残り予算が最も多いトークン（同じ場合は利用回数が少ない方）"""
+        candidates = [identity for identity in self.identities if identity is not exclude]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda identity: (identity.headroom(resource), -identity.requests))
+    
+    def select(self, resource: str = 'core', write: bool = False, count: int = 1) -> TokenIdentity:
+        """リクエストに使うトークンを選択し、利用回数を記録"""
+        with self.lock:
+            if write and self.pin_writes:
+                if self.write_identity is None:
+                    self.write_identity = self._best(resource)
+                identity = self.write_identity
+            else:
+                identity = self._best(resource)
+            
+            identity.requests += 1
+            if write:
+                identity.writes += count
+            return identity
+    
+    def can_rotate(self, resource: str, current: TokenIdentity, write: bool = False) -> bool:
+        """レート制限に達したトークンの代わりに、予算が残っている別のトークンを使えるか"""
+        if len(self.identities) < 2 or (write and self.pin_writes):
+            return False
+        with self.lock:
+            alternative = self._best(resource, exclude=current)
+            return alternative is not None and alternative.headroom(resource) > 0
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """トークンごとの利用回数と最新の残り予算"""
+        with self.lock:
+            return [
+                {
+                    'token': identity.name,
+                    'requests': identity.requests,
+                    'writes': identity.writes,
+                    'write_identity': identity is self.write_identity,
+                    'budgets': {
+                        resource: identity.rate_limiter.get_budget(resource)
+                        for resource in ('core', 'graphql')
+                    }
+                }
+                for identity in self.identities
+            ]
+    
+    def print_summary(self):
+        """トークンごとの利用状況を表示"""
+        if len(self.identities) < 2:
+            return
+        print(f"🔑 Token pool usage ({len(self.identities)} tokens):")
+        for entry in self.stats():
+            budgets = ', '.join(
+                f"{resource} {budget['remaining']}/{budget['limit']}"
+                for resource, budget in entry['budgets'].items() if budget.get('remaining') is not None
+            )
+            role = ' [writes]' if entry['write_identity'] else ''
+            print(f"  • {entry['token']}{role}: {entry['requests']} requests, {entry['writes']} writes"
+                  f"{f' (remaining: {budgets})' if budgets else ''}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+HTTPトランスポートの共通モジュール
+REST・GraphQLで共有するコネクションプール付きセッションを提供する
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .http_cache import HttpCache
+
+
+class PooledTransport:
+    """コネクションプール付きHTTPトランスポートクラス
+    
+    1つの requests.Session を全スレッド・全エンドポイントで共有し、keep-alive で接続を再利用する。
+    pool_connections はプールするホスト数、pool_maxsize はホストごとの最大接続数。
+    pool_block=True の場合、ホストごとの接続数が pool_maxsize を超えないよう空きを待つ。
+    http_cache を指定した場合、GETは ETag / Last-Modified による条件付きリクエストになる。
+    """
+    
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = True,
+                 http_cache: Optional[HttpCache] = None):
+        self.pool_connections = max(1, pool_connections)
+        self.pool_maxsize = max(1, pool_maxsize)
+        
+        self.adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.lock = threading.Lock()
+        self.http_cache = http_cache
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """リクエストを送信"""
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """GETリクエストを送信（HTTPキャッシュが有効な場合は条件付きリクエスト）"""
+        if self.http_cache is not None:
+            return self.http_cache.get(self.session, url, **kwargs)
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """POSTリクエストを送信"""
+        return self.request('POST', url, **kwargs)
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """ホスト別の接続数・リクエスト数と接続再利用率を取得"""
+        pools = {}
+        with self.lock:
+            pool_manager = self.adapter.poolmanager
+            for key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                pools[host] = {
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests
+                }
+        
+        opened = sum(pool['connections_opened'] for pool in pools.values())
+        total = sum(pool['requests'] for pool in pools.values())
+        return {
+            'connections_opened': opened,
+            'requests': total,
+            'reused': max(0, total - opened),
+            'reuse_ratio': round((total - opened) / total, 3) if total else 0.0,
+            'hosts': pools
+        }
+    
+    def print_summary(self):
+        """接続再利用の統計を表示"""
+        stats = self.connection_stats()
+        print(f"🔌 Connection pool: {stats['requests']} requests over {stats['connections_opened']} connections "
+              f"({stats['reuse_ratio'] * 100:.1f}% reused, max {self.pool_maxsize} per host)")
+        if self.http_cache is not None:
+            self.http_cache.print_summary()
+    
+    def close(self):
+        """セッションを閉じて接続を解放"""
+        self.session.close()
\ No newline at end of file
@@ -7,24 +7,108 @@ GitHub Issues 全自動作成スクリプト
 
 import time
 import sys
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # 共通ライブラリをインポート
 sys.path.append('scripts')
 from common.github_api import GitHubAPI
+from common.async_github_api import AsyncGitHubAPI
 from common.csv_loader import CSVLoader
 from common.batch_processor import BatchProcessor
 from common.config import Config, IssueTypeConfig
 from common.issue_processor import IssueProcessor
+from common.rate_limiter import RateLimitGovernor
+from common.retry_policy import RetryPolicy
+from common.transport import PooledTransport
+from common.http_cache import HttpCache
+from common.payload_cache import PayloadCache
+from common.query_cache import QueryCache
+from common.run_journal import RunJournal
+from common.pipeline import IssuePipeline
+from common.shard import ShardSpec
 
 
+def run_batch_mode(batch_processor: BatchProcessor, issue_processor: IssueProcessor,
+                   issue_type_config: IssueTypeConfig, project_ids: Dict[str, str],
+                   csv_sources: List, existing_index, start_time: float,
+                   total_count: Optional[int] = None, row_selection: Optional[Dict] = None,
+                   payload_cache: Optional[PayloadCache] = None) -> Dict:
+    """CSVを1行ずつ読みながらバッチ単位で作成し、その後リンクを実行して集計結果を返す"""
+    # Issue作成用データをバッチ1つ分ずつ生成（全件をメモリに載せない）
+    if payload_cache:
+        # 入力が前回と同じならコンパイル済みペイロードを読むだけで済む
+        prepared = payload_cache.iter_payloads(csv_sources, issue_processor, row_selection)
+    else:
+        prepared = issue_processor.build_issue_requests(CSVLoader.iter_all_csv_data(csv_sources, row_selection))
+    all_requests = issue_processor.iter_prepared_requests(prepared, existing_index)
+    
+    # バッチ処理実行
+    all_created_issues, all_failed_issues = batch_processor.process_all_batches(
+        all_requests, start_time, total_count
+    )
+    issue_processor.print_prepared_summary()
+    if payload_cache:
+        payload_cache.print_summary()
+    
+    # 失敗したもののリトライ
+    retry_created = []
+    if all_failed_issues:
+        retry_created = batch_processor.retry_failed_issues(all_failed_issues)
+        all_created_issues.extend(retry_created)
+    
+    # 作成されたIssueを種別ごとに分類
+    task_created, kpt_created = issue_processor.classify_created_issues(all_created_issues)
+    
+    # 既存Issue（前回の実行で作成済み）もリンク対象に含める（追加済みでもAPIは冪等）
+    existing_issues = issue_processor.existing_issues
+    task_existing, kpt_existing = issue_processor.classify_created_issues(existing_issues)
+    
+    # プロジェクトリンク（作成と同時に追加済みのものは除く）
+    task_targets = [issue for issue in task_created + task_existing if not issue.get('linked_to_project')]
+    kpt_targets = [issue for issue in kpt_created + kpt_existing if not issue.get('linked_to_project')]
+    task_linked = len(task_created) + len(task_existing) - len(task_targets)
+    kpt_linked = len(kpt_created) + len(kpt_existing) - len(kpt_targets)
+    
+    if task_targets or kpt_targets:
+        linked_counts = batch_processor.link_issues_to_projects(
+            task_targets, kpt_targets, project_ids, issue_type_config
+        )
+        task_linked += linked_counts[0]
+        kpt_linked += linked_counts[1]
+    elif batch_processor.graphql_context:
+        print("\n🔗 Issues were added to projects on creation. Skipping link phase.")
+    
+    return {
+        'total': sum(issue_processor.row_counts.values()),
+        'task_created': len(task_created),
+        'kpt_created': len(kpt_created),
+        'retry_created': len(retry_created),
+        'resumed': batch_processor.resumed_count,
+        'existing': len(existing_issues),
+        'task_linked': task_linked,
+        'kpt_linked': kpt_linked,
+        'failed': len(all_failed_issues) - len(retry_created)
+    }
 
 
-
-
-
-
-
+def run_pipeline_mode(batch_processor: BatchProcessor, issue_processor: IssueProcessor,
+                      issue_type_config: IssueTypeConfig, project_ids: Dict[str, str],
+                      csv_sources: List, existing_index, queue_size: int,
+                      row_selection: Optional[Dict] = None) -> Dict:
+    """CSV読み込みから作成・リンクまでをストリーミングで並行実行し、集計結果を返す"""
+    pipeline = IssuePipeline(
+        batch_processor,
+        issue_processor,
+        issue_type_config,
+        project_ids,
+        queue_size=queue_size,
+        existing_index=existing_index,
+        row_selection=row_selection
+    )
+    results = pipeline.run(csv_sources)
+    if results['errors']:
+        raise RuntimeError(f"Pipeline stopped: {'; '.join(results['errors'])}")
+    return results
 
 
 def main():
@@ -46,62 +130,116 @@ def main():
         # 設定を表示
         config.display_settings()
         
-        # GitHub APIクラスの初期化
-        github_api = GitHubAPI(config.token, config.repository)
+        # 作成対象の行（BATCH_NUMBER 指定時はこのシャードの担当行だけ）
+        csv_sources = CSVLoader.get_csv_sources()
+        row_selection = config.get_csv_row_selection()
+        shard = ShardSpec.from_environment()
+        if shard is not None:
+            print(f"🧩 Shard: {shard.describe()}")
+            if shard.is_completed():
+                print(f"✅ Shard already completed ({shard.marker_path} exists). Delete it to run the shard again.")
+                return 0
+            row_selection = shard.row_selection(csv_sources, row_selection)
+            shard_rows = CSVLoader.count_issue_rows(csv_sources, row_selection)
+            print(f"🧩 Shard owns {shard_rows} rows")
+            if shard_rows == 0:
+                print("ℹ️ No rows fall into this shard. Nothing to create.")
+                shard.write_marker(config.repository, row_selection, {})
+                return 0
+        
+        # GitHub APIクラスの初期化（レート制限ガバナー・リトライポリシー・共有コネクションプール付き）
+        rate_limiter = RateLimitGovernor(**config.get_rate_limit_settings())
+        retry_policy = RetryPolicy(**config.get_retry_settings())
+        transport = PooledTransport(**config.get_transport_settings(), http_cache=HttpCache.from_environment())
+        github_api = GitHubAPI(config.token, config.repository, rate_limiter, retry_policy,
+                               transport=transport,
+                               query_cache=QueryCache(config.get_query_cache_ttl()),
+                               token_pool=config.create_token_pool(rate_limiter))
         
         # 初期レート制限チェック
         github_api.check_initial_rate_limit()
         
-        # CSV読み込み
-        csv_loader = CSVLoader()
-        task_data, kpt_data = csv_loader.load_all_csv_data()
-        total_issues = len(task_data) + len(kpt_data)
-        
-        if total_issues == 0:
-            print("⚠️ No issues found in CSV files")
-            return 1
+        # 同じホストで同じトークンを使う他の実行との予算共有状況
+        ledger = github_api.token_pool.ledger
+        if ledger is not None:
+            sharing = ledger.participants(github_api.token_pool.primary.ledger_key)
+            print(f"🗂️ Rate ledger: {ledger.path} ({sharing} process(es) sharing the budget)")
         
         # Issue処理クラスの初期化
         issue_processor = IssueProcessor(issue_type_config)
         
+        # 非同期クライアント（設定で有効な場合のみ）
+        async_api = None
+        if config.is_async_client():
+            async_api = AsyncGitHubAPI(github_api, **config.get_async_settings())
+        
+        # 実行ジャーナル（中断した実行の再開用）
+        journal = None
+        if config.get_journal_file():
+            journal = RunJournal(config.get_journal_file(), config.repository)
+        
         # バッチ処理クラスの初期化
         batch_processor = BatchProcessor(
             github_api,
             config.get_batch_size(),
             config.get_batch_pause(),
-            config.get_request_delay()
+            config.get_request_delay(),
+            config.is_adaptive_rate_limit(),
+            async_api,
+            link_batch_size=config.get_link_batch_size(),
+            journal=journal
         )
         
-        print(f"\n📊 Processing plan:")
-        print(f"  • Total issues: {total_issues}")
-        print(f"  • Batch size: {config.get_batch_size()}")
-        print(f"  • Total batches: {batch_processor.calculate_batches(total_issues)}")
-        
-        # 完了予想時刻を表示
-        batch_processor.estimate_completion_time(total_issues)
-        
         # プロジェクトIDを読み込み
-        project_ids = config.load_project_ids()
+        project_ids = config.load_project_ids(registry=github_api.registry)
         
-        # Issue作成用データ準備
-        all_requests = issue_processor.prepare_all_issue_data(task_data, kpt_data)
+        # GraphQL一括作成モード（作成と同時にProjectへ追加するためリンク処理は不要）
+        if config.get_creation_mode() == 'graphql':
+            batch_processor.enable_graphql_creation(
+                project_ids, issue_type_config, config.get_graphql_create_batch_size()
+            )
         
-        # バッチ処理実行
-        all_created_issues, all_failed_issues = batch_processor.process_all_batches(all_requests, start_time)
+        # 既存Issueの事前取得（再実行時の重複作成を防止）
+        existing_index = None
+        if config.is_skip_existing_issues():
+            existing_index = github_api.fetch_existing_issues()
         
-        # 失敗したもののリトライ
-        retry_created = []
-        if all_failed_issues:
-            retry_created = batch_processor.retry_failed_issues(all_failed_issues)
-            all_created_issues.extend(retry_created)
+        if config.is_pipeline():
+            # ストリーミングモード（CSV全体をメモリに載せない）
+            results = run_pipeline_mode(
+                batch_processor, issue_processor, issue_type_config, project_ids,
+                csv_sources, existing_index, config.get_pipeline_queue_size(),
+                row_selection
+            )
+        else:
+            # CSVは作成しながら1行ずつ読み込む（ここでは行インデックスで件数のみ数える）
+            total_issues = CSVLoader.count_issue_rows(csv_sources, row_selection)
+            
+            if total_issues == 0:
+                print("⚠️ No issues found in CSV files")
+                return 1
+            
+            print(f"\n📊 Processing plan:")
+            print(f"  • Total issues: {total_issues}")
+            print(f"  • Batch size: {config.get_batch_size()}")
+            print(f"  • Total batches: {batch_processor.calculate_batches(total_issues)}")
+            
+            # 完了予想時刻を表示
+            batch_processor.estimate_completion_time(total_issues)
+            
+            results = run_batch_mode(
+                batch_processor, issue_processor, issue_type_config, project_ids,
+                csv_sources, existing_index, start_time, total_issues, row_selection,
+                PayloadCache.from_environment()
+            )
         
-        # 作成されたIssueを種別ごとに分類
-        task_created, kpt_created = issue_processor.classify_created_issues(all_created_issues)
-        
-        # プロジェクトリンク
-        task_linked, kpt_linked = batch_processor.link_issues_to_projects(
-            task_created, kpt_created, project_ids, issue_type_config
-        )
+        total_issues = results['total']
+        if total_issues == 0:
+            print("⚠️ No issues found in CSV files")
+            return 1
+        total_created = results['task_created'] + results['kpt_created']
+        final_failed = results['failed']
+        success_rate = (total_created + results['existing']) / total_issues * 100
         
         # 結果サマリー
         end_time = time.time()
@@ -111,38 +249,81 @@ def main():
         print("🎉 SMART PROCESSING COMPLETED!")
         print("=" * 60)
         print(f"📊 Results:")
-        print(f"  • Task issues created: {len(task_created)}")
-        print(f"  • KPT issues created: {len(kpt_created)}")
-        print(f"  • Total issues created: {len(all_created_issues)}")
-        if retry_created:
-            print(f"  • Retry issues created: {len(retry_created)}")
-        print(f"  • Task issues linked: {task_linked}")
-        print(f"  • KPT issues linked: {kpt_linked}")
-        final_failed = len(all_failed_issues) - len(retry_created)
+        print(f"  • Task issues created: {results['task_created']}")
+        print(f"  • KPT issues created: {results['kpt_created']}")
+        print(f"  • Total issues created: {total_created}")
+        if results['retry_created']:
+            print(f"  • Retry issues created: {results['retry_created']}")
+        if results['resumed']:
+            print(f"  • Resumed from journal: {results['resumed']}")
+        if results['existing']:
+            print(f"  • Existing issues skipped: {results['existing']}")
+        print(f"  • Task issues linked: {results['task_linked']}")
+        print(f"  • KPT issues linked: {results['kpt_linked']}")
         if final_failed > 0:
             print(f"  • Final failed issues: {final_failed}")
-        print(f"  • Success rate: {(len(all_created_issues)/total_issues*100):.1f}%")
+        print(f"  • Success rate: {success_rate:.1f}%")
         print(f"⏱️ Performance:")
         print(f"  • Execution time: {execution_time:.1f} seconds")
-        if all_created_issues:
-            print(f"  • Average per issue: {(execution_time/len(all_created_issues)):.2f}s")
+        if total_created:
+            print(f"  • Average per issue: {(execution_time/total_created):.2f}s")
+        github_api.metrics.print_summary()
+        transport.print_summary()
+        github_api.query_cache.print_summary()
+        github_api.single_flight.print_summary()
+        github_api.payload_encoder.print_summary()
+        github_api.token_pool.print_summary()
+        
+        # シャードの完了マーカー（失敗が残った場合は書かず、次回の実行で再試行する）
+        if shard is not None:
+            if final_failed == 0:
+                shard.write_marker(config.repository, row_selection, results)
+            else:
+                print(f"⚠️ Shard {shard.describe()} has {final_failed} failed issues. Completion marker not written.")
         
         # 結果保存
         with open('smart_issue_creation_result.txt', 'w', encoding='utf-8') as f:
             f.write(f"Smart Issue Creation Results\n")
             f.write(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Task issues: {len(task_created)}\n")
-            f.write(f"KPT issues: {len(kpt_created)}\n")
-            f.write(f"Total: {len(all_created_issues)}\n")
-            if retry_created:
-                f.write(f"Retry issues: {len(retry_created)}\n")
+            if shard is not None:
+                f.write(f"Shard: {shard.describe()}\n")
+            f.write(f"Task issues: {results['task_created']}\n")
+            f.write(f"KPT issues: {results['kpt_created']}\n")
+            f.write(f"Total: {total_created}\n")
+            if results['retry_created']:
+                f.write(f"Retry issues: {results['retry_created']}\n")
+            if results['resumed']:
+                f.write(f"Resumed from journal: {results['resumed']}\n")
+            if results['existing']:
+                f.write(f"Existing issues skipped: {results['existing']}\n")
             if final_failed > 0:
                 f.write(f"Final failed issues: {final_failed}\n")
             f.write(f"Execution time: {execution_time:.1f}s\n")
-            f.write(f"Success rate: {(len(all_created_issues)/total_issues*100):.1f}%\n")
+            f.write(f"Success rate: {success_rate:.1f}%\n")
+            connections = transport.connection_stats()
+            f.write(f"Connections opened: {connections['connections_opened']} "
+                    f"({connections['reuse_ratio'] * 100:.1f}% reused)\n")
+            if transport.http_cache is not None:
+                cache_stats = transport.http_cache.stats()
+                f.write(f"HTTP cache hits: {cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']} "
+                        f"({cache_stats['hit_rate'] * 100:.1f}%)\n")
+            payload_stats = github_api.payload_encoder.stats()
+            f.write(f"Request payload bytes: {payload_stats['bytes']} "
+                    f"({payload_stats['bytes_saved']} saved by compact UTF-8)\n")
+            if len(github_api.token_pool) > 1:
+                for token_stats in github_api.token_pool.stats():
+                    f.write(f"Token usage {token_stats['token']}: {token_stats['requests']} requests, "
+                            f"{token_stats['writes']} writes\n")
         
-        return 0
+        # メトリクス出力（JSON・Prometheusテキスト形式）
+        github_api.metrics.export(*config.get_metrics_files())
+        
+        if journal:
+            journal.close()
+        transport.close()
         
+        return 0
+    
     except Exception as e:
         print(f"\n💥 Unexpected error: {str(e)}")
         print(f"🔧 Error type: {type(e).__name__}")
@@ -161,4 +342,4 @@ if __name__ == '__main__':
             # TODO: ここで特定のIssue種別のみ処理するロジックを実装
             # 現在は全種別を処理
     
-    exit(main())
+    exit(main())
\ No newline at end of file
@@ -39,7 +39,14 @@ def clean_temporary_files():
     """一時ファイルを削除"""
     temp_patterns = [
         "project_ids.txt",
+        "setup_registry.json",
+        ".setup_cache",
+        "data/*.csv.idx",
+        "fleet_runs",
         "batch_*_completed.txt",
+        "issue_creation_journal.jsonl",
+        "issue_creation_metrics.json",
+        "issue_creation_metrics.prom",
         "*.tmp",
         "*.cache",
         "*.log",
@@ -5,6 +5,7 @@ Checks all environment variables, files, and data integrity before setup
 """
 
 import os
+import sys
 import csv
 import time
 from typing import Dict, List, Optional
@@ -20,7 +21,9 @@ def check_environment_variables():
     
     optional_vars = [
         'BATCH_NUMBER',
-        'BATCH_SIZE'
+        'BATCH_SIZE',
+        'SHARD_COUNT',
+        'SHARD_STRATEGY'
     ]
     
     missing_vars = []
@@ -164,32 +167,26 @@ def estimate_processing_requirements():
     print("\n📈 Estimating processing requirements...")
     
     try:
-        # タスクIssues数を確認
-        task_count = 0
-        if os.path.exists('data/tasks_for_issues.csv'):
-            with open('data/tasks_for_issues.csv', 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                task_rows = [row for row in reader if row.get('title', '').strip()]
-                task_count = len(task_rows)
-        
-        total_issues = task_count
-        
-        print(f"  📝 Task issues to create: {task_count}")
-        print(f"  📊 Total issues to create: {total_issues}")
+        # 実際のバッチ処理を仮想時計上の疑似GitHubで実行して見積もる（数秒以内で完了）
+        sys.path.append('scripts')
+        from benchmark.simulator import simulate, simulation_options
         
-        # バッチ数を計算
-        batch_size = int(os.environ.get('BATCH_SIZE', '50'))
-        required_batches = (total_issues + batch_size - 1) // batch_size  # 切り上げ
+        forecast = simulate(**simulation_options())
+        total_issues = forecast['issues_total']
+        settings = forecast['settings']
         
-        print(f"  📦 Batch size: {batch_size}")
-        print(f"  🔄 Required batches: {required_batches}")
+        print(f"  📊 Total issues to create: {total_issues} (task + KPT)")
+        print(f"  ⚙️ Mode: {settings['creation_mode']}, batch size: {settings['batch_size']}, "
+              f"adaptive pacing: {settings['adaptive_rate_limit']}")
+        print(f"  📡 Forecast API requests: {forecast['requests']} ({forecast['retries']} retries)")
         
         # 推定実行時間
-        estimated_time_per_issue = 3  # 秒（Rate limit考慮）
-        estimated_total_time = total_issues * estimated_time_per_issue
+        estimated_total_time = int(forecast['wall_seconds'])
         estimated_minutes = estimated_total_time // 60
         
         print(f"  ⏱️ Estimated processing time: {estimated_minutes} minutes ({estimated_total_time} seconds)")
+        for reason, seconds in forecast['sleep_seconds'].items():
+            print(f"     • {reason}: {seconds:.0f}s waiting")
         
         if total_issues > 200:
             print(f"  ⚠️ Warning: Large number of issues may hit GitHub rate limits")
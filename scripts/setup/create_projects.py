@@ -14,6 +14,7 @@ from typing import Dict, List, Optional
 # 共通ライブラリをインポート
 sys.path.append('scripts')
 from common.github_api import GitHubAPI
+from common.query_cache import TAG_PROJECTS, project_fields_tag
 
 
 def generate_sprint_options() -> List[str]:
@@ -32,7 +33,11 @@ def generate_sprint_options() -> List[str]:
     return options
 
 def get_existing_fields(github_api: GitHubAPI, project_id: str) -> Dict[str, str]:
-    """プロジェクトの既存フィールドを取得"""
+    """プロジェクトの既存フィールドを取得（レジストリに有効な記録があればそれを使用）"""
+    recorded = github_api.registry.fields(project_id)
+    if recorded is not None:
+        return {name: field['id'] for name, field in recorded.items()}
+    
     query = """
     query($projectId: ID!) {
         node(id: $projectId) {
@@ -42,6 +47,10 @@ def get_existing_fields(github_api: GitHubAPI, project_id: str) -> Dict[str, str
                         ... on ProjectV2SingleSelectField {
                             id
                             name
+                            options {
+                                id
+                                name
+                            }
                         }
                     }
                 }
@@ -51,14 +60,20 @@ def get_existing_fields(github_api: GitHubAPI, project_id: str) -> Dict[str, str
     """
     
     variables = {'projectId': project_id}
-    result = github_api.graphql_request(query, variables)
+    result = github_api.graphql_request(query, variables, cache_tags=[project_fields_tag(project_id)])
     
     fields = {}
     if result and 'node' in result:
         field_nodes = result['node'].get('fields', {}).get('nodes', [])
+        recorded = {}
         for field in field_nodes:
             if field and 'name' in field:
                 fields[field['name']] = field['id']
+                recorded[field['name']] = {
+                    'id': field['id'],
+                    'options': {option['name']: option['id'] for option in field.get('options') or []}
+                }
+        github_api.registry.record_fields(project_id, recorded)
     
     return fields
 
@@ -103,9 +118,13 @@ def create_custom_field(github_api: GitHubAPI, project_id: str, field_name: str,
         'options': field_options
     }
     
-    result = github_api.graphql_request(query, variables)
+    result = github_api.graphql_request(query, variables, invalidates=[project_fields_tag(project_id)])
     if result and 'createProjectV2Field' in result:
         field = result['createProjectV2Field']['projectV2Field']
+        github_api.registry.record_field(
+            project_id, field['name'], field['id'],
+            {option['name']: option['id'] for option in field.get('options', [])}
+        )
         print(f"✅ Created custom field: {field['name']}")
         for option in field.get('options', []):
             print(f"  • {option['name']} (ID: {option['id']})")
@@ -158,8 +177,8 @@ def setup_project_fields(github_api: GitHubAPI, project_id: str, project_title:
     
     return created_fields
 
-def create_project(github_api: GitHubAPI, title: str) -> Optional[str]:
-    """プロジェクトを作成"""
+def create_project(github_api: GitHubAPI, title: str, repo_info: Optional[Dict] = None) -> Optional[str]:
+    """プロジェクトを作成（repo_info を渡した場合はリポジトリ情報を再取得しない）"""
     # API Reference: https://docs.github.com/en/graphql/reference/mutations#createprojectv2
     query = """
     mutation($ownerId: ID!, $repositoryId: ID!, $title: String!) {
@@ -174,8 +193,8 @@ def create_project(github_api: GitHubAPI, title: str) -> Optional[str]:
     }
     """
     
-    # リポジトリ情報を取得
-    repo_info = github_api.get_repository_info()
+    # リポジトリ情報を取得（リポジトリ・オーナーのIDはプロジェクト作成で変わらない）
+    repo_info = repo_info or github_api.get_repository_info()
     if not repo_info:
         return None
         
@@ -185,9 +204,10 @@ def create_project(github_api: GitHubAPI, title: str) -> Optional[str]:
         'title': title
     }
     
-    result = github_api.graphql_request(query, variables)
+    result = github_api.graphql_request(query, variables, invalidates=[TAG_PROJECTS])
     if result and 'createProjectV2' in result:
         project = result['createProjectV2']['projectV2']
+        github_api.registry.record_project(project)
         print(f"✅ Created project: {project['title']} (#{project['number']})")
         print(f"🔗 Project URL: {project['url']}")
         return project['id']
@@ -209,8 +229,8 @@ def main():
         github_api = GitHubAPI()
         print(f"📦 Repository: {github_api.repository}")
         
-        # リポジトリ情報取得
-        repo_info = github_api.get_repository_info()
+        # リポジトリ情報取得（既存プロジェクトの判定に使うため、レジストリの記録ではなく最新の一覧を取得）
+        repo_info = github_api.get_repository_info(refresh=True)
         if not repo_info:
             print("❌ Failed to get repository information")
             return 1
@@ -253,16 +273,15 @@ def main():
                 # 既存プロジェクトにもフィールドを追加/更新
                 setup_project_fields(github_api, existing_project['id'], project_title)
             else:
-                project_id = create_project(github_api, project_title)
+                project_id = create_project(github_api, project_title, repo_info)
                 if project_id:
                     created_projects[project_title] = project_id
                     # プロジェクトにカスタムフィールドを設定
                     setup_project_fields(github_api, project_id, project_title)
             
-            # Rate limit対策
-            time.sleep(2)
+            # Rate limit対策はGitHubAPIのレート制限ガバナーが各リクエスト前に実施
         
-        # 結果をファイルに保存（他のスクリプトで使用）
+        # 結果をファイルに保存（ノードIDはレジストリにも記録済み、project_ids.txt は互換性のため維持）
         if created_projects:
             project_info = []
             for title, project_id in created_projects.items():
@@ -294,6 +313,7 @@ def main():
         
         print(f"\n🔗 Access your projects:")
         print(f"  https://github.com/{github_api.repository}/projects")
+        github_api.query_cache.print_summary()
         
         return 0
         
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+複数リポジトリの一括セットアップスクリプト
+リポジトリ一覧（CSV）の各リポジトリに対して create_projects.py → create_all_issues_smart.py を
+ワーカープロセスで並列実行する（コンテンツ作成のレート予算はトークンごとに全ワーカーで共有）
+
+使い方:
+  python scripts/setup/provision_fleet.py [fleet_repos.csv]
+
+リポジトリ一覧（CSV、# で始まる行は無視）:
+  repository,project_type,token_env
+  academy/team-01,imakoko,
+  academy/team-02,real_estate,TEAM_SETUP_TOKEN_B
+  
+  project_type を省略した場合は環境変数 PROJECT_TYPE（未設定なら imakoko）、
+  token_env を省略した場合は TEAM_SETUP_TOKEN のトークンを使用する。
+
+環境変数:
+  FLEET_WORKERS   同時に処理するリポジトリ数（デフォルト 4）
+  FLEET_WORKDIR   リポジトリごとの作業ディレクトリ・ログの出力先（デフォルト fleet_runs）
+  WRITE_RATE_PER_MINUTE, WRITE_BURST など Config の環境変数はトークンごとの共有予算と各ワーカーに反映される
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import multiprocessing
+from collections import OrderedDict, deque
+from multiprocessing.connection import wait
+from typing import Any, Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+
+# 共通ライブラリをインポート
+sys.path.append(SCRIPTS_DIR)
+from common.config import Config
+from common.rate_limiter import RateLimitGovernor, SharedWriteBudget
+
+DEFAULT_FLEET_FILE = 'fleet_repos.csv'
+DEFAULT_TOKEN_ENV = 'TEAM_SETUP_TOKEN'
+STATUS_FILE = 'fleet_status.json'
+
+
+def load_fleet(file_path: str) -> List[Dict[str, str]]:
+    """リポジトリ一覧を読み込み"""
+    default_project_type = os.environ.get('PROJECT_TYPE', 'imakoko')
+    entries = []
+    seen = set()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        rows = (line for line in f if line.strip() and not line.lstrip().startswith('#'))
+        for row in csv.DictReader(rows):
+            repository = (row.get('repository') or '').strip()
+            if not repository or repository in seen:
+                continue
+            if repository.count('/') != 1:
+                print(f"⚠️ Skipping invalid repository name: {repository}")
+                continue
+            seen.add(repository)
+            entries.append({
+                'repository': repository,
+                'project_type': (row.get('project_type') or '').strip() or default_project_type,
+                'token_env': (row.get('token_env') or '').strip() or DEFAULT_TOKEN_ENV
+            })
+    return entries
+
+
+def schedule(entries: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """トークンごとに交互に並べ替え（1つのトークンのリポジトリがワーカーを占有しないように）"""
+    by_token: Dict[str, deque] = OrderedDict()
+    for entry in entries:
+        by_token.setdefault(entry['token_env'], deque()).append(entry)
+    
+    ordered = []
+    while by_token:
+        for token_env in list(by_token):
+            ordered.append(by_token[token_env].popleft())
+            if not by_token[token_env]:
+                del by_token[token_env]
+    return ordered
+
+
+def workspace_name(repository: str) -> str:
+    """リポジトリの作業ディレクトリ名"""
+    return repository.replace('/', '__')
+
+
+def prepare_workspace(workspace: str):
+    """作業ディレクトリを作成し、スクリプトとデータへのリンクを置く（各スクリプトはカレントディレクトリ基準で動作する）"""
+    os.makedirs(workspace, exist_ok=True)
+    for name in ('scripts', 'data'):
+        link = os.path.join(workspace, name)
+        if not os.path.lexists(link):
+            os.symlink(os.path.join(ROOT_DIR, name), link)
+
+
+def provision_repository(entry: Dict[str, str], workspace: str, budget: SharedWriteBudget, payload_cache_dir: str):
+    """ワーカープロセス: 1つのリポジトリのプロジェクト作成・Issue作成・プロジェクトリンクを実行"""
+    os.chdir(workspace)
+    log = open('provision.log', 'w', encoding='utf-8', buffering=1)
+    sys.stdout = sys.stderr = log
+    
+    os.environ.update({
+        'GITHUB_REPOSITORY': entry['repository'],
+        'PROJECT_TYPE': entry['project_type'],
+        'TEAM_SETUP_TOKEN': os.environ.get(entry['token_env'], ''),
+        # 同時書き込みは共有予算の公平な順番待ちを崩すため、ワーカー内は同期処理にする
+        'ASYNC_CLIENT': 'false'
+    })
+    # 共有予算はトークン単位のため、ワーカーは token_env の1トークンだけを使う
+    for name in ('TEAM_SETUP_TOKENS', 'TEAM_SETUP_TOKENS_FILE', 'GITHUB_APP_ID'):
+        os.environ.pop(name, None)
+    # 同じカリキュラムのリポジトリ間でコンパイル済みペイロードを共有する
+    os.environ.setdefault('PAYLOAD_CACHE_DIR', payload_cache_dir)
+    RateLimitGovernor.default_write_budget = budget
+    
+    sys.path.append(os.path.join(SCRIPTS_DIR, 'setup'))
+    import create_projects
+    import create_all_issues_smart
+    
+    steps = OrderedDict()
+    exit_code = 0
+    for name, step in (('create_projects', create_projects.main),
+                       ('create_issues', create_all_issues_smart.main)):
+        started = time.time()
+        print(f"\n{'=' * 70}\n🚚 Fleet step: {name} ({entry['repository']})\n{'=' * 70}")
+        try:
+            exit_code = step() or 0
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"❌ {name} failed: {str(e)}")
+            exit_code = 1
+        steps[name] = {'exit_code': exit_code, 'seconds': round(time.time() - started, 1)}
+        if exit_code != 0:
+            break
+    
+    with open(STATUS_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'repository': entry['repository'], 'steps': steps}, f, ensure_ascii=False, indent=2)
+    log.flush()
+    sys.exit(exit_code)
+
+
+def read_status(workspace: str) -> Dict[str, Any]:
+    """ワーカーが書き出したステップごとの結果を読み込み"""
+    try:
+        with open(os.path.join(workspace, STATUS_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f).get('steps', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def run_fleet(entries: List[Dict[str, str]], workers: int, workdir: str,
+              rate_settings: Dict[str, float]) -> List[Dict[str, Any]]:
+    """リポジトリを最大 workers 個ずつ並列にセットアップし、結果の一覧を返す"""
+    budgets = {
+        token_env: SharedWriteBudget(rate_settings['write_rate_per_minute'], rate_settings['write_burst'],
+                                     rate_settings['write_limit_per_hour'])
+        for token_env in {entry['token_env'] for entry in entries}
+    }
+    payload_cache_dir = os.path.join(os.path.abspath(workdir), '.payload_cache')
+    
+    pending = deque(schedule(entries))
+    running: Dict[int, Dict[str, Any]] = {}
+    results = []
+    
+    while pending or running:
+        while pending and len(running) < workers:
+            entry = pending.popleft()
+            workspace = os.path.abspath(os.path.join(workdir, workspace_name(entry['repository'])))
+            prepare_workspace(workspace)
+            process = multiprocessing.Process(
+                target=provision_repository,
+                args=(entry, workspace, budgets[entry['token_env']], payload_cache_dir),
+                name=f"fleet-{workspace_name(entry['repository'])}"
+            )
+            process.start()
+            running[process.sentinel] = {'entry': entry, 'process': process,
+                                         'workspace': workspace, 'started': time.time()}
+            print(f"🚀 Started {entry['repository']} ({entry['project_type']}, {entry['token_env']})")
+        
+        for sentinel in wait(list(running)):
+            job = running.pop(sentinel)
+            job['process'].join()
+            exit_code = job['process'].exitcode
+            seconds = time.time() - job['started']
+            result = {
+                'repository': job['entry']['repository'],
+                'project_type': job['entry']['project_type'],
+                'exit_code': exit_code,
+                'seconds': round(seconds, 1),
+                'steps': read_status(job['workspace']),
+                'log': os.path.join(job['workspace'], 'provision.log')
+            }
+            results.append(result)
+            icon = '✅' if exit_code == 0 else '❌'
+            print(f"{icon} {result['repository']} finished in {seconds:.0f}s (exit {exit_code}) "
+                  f"[{len(results)}/{len(entries)}]")
+    
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    """メイン処理"""
+    argv = sys.argv[1:] if argv is None else argv
+    print("=" * 70)
+    print("🚚 FLEET PROVISIONING")
+    print("=" * 70)
+    print(f"⏰ Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    fleet_file = argv[0] if argv else os.environ.get('FLEET_FILE', DEFAULT_FLEET_FILE)
+    if not os.path.exists(fleet_file):
+        print(f"❌ Fleet file not found: {fleet_file}")
+        return 1
+    
+    entries = load_fleet(fleet_file)
+    if not entries:
+        print(f"⚠️ No repositories listed in {fleet_file}")
+        return 1
+    
+    missing_tokens = sorted({entry['token_env'] for entry in entries if not os.environ.get(entry['token_env'])})
+    if missing_tokens:
+        print(f"❌ Missing token environment variables: {', '.join(missing_tokens)}")
+        return 1
+    
+    try:
+        workers = max(1, int(os.environ.get('FLEET_WORKERS') or 4))
+    except ValueError:
+        print(f"⚠️ Invalid value for FLEET_WORKERS: {os.environ.get('FLEET_WORKERS')}")
+        workers = 4
+    workdir = os.environ.get('FLEET_WORKDIR') or 'fleet_runs'
+    rate_settings = Config(require_credentials=False).get_rate_limit_settings()
+    
+    print(f"📦 Repositories: {len(entries)}")
+    print(f"👷 Workers: {min(workers, len(entries))}")
+    print(f"🔑 Tokens: {len({entry['token_env'] for entry in entries})} "
+          f"(shared write budget {rate_settings['write_rate_per_minute']:.0f}/min, "
+          f"{rate_settings['write_limit_per_hour']}/h each)")
+    print(f"📁 Work directory: {workdir}")
+    
+    start_time = time.time()
+    os.makedirs(workdir, exist_ok=True)
+    results = run_fleet(entries, workers, workdir, rate_settings)
+    
+    failed = [result for result in results if result['exit_code'] != 0]
+    print(f"\n{'=' * 70}")
+    print(f"🎉 Fleet provisioning finished in {time.time() - start_time:.0f}s")
+    print(f"  • Succeeded: {len(results) - len(failed)}/{len(results)}")
+    for result in failed:
+        print(f"  ❌ {result['repository']}: exit {result['exit_code']} (see {result['log']})")
+    
+    with open(os.path.join(workdir, 'fleet_results.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(time.time() - start_time, 1),
+            'workers': workers,
+            'results': results
+        }, f, ensure_ascii=False, indent=2)
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
\ No newline at end of file
@@ -12,9 +12,26 @@ from typing import Dict, List, Optional
 # 共通ライブラリをインポート
 sys.path.append('scripts')
 from common.github_api import GitHubAPI
+from common.query_cache import TAG_PROJECTS
 
 def get_project_urls(github_api: GitHubAPI) -> Dict[str, str]:
-    """プロジェクトのURLを取得"""
+    """プロジェクトのURLを取得（レジストリに記録済みのプロジェクトを優先）"""
+    project_urls = {}
+    projects = [project for project in github_api.registry.projects() if project.get('url')]
+    
+    if not projects:
+        projects = fetch_projects(github_api)
+    
+    for project in projects:
+        if 'タスク' in project['title'] or 'task' in project['title'].lower():
+            project_urls['task'] = project['url']
+        elif 'KPT' in project['title']:
+            project_urls['kpt'] = project['url']
+    
+    return project_urls
+
+def fetch_projects(github_api: GitHubAPI) -> List[Dict[str, str]]:
+    """プロジェクトのタイトルとURLをAPIで取得"""
     query = """
     query($owner: String!, $name: String!) {
         repository(owner: $owner, name: $name) {
@@ -33,18 +50,10 @@ def get_project_urls(github_api: GitHubAPI) -> Dict[str, str]:
         'name': github_api.repo_name
     }
     
-    result = github_api.graphql_request(query, variables)
-    project_urls = {}
-    
+    result = github_api.graphql_request(query, variables, cache_tags=[TAG_PROJECTS])
     if result and 'repository' in result:
-        projects = result['repository']['projectsV2']['nodes']
-        for project in projects:
-            if 'タスク' in project['title'] or 'task' in project['title'].lower():
-                project_urls['task'] = project['url']
-            elif 'KPT' in project['title']:
-                project_urls['kpt'] = project['url']
-    
-    return project_urls
+        return result['repository']['projectsV2']['nodes']
+    return []
 
 def get_issue_urls(github_api: GitHubAPI) -> Dict[str, str]:
     """特定のIssueのURLを取得"""